@@ -7,5 +7,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'freelancer_marketplace.settings')
+# Route the public job pages to their native async views
+os.environ.setdefault('JOB_ASYNC_VIEWS', '1')
 
 application = get_asgi_application() 
\ No newline at end of file
@@ -0,0 +1,335 @@
+"""
+Per-request instrumentation.
+
+MetricsMiddleware times every request and, through a database execute
+wrapper, counts its queries, their total time and the slowest one, and the
+time spent rendering its template response. Each response gets a
+Server-Timing header, and the numbers are added to process-local histograms
+per URL name, which metrics_view serves in the Prometheus text format to
+scrapers sending METRICS_TOKEN as a bearer token. Without a token, it
+serves the addresses in METRICS_ALLOWED_IPS; behind a reverse proxy on the
+same host every request comes from a local address, so set a token there.
+
+With QUERY_INSPECTION on, each request's statements are also checked for
+repeats and against its URL name's query budget (see queries.py).
+
+The Server-Timing header of a streaming response covers the time before
+the body starts; the histograms cover the whole stream. Apps add their own
+process-local counters to the same page with register_counter().
+
+Only a few perf_counter() calls are added per query and per request, so the
+middleware can stay on in production. Every server process keeps its own
+histograms; scrape each process, or run one worker per scrape target.
+"""
+import hmac
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+from .queries import QUERY_INSPECTION, find_query_problems, report_query_problems
+
+# Bearer token scrapers must send to read the metrics endpoint; when it is
+# empty, the addresses allowed to read it instead
+METRICS_TOKEN = getattr(settings, 'METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+# Characters of the slowest statement kept per URL name
+METRICS_SQL_LENGTH = getattr(settings, 'METRICS_SQL_LENGTH', 500)
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0
+        self.slowest_time = 0
+        self.slowest_sql = None
+        self.render_started = None
+        self.render_time = 0
+        # Statements run, kept only to inspect them (see queries.py)
+        self.statements = [] if QUERY_INSPECTION else None
+
+    def record_query(self, sql, duration):
+        self.queries += 1
+        if self.statements is not None:
+            self.statements.append(sql)
+        self.db_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_sql = sql
+
+    def start_render(self, response):
+        self.render_started = time.perf_counter()
+
+    def finish_render(self, response):
+        self.render_time = time.perf_counter() - self.render_started
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def record_queries(execute, sql, params, many, context):
+    """
+    Database execute wrapper adding each query to the current request's
+    metrics; queries outside a request are not timed
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+def install_query_recorders(**kwargs):
+    # Sent in the thread that runs the request's queries, also under ASGI;
+    # covers connections opened before this module was imported
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(connection)
+
+
+connection_created.connect(install_query_recorder)
+request_started.connect(install_query_recorders)
+
+
+class Histogram:
+    """
+    A Prometheus histogram with one series per URL name
+    """
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, view, value):
+        series = self.series.get(view)
+        if series is None:
+            # [count per bucket..., sum, count]
+            series = self.series[view] = [0] * (len(self.buckets) + 2)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for view, series in sorted(self.series.items()):
+            label = f'view="{escape_label(view)}"'
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {series[-1]}')
+            lines.append(f'{self.name}_sum{{{label}}} {series[-2]}')
+            lines.append(f'{self.name}_count{{{label}}} {series[-1]}')
+        return lines
+
+
+class Counter:
+    """
+    A Prometheus counter with one series per combination of label values
+    """
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.series = {}
+
+    def inc(self, values, amount=1):
+        with _lock:
+            self.series[values] = self.series.get(values, 0) + amount
+
+    def value(self, values):
+        return self.series.get(values, 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for values, count in sorted(self.series.items()):
+            label = ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(self.labels, values))
+            lines.append(f'{self.name}{{{label}}} {count}')
+        return lines
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram(
+    'django_request_duration_seconds', 'Time to produce the response', SECONDS_BUCKETS
+)
+REQUEST_DB_TIME = Histogram(
+    'django_request_db_seconds', 'Time spent in database queries', SECONDS_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    'django_request_queries', 'Database queries per request', QUERY_BUCKETS
+)
+REQUEST_RENDER_TIME = Histogram(
+    'django_request_render_seconds', 'Time spent rendering the template response', SECONDS_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'django_response_size_bytes', 'Size of the response body', SIZE_BUCKETS
+)
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_DB_TIME, REQUEST_QUERIES, REQUEST_RENDER_TIME, RESPONSE_SIZE)
+
+# Counters added by apps (see register_counter)
+COUNTERS = []
+
+# URL name -> (seconds, statement) of the slowest query seen
+slowest_queries = {}
+
+_lock = threading.Lock()
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else '<unresolved>'
+
+
+def record_request(view, metrics, duration, size):
+    if metrics.statements is not None:
+        report_query_problems(find_query_problems(view, metrics.statements))
+    with _lock:
+        REQUEST_DURATION.observe(view, duration)
+        REQUEST_DB_TIME.observe(view, metrics.db_time)
+        REQUEST_QUERIES.observe(view, metrics.queries)
+        REQUEST_RENDER_TIME.observe(view, metrics.render_time)
+        if size is not None:
+            RESPONSE_SIZE.observe(view, size)
+        if metrics.slowest_sql is not None and metrics.slowest_time > slowest_queries.get(view, (0,))[0]:
+            slowest_queries[view] = (metrics.slowest_time, metrics.slowest_sql)
+
+
+def register_counter(counter):
+    COUNTERS.append(counter)
+    return counter
+
+
+def reset_metrics():
+    with _lock:
+        for metric in HISTOGRAMS + tuple(COUNTERS):
+            metric.series.clear()
+        slowest_queries.clear()
+
+
+def render_metrics():
+    with _lock:
+        lines = []
+        for metric in HISTOGRAMS + tuple(COUNTERS):
+            lines.extend(metric.render())
+        # Comments: ignored by Prometheus, but there for a human reading the page
+        for view, (duration, sql) in sorted(slowest_queries.items()):
+            statement = ' '.join(sql.split())[:METRICS_SQL_LENGTH]
+            lines.append(f'# slowest query {view} {duration:.6f}s: {statement}')
+    return '\n'.join(lines) + '\n'
+
+
+def server_timing(metrics, duration):
+    entries = [
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+        f'sql-max;dur={metrics.slowest_time * 1000:.1f}',
+        f'render;dur={metrics.render_time * 1000:.1f}',
+        f'total;dur={duration * 1000:.1f}',
+    ]
+    return ', '.join(entries)
+
+
+class MetricsMiddleware:
+    """
+    Add a Server-Timing header to every response and record the request in
+    the per-URL-name histograms
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_template_response(self, request, response):
+        # Called last, just before the response is rendered
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.start_render(response)
+            response.add_post_render_callback(metrics.finish_render)
+        return response
+
+    def finish(self, request, response, metrics):
+        view = get_view_name(request)
+        response.headers['Server-Timing'] = server_timing(metrics, time.perf_counter() - metrics.started)
+        if response.streaming and not response.is_async:
+            # Queries made while the body streams count too, so the request
+            # is recorded once the stream is exhausted
+            response.streaming_content = self.stream(response.streaming_content, view, metrics)
+        else:
+            size = None if response.streaming else len(response.content)
+            record_request(view, metrics, time.perf_counter() - metrics.started, size)
+        return response
+
+    def stream(self, content, view, metrics):
+        size = 0
+        content = iter(content)
+        while True:
+            token = _current.set(metrics)
+            try:
+                chunk = next(content)
+            except StopIteration:
+                break
+            finally:
+                _current.reset(token)
+            size += len(chunk)
+            yield chunk
+        record_request(view, metrics, time.perf_counter() - metrics.started, size)
+
+
+def metrics_allowed(request):
+    if METRICS_TOKEN:
+        scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(token.encode(), METRICS_TOKEN.encode())
+    return request.META.get('REMOTE_ADDR') in METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    """
+    Serve the histograms in the Prometheus text format to authorized scrapers
+    """
+    if not metrics_allowed(request):
+        raise Http404
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,127 @@
+"""
+Query inspection: repeated statements and per-URL-name query budgets.
+
+Statements are grouped after normalize_sql() replaces their parameters and
+literals, so the same query run once per row of a list (an N+1 pattern)
+shows up as one statement repeated QUERY_REPEAT_THRESHOLD times or more.
+QUERY_BUDGETS maps URL names to the most queries one request may run.
+
+Tests use QueryBudgetMixin. With QUERY_INSPECTION set to 'warn' or 'raise',
+MetricsMiddleware checks every request the same way (see
+freelancer_marketplace.metrics).
+"""
+import re
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+QUERY_INSPECTION = getattr(settings, 'QUERY_INSPECTION', None)
+QUERY_REPEAT_THRESHOLD = getattr(settings, 'QUERY_REPEAT_THRESHOLD', 3)
+
+# Transaction bookkeeping repeats by design
+IGNORED_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+_string_re = re.compile(r"'(?:[^']|'')*'")
+_number_re = re.compile(r'\b\d+(?:\.\d+)?\b')
+_placeholder_re = re.compile(r'%s|\?')
+_in_list_re = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_space_re = re.compile(r'\s+')
+
+
+class QueryInspectionWarning(RuntimeWarning):
+    pass
+
+
+class QueryInspectionError(Exception):
+    pass
+
+
+def normalize_sql(sql):
+    """
+    Return ``sql`` with its literals and placeholders replaced by ``?`` and
+    lists of them collapsed, so executions differing only in their
+    parameters compare equal
+    """
+    sql = _string_re.sub('?', sql)
+    sql = _number_re.sub('?', sql)
+    sql = _placeholder_re.sub('?', sql)
+    sql = _in_list_re.sub('(...)', sql)
+    return _space_re.sub(' ', sql).strip()
+
+
+def get_query_budget(url_name):
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(url_name)
+
+
+def repeated_statements(statements, threshold=None):
+    """
+    Return [(normalized statement, times run)] for the statements run at
+    least ``threshold`` times, most repeated first
+    """
+    threshold = threshold or QUERY_REPEAT_THRESHOLD
+    counts = Counter(
+        normalized for normalized in map(normalize_sql, statements)
+        if not normalized.upper().startswith(IGNORED_PREFIXES)
+    )
+    return [(sql, count) for sql, count in counts.most_common() if count >= threshold]
+
+
+def find_query_problems(url_name, statements, budget=None, threshold=None):
+    """
+    Describe everything wrong with the queries one request to ``url_name``
+    ran: repeated statements and going over its budget
+    """
+    problems = [
+        f'{url_name}: statement run {count} times: {sql}'
+        for sql, count in repeated_statements(statements, threshold)
+    ]
+    budget = get_query_budget(url_name) if budget is None else budget
+    if budget is not None and len(statements) > budget:
+        problems.append(f'{url_name}: {len(statements)} queries, over its budget of {budget}')
+    return problems
+
+
+def report_query_problems(problems, mode=None):
+    mode = mode or QUERY_INSPECTION
+    if not problems or not mode:
+        return
+    if mode == 'raise':
+        raise QueryInspectionError('\n'.join(problems))
+    for problem in problems:
+        warnings.warn(problem, QueryInspectionWarning)
+
+
+class QueryBudgetMixin:
+    """
+    TestCase assertions for repeated statements and query budgets
+    """
+    @contextmanager
+    def assertQueryBudget(self, url_name, budget=None, using=connection):
+        """
+        Fail if the block runs a statement QUERY_REPEAT_THRESHOLD times or
+        more queries than ``budget`` (default: QUERY_BUDGETS[url_name])
+        """
+        from django.test.utils import CaptureQueriesContext
+
+        budget = get_query_budget(url_name) if budget is None else budget
+        if budget is None:
+            self.fail(f'No query budget declared for {url_name} in QUERY_BUDGETS')
+        with CaptureQueriesContext(using) as context:
+            yield context
+        statements = [query['sql'] for query in context.captured_queries]
+        problems = find_query_problems(url_name, statements, budget)
+        if problems:
+            self.fail('\n'.join(problems + ['Queries:'] + statements))
+
+    @contextmanager
+    def assertNoRepeatedQueries(self, threshold=None, using=connection):
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(using) as context:
+            yield context
+        repeated = repeated_statements([query['sql'] for query in context.captured_queries], threshold)
+        if repeated:
+            self.fail('\n'.join(f'Statement run {count} times: {sql}' for sql, count in repeated))
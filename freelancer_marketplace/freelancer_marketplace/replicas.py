@@ -0,0 +1,203 @@
+"""
+Read replica routing.
+
+Reads go to a replica only while a view that opted in with
+``read_from_replica = True`` serves a GET or HEAD request; everything else,
+including the admin and every form post, reads from the primary. Once a
+request writes, the rest of it and the client's requests for the next
+REPLICA_PIN_SECONDS read from the primary too, so users see their own
+changes. Replicas further behind than REPLICA_MAX_LAG seconds, or not
+answering, are skipped until their next check.
+
+Streaming responses keep the request's routing while their body is
+produced, so the queries of a streamed page read from the same replica.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+# Replicas lagging more than REPLICA_MAX_LAG seconds are not used; their lag
+# is measured at most every REPLICA_CHECK_INTERVAL seconds per process
+REPLICA_MAX_LAG = getattr(settings, 'REPLICA_MAX_LAG', 5)
+REPLICA_CHECK_INTERVAL = getattr(settings, 'REPLICA_CHECK_INTERVAL', 5)
+# Seconds a client reads from the primary after a request of theirs wrote
+REPLICA_PIN_SECONDS = getattr(settings, 'REPLICA_PIN_SECONDS', 15)
+REPLICA_PIN_COOKIE = getattr(settings, 'REPLICA_PIN_COOKIE', 'primary_pin')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class RoutingState:
+    """
+    Per-request routing decisions; ``alias`` is the replica chosen for the
+    request, None to read from the primary
+    """
+    def __init__(self):
+        self.alias = None
+        self.wrote = False
+
+
+_state = ContextVar('replica_routing', default=None)
+
+# alias -> (checked at, lag in seconds or None when unreachable)
+_lag_checks = {}
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def measure_lag(alias):
+    """
+    Return how many seconds ``alias`` is behind the primary, or None if it
+    cannot be reached
+    """
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        connection.close()
+        return None
+
+
+def replica_lag(alias):
+    checked_at, lag = _lag_checks.get(alias, (None, None))
+    now = time.monotonic()
+    if checked_at is None or now - checked_at >= REPLICA_CHECK_INTERVAL:
+        lag = measure_lag(alias)
+        _lag_checks[alias] = (now, lag)
+    return lag
+
+
+def healthy_replicas():
+    return [
+        alias for alias in get_replicas()
+        if (lag := replica_lag(alias)) is not None and lag <= REPLICA_MAX_LAG
+    ]
+
+
+def choose_replica():
+    replicas = healthy_replicas()
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaRouter:
+    """
+    Send a request's reads to the replica picked by ReplicaMiddleware
+    """
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.wrote:
+            return None
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        return db not in get_replicas()
+
+
+class ReplicaMiddleware:
+    """
+    Pick a replica for GET/HEAD requests to views with
+    ``read_from_replica = True`` and pin clients to the primary after they
+    write
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response, state)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        view_class = getattr(view_func, 'view_class', None)
+        if (
+            state is not None and get_replicas()
+            and request.method in SAFE_METHODS
+            and getattr(view_class, 'read_from_replica', False)
+            and REPLICA_PIN_COOKIE not in request.COOKIES
+        ):
+            state.alias = choose_replica()
+
+    def finish(self, request, response, state):
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1', max_age=REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax', secure=request.is_secure()
+            )
+        if response.streaming:
+            # The body is produced after the view returned, outside the
+            # routing set up for the request
+            stream = self.astream if response.is_async else self.stream
+            response.streaming_content = stream(response.streaming_content, state)
+        return response
+
+    def stream(self, content, state):
+        content = iter(content)
+        while True:
+            token = _state.set(state)
+            try:
+                chunk = next(content)
+            except StopIteration:
+                break
+            finally:
+                _state.reset(token)
+            yield chunk
+
+    async def astream(self, content, state):
+        content = aiter(content)
+        while True:
+            token = _state.set(state)
+            try:
+                chunk = await anext(content)
+            except StopAsyncIteration:
+                break
+            finally:
+                _state.reset(token)
+            yield chunk
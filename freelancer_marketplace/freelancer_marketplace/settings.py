@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -20,13 +21,17 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Local apps
     'accounts',
     'jobs',
 ]
 
 MIDDLEWARE = [
+    # First, so it times the whole request (see freelancer_marketplace.metrics)
+    'freelancer_marketplace.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'freelancer_marketplace.replicas.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -76,6 +81,125 @@ DATABASES = {
     }
 }
 
+# Read replicas: DB_REPLICA_HOSTS is a comma separated list of host[:port]
+# serving copies of the primary. DB_REPLICA_NAME overrides the database name,
+# e.g. to try the routing against a second database on the same server.
+DATABASE_REPLICAS = []
+for index, replica_host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+    replica_host, replica_port = replica_host.strip().partition(':')[::2]
+    DATABASES[f'replica{index}'] = dict(
+        DATABASES['default'],
+        NAME=os.environ.get('DB_REPLICA_NAME', DB_NAME),
+        HOST=replica_host,
+        PORT=replica_port or DB_PORT,
+        # Tests read the replicas through the test database's connection
+        TEST={'MIRROR': 'default'},
+    )
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['freelancer_marketplace.replicas.ReplicaRouter']
+
+# Replica routing (see freelancer_marketplace.replicas): replicas more than
+# REPLICA_MAX_LAG seconds behind are skipped, lag is measured every
+# REPLICA_CHECK_INTERVAL seconds, and clients read from the primary for
+# REPLICA_PIN_SECONDS after a request of theirs wrote
+REPLICA_MAX_LAG = 5
+REPLICA_CHECK_INTERVAL = 5
+REPLICA_PIN_SECONDS = 15
+
+# Request metrics (see freelancer_marketplace.metrics): the bearer token
+# scrapers send to read /metrics or, without one, the addresses allowed to
+# read it (behind a local reverse proxy every client looks local, so set the
+# token), and characters kept of each URL name's slowest query
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+METRICS_SQL_LENGTH = 500
+
+# Query inspection (see freelancer_marketplace.queries): 'warn' or 'raise'
+# when a request repeats a statement QUERY_REPEAT_THRESHOLD times or runs
+# more queries than its URL name's budget. The budgets count a logged-in
+# request with cold caches; jobs/tests/test_query_budgets.py checks them.
+QUERY_INSPECTION = 'warn' if DEBUG else None
+QUERY_REPEAT_THRESHOLD = 3
+QUERY_BUDGETS = {
+    'jobs:job_list': 8,
+    'jobs:job_search': 9,
+    'jobs:job_facets': 3,
+    'jobs:skill_autocomplete': 1,
+    'jobs:job_detail': 10,
+    'jobs:job_create': 4,
+    'jobs:job_update': 6,
+    'jobs:job_delete': 3,
+    'jobs:my_jobs': 4,
+    'jobs:job_applications': 6,
+    'jobs:job_apply': 4,
+    'jobs:my_applications': 4,
+    'jobs:update_application_status': 4,
+    'jobs:withdraw_application': 4,
+    'jobs:category_detail': 5,
+    'register': 0,
+    'profile_setup': 3,
+    'login': 0,
+    'logout': 4,
+    'password_reset': 0,
+    'password_reset_done': 0,
+    'password_reset_confirm': 5,
+    'password_reset_complete': 0,
+    'profile': 3,
+    'edit_profile': 3,
+}
+
+# Cache
+# The search generation, reference version and hirer versions kept here are
+# bumped by management commands as well as by web workers, so every process
+# must see the same cache. Files on the local disk by default; with servers
+# on several hosts, point CACHE_BACKEND/CACHE_LOCATION at a shared backend,
+# e.g. django.core.cache.backends.redis.RedisCache and redis://host:6379.
+# A process-local backend (LocMemCache) fails the jobs.E001 system check.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get(
+            'CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'freelancer-marketplace-cache')
+        ),
+    }
+}
+
+# Job search result cache (see jobs.cache)
+JOB_SEARCH_CACHE_ALIAS = 'default'
+JOB_SEARCH_CACHE_TIMEOUT = 300
+
+# Seconds before each process reloads its skill autocomplete index (see jobs.autocomplete)
+JOB_SKILL_INDEX_MAX_AGE = 300
+
+# Process-local category and skill lookups (see jobs.reference): seconds
+# between checks of the shared version token, and how many skills to hold
+JOB_REFERENCE_CACHE_ALIAS = 'default'
+JOB_REFERENCE_CHECK_INTERVAL = 1
+JOB_REFERENCE_HOT_SKILLS = 1000
+
+# Rendered job cards and job detail sections (see jobs.fragments); keys are
+# versioned, so the timeout only bounds memory use
+JOB_FRAGMENT_CACHE_ALIAS = 'default'
+JOB_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Related jobs (see jobs.related): jobs stored per job, and the rarest skills
+# and newest jobs per match scored when one job's list is refreshed
+JOB_RELATED_JOBS_LIMIT = 5
+JOB_RELATED_CANDIDATE_SKILLS = 3
+JOB_RELATED_CANDIDATE_LIMIT = 500
+
+# Read-only JSON API (see jobs.api): default and largest page size, and rows
+# read from the database per round trip while a page is streamed
+JOB_API_PAGE_SIZE = 50
+JOB_API_MAX_PAGE_SIZE = 1000
+JOB_API_CHUNK_SIZE = 200
+
+# Serve the public job pages with the async views (see jobs.async_views);
+# asgi.py turns this on
+JOB_ASYNC_VIEWS = os.environ.get('JOB_ASYNC_VIEWS') == '1'
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -1,6 +1,29 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
 from django.utils.translation import gettext_lazy as _
 from .models import Category, Skill, Job, JobApplication
+from .search import search_jobs
+from .reference import reference_data
+
+
+class CategoryListFilter(admin.SimpleListFilter):
+    """
+    Category filter listing the categories held by the reference cache
+    """
+    title = _("category")
+    parameter_name = "category__id__exact"
+
+    def lookups(self, request, model_admin):
+        return [(category.pk, category.name) for category in reference_data.categories()]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            return queryset.filter(category_id=int(self.value()))
+        except ValueError as e:
+            raise IncorrectLookupParameters(e)
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -10,15 +33,16 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
-    list_display = ("name", "slug")
+    list_display = ("name", "slug", "published_job_count")
     prepopulated_fields = {"slug": ("name",)}
     search_fields = ("name",)
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     list_display = ("title", "hirer", "status", "category", "created_at", "deadline", "is_public")
-    list_filter = ("status", "category", "experience_level", "is_remote", "is_public")
-    search_fields = ("title", "description", "hirer__username", "hirer__email")
+    list_filter = ("status", CategoryListFilter, "experience_level", "is_remote", "is_public")
+    # Title and description are matched through the full-text search document
+    search_fields = ("hirer__username", "hirer__email")
     date_hierarchy = "created_at"
     filter_horizontal = ("skills",)
     readonly_fields = ("created_at", "updated_at")
@@ -46,6 +70,12 @@ class JobAdmin(admin.ModelAdmin):
             return qs
         # Regular staff users can only see jobs they created if they are hirers
         return qs.filter(hirer=request.user)
+    
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            results = results | search_jobs(queryset, search_term, rank=False)
+        return results, may_have_duplicates
 
 @admin.register(JobApplication)
 class JobApplicationAdmin(admin.ModelAdmin):
@@ -0,0 +1,260 @@
+"""
+Read-only JSON API for published jobs, categories and skills.
+
+List endpoints take ``fields=`` (comma separated) to choose the serialized
+fields, ``limit=`` for the page size and ``cursor=`` to continue from the
+``next`` token of the previous page. Jobs accept every JobSearchForm filter.
+Pages are serialized while the rows are read from the database and
+streamed, so memory does not grow with ``limit``.
+"""
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.generic import View
+
+from .forms import JobSearchForm
+from .models import Job, Skill
+from .pagination import NEXT, CursorPaginator, InvalidCursor, decode_cursor
+from .reference import reference_data
+from .search import apply_job_search
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Default and largest page size, and rows fetched per database round trip
+API_PAGE_SIZE = getattr(settings, 'JOB_API_PAGE_SIZE', 50)
+API_MAX_PAGE_SIZE = getattr(settings, 'JOB_API_MAX_PAGE_SIZE', 1000)
+API_CHUNK_SIZE = getattr(settings, 'JOB_API_CHUNK_SIZE', 200)
+
+JSON_CONTENT_TYPE = 'application/json'
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(value):
+    """
+    Encode ``value`` as compact UTF-8 JSON bytes, with orjson when it is
+    installed; the json fallback produces the same bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+# ``columns`` are the model fields the value is read from; ``get`` builds it
+ApiField = namedtuple('ApiField', 'columns get')
+
+
+def _category_slug(job):
+    category = reference_data.category(job.category_id)
+    return category.slug if category is not None else None
+
+
+JOB_FIELDS = {
+    'id': ApiField(['id'], lambda job: job.pk),
+    'url': ApiField(['id'], lambda job: reverse('jobs:job_detail', args=[job.pk])),
+    'title': ApiField(['title'], lambda job: job.title),
+    'excerpt': ApiField(['excerpt'], lambda job: job.excerpt),
+    'description': ApiField(['description'], lambda job: job.description),
+    'category': ApiField(['category'], _category_slug),
+    'skills': ApiField([], lambda job: [
+        {'id': skill.pk, 'name': skill.name} for skill in job.skills.all()
+    ]),
+    'budget_min': ApiField(['budget_min'], lambda job: job.budget_min),
+    'budget_max': ApiField(['budget_max'], lambda job: job.budget_max),
+    'fixed_budget': ApiField(['fixed_budget'], lambda job: job.fixed_budget),
+    'duration': ApiField(['duration'], lambda job: job.duration),
+    'deadline': ApiField(['deadline'], lambda job: job.deadline),
+    'is_remote': ApiField(['is_remote'], lambda job: job.is_remote),
+    'location': ApiField(['location'], lambda job: job.location),
+    'experience_level': ApiField(['experience_level'], lambda job: job.experience_level),
+    'created_at': ApiField(['created_at'], lambda job: job.created_at),
+    'updated_at': ApiField(['updated_at'], lambda job: job.updated_at),
+}
+
+SKILL_FIELDS = {
+    'id': ApiField(['id'], lambda skill: skill.pk),
+    'name': ApiField(['name'], lambda skill: skill.name),
+    'slug': ApiField(['slug'], lambda skill: skill.slug),
+    'job_count': ApiField(['published_job_count'], lambda skill: skill.published_job_count),
+}
+
+CATEGORY_FIELDS = {
+    'id': ApiField(['id'], lambda category: category.pk),
+    'name': ApiField(['name'], lambda category: category.name),
+    'slug': ApiField(['slug'], lambda category: category.slug),
+    'url': ApiField(['slug'], lambda category: category.get_absolute_url()),
+}
+
+
+def error_response(errors, status=400):
+    return HttpResponse(dumps({'errors': errors}), status=status, content_type=JSON_CONTENT_TYPE)
+
+
+class InvalidRequest(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+class ApiListView(View):
+    """
+    Stream a cursor-paginated list as ``{"data": [...], "next": ...}``.
+
+    Subclasses set ``fields`` (name -> ApiField) and ``default_fields``, and
+    implement get_queryset(). Rows are read with iterator() in chunks of
+    API_CHUNK_SIZE and prepare_chunk() loads related data one chunk at a
+    time, so a page costs a fixed number of queries per chunk.
+    """
+    http_method_names = ['get', 'head', 'options']
+    read_from_replica = True
+    fields = {}
+    default_fields = ()
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_fields(self):
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return list(self.default_fields)
+        names = list(dict.fromkeys(name.strip() for name in requested.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise InvalidRequest({'fields': [f'Unknown field: {name}' for name in unknown] or ['No fields']})
+        return names
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', API_PAGE_SIZE))
+        except ValueError:
+            raise InvalidRequest({'limit': ['Enter a whole number.']})
+        return max(1, min(limit, API_MAX_PAGE_SIZE))
+
+    def get_cursor(self):
+        cursor = self.request.GET.get('cursor')
+        # Pages are streamed forwards only, so only "next" tokens are accepted
+        if cursor and decode_cursor(cursor)[0] != NEXT:
+            raise InvalidCursor('Invalid cursor')
+        return cursor
+
+    def load_only(self, queryset, names, paginator):
+        columns = {queryset.model._meta.pk.name}
+        for name in names:
+            columns.update(self.fields[name].columns)
+        columns.update(key.name for key in paginator.sort_keys if key.field is not None)
+        return queryset.only(*columns)
+
+    def prepare_chunk(self, objects, names):
+        pass
+
+    def serialize(self, obj, names):
+        return {name: self.fields[name].get(obj) for name in names}
+
+    def get_next_url(self, cursor):
+        params = self.request.GET.copy()
+        params['cursor'] = cursor
+        return self.request.build_absolute_uri('?' + params.urlencode())
+
+    def stream(self, queryset, paginator, names):
+        limit = paginator.per_page
+        yield b'{"data":['
+        count, last = 0, None
+        rows = iter(queryset.iterator(chunk_size=API_CHUNK_SIZE))
+        while count < limit:
+            chunk = list(islice(rows, min(API_CHUNK_SIZE, limit - count)))
+            if not chunk:
+                break
+            self.prepare_chunk(chunk, names)
+            encoded = b','.join(dumps(self.serialize(obj, names)) for obj in chunk)
+            yield (b',' if count else b'') + encoded
+            count += len(chunk)
+            last = chunk[-1]
+        # The page queryset fetches one row more than the limit
+        has_more = count == limit and next(rows, None) is not None
+        next_url = self.get_next_url(paginator.cursor_for(last)) if has_more else None
+        yield b'],"next":' + dumps(next_url) + b'}'
+
+    def get(self, request, *args, **kwargs):
+        try:
+            names = self.get_fields()
+            limit = self.get_limit()
+            cursor = self.get_cursor()
+            queryset = self.get_queryset()
+            paginator = CursorPaginator(queryset, limit)
+            page = paginator.page_queryset(cursor)
+        except InvalidRequest as e:
+            return error_response(e.errors)
+        except InvalidCursor:
+            return error_response({'cursor': ['Invalid cursor']})
+
+        page = self.load_only(page, names, paginator)
+        return StreamingHttpResponse(self.stream(page, paginator, names), content_type=JSON_CONTENT_TYPE)
+
+
+class JobApiView(ApiListView):
+    """
+    Published public jobs, filtered and ordered like the job search page
+    """
+    fields = JOB_FIELDS
+    default_fields = (
+        'id', 'url', 'title', 'excerpt', 'category', 'skills', 'budget_min', 'budget_max',
+        'fixed_budget', 'is_remote', 'location', 'experience_level', 'deadline', 'created_at',
+    )
+
+    def get_queryset(self):
+        form = JobSearchForm(self.request.GET)
+        if not form.is_valid():
+            raise InvalidRequest(form.errors.get_json_data())
+        queryset = Job.objects.open().filter(is_public=True)
+        return apply_job_search(queryset, form.cleaned_data)
+
+    def prepare_chunk(self, jobs, names):
+        if 'skills' in names:
+            prefetch_related_objects(jobs, Prefetch('skills', queryset=Skill.objects.only('pk', 'name')))
+
+
+class SkillApiView(ApiListView):
+    """
+    All skills, in name order
+    """
+    fields = SKILL_FIELDS
+    default_fields = ('id', 'name', 'slug', 'job_count')
+
+    def get_queryset(self):
+        return Skill.objects.order_by('name')
+
+
+class CategoryApiView(View):
+    """
+    All categories, served from the reference cache
+    """
+    http_method_names = ['get', 'head', 'options']
+    read_from_replica = True
+
+    def get(self, request, *args, **kwargs):
+        requested = request.GET.get('fields')
+        names = [name.strip() for name in requested.split(',')] if requested else list(CATEGORY_FIELDS)
+        unknown = [name for name in names if name not in CATEGORY_FIELDS]
+        if unknown:
+            return error_response({'fields': [f'Unknown field: {name}' for name in unknown]})
+        data = [
+            {name: CATEGORY_FIELDS[name].get(category) for name in names}
+            for category in reference_data.categories()
+        ]
+        return HttpResponse(dumps({'data': data}), content_type=JSON_CONTENT_TYPE)
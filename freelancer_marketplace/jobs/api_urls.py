@@ -0,0 +1,10 @@
+from django.urls import path
+from . import api
+
+app_name = 'api_v1'
+
+urlpatterns = [
+    path('jobs/', api.JobApiView.as_view(), name='job_list'),
+    path('categories/', api.CategoryApiView.as_view(), name='category_list'),
+    path('skills/', api.SkillApiView.as_view(), name='skill_list'),
+]
@@ -7,4 +7,5 @@ class JobsConfig(AppConfig):
     verbose_name = 'Job Management'
 
     def ready(self):
+        import jobs.checks  # noqa
         import jobs.signals  # noqa
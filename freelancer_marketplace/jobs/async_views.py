@@ -0,0 +1,139 @@
+"""
+Async versions of the public job browsing views, routed instead of the
+synchronous ones when JOB_ASYNC_VIEWS is set (asgi.py turns it on).
+
+Rows are read with the async ORM and the queries a page needs that do not
+depend on each other are awaited together. Django 4.2 still runs each query
+in the request's sync executor thread, so the gain is not holding a worker
+thread per request while the page waits; template rendering, fragment and
+form helpers are shared with the sync views and run through sync_to_async.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+
+from .models import Job
+from .reference import reference_data
+from .related import get_related_jobs
+from .views import JobListView, JobDetailView, CategoryDetailView
+
+
+async def alist(queryset):
+    return [obj async for obj in queryset.aiterator()]
+
+
+async def aload_user(request):
+    """
+    Resolve the lazy request.user (a session and a user query) off the event
+    loop, so the rest of the view can read it
+    """
+    await sync_to_async(lambda: request.user.is_authenticated)()
+
+
+class AsyncConditionalGetMixin:
+    """
+    Async get() for ConditionalGetMixin views: validators are checked
+    before the page is built, and the page is built from data gathered by
+    aload_page_data() and passed to the shared sync get_context_data()
+    """
+    async def aload_validation_data(self):
+        pass
+
+    async def aload_page_data(self):
+        pass
+
+    async def get(self, request, *args, **kwargs):
+        await aload_user(request)
+        await self.aload_validation_data()
+        etag, last_modified = await sync_to_async(self.get_validators)()
+        response = self.get_not_modified(etag, last_modified)
+        if response is None:
+            await self.aload_page_data()
+            context = await sync_to_async(self.get_context_data)()
+            response = self.render_to_response(context)
+        return self.add_validator_headers(response, etag, last_modified)
+
+
+class AsyncListPageMixin(AsyncConditionalGetMixin):
+    """
+    Builds the list queryset, then fetches the page alongside the view's
+    other context queries
+    """
+    async def aload_validation_data(self):
+        # Validating the search form may rebuild the reference cache
+        self.object_list = await sync_to_async(self.get_queryset)()
+
+    async def aget_extra_context(self):
+        return {}
+
+    async def aload_page_data(self):
+        page_size = self.get_paginate_by(self.object_list)
+        self.page_result, self.extra_context_data = await asyncio.gather(
+            self.apaginate_queryset(self.object_list, page_size),
+            self.aget_extra_context()
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        return self.page_result
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.extra_context_data)
+        return context
+
+
+class AsyncJobListView(AsyncListPageMixin, JobListView):
+    """
+    JobListView for ASGI: the page, its count, the facets and the popular
+    skills are fetched concurrently
+    """
+    async def aget_extra_context(self):
+        facets, popular_skills, categories = await asyncio.gather(
+            sync_to_async(super().get_facets)(),
+            alist(super().get_popular_skills()),
+            sync_to_async(reference_data.categories)(),
+        )
+        return {'facets': facets, 'popular_skills': popular_skills, 'categories': categories}
+
+    def get_facets(self):
+        return self.extra_context_data['facets']
+
+    def get_popular_skills(self):
+        return self.extra_context_data['popular_skills']
+
+
+class AsyncCategoryDetailView(AsyncListPageMixin, CategoryDetailView):
+    """
+    CategoryDetailView for ASGI: the page, its count and the category's
+    popular skills are fetched concurrently
+    """
+    async def aget_extra_context(self):
+        return {'popular_skills': await alist(super().get_popular_skills())}
+
+    def get_popular_skills(self):
+        return self.extra_context_data['popular_skills']
+
+
+class AsyncJobDetailView(AsyncConditionalGetMixin, JobDetailView):
+    """
+    JobDetailView for ASGI: after the job, its related jobs, the viewer's
+    application and the reference data are fetched concurrently
+    """
+    async def aget_user_has_applied(self):
+        if not self.viewer_can_apply():
+            return None
+        return await self.get_application_queryset().aexists()
+
+    async def aload_validation_data(self):
+        try:
+            job = await self.get_queryset().aget(pk=self.kwargs.get(self.pk_url_kwarg))
+        except Job.DoesNotExist:
+            raise Http404(_('No job found matching the query'))
+        self.object = job
+        self.related_jobs, self.user_has_applied, _job = await asyncio.gather(
+            alist(get_related_jobs(job)),
+            self.aget_user_has_applied(),
+            sync_to_async(self.attach_category)(job),
+        )
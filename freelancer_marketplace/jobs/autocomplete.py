@@ -0,0 +1,109 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+from .models import Skill
+from .reference import reference_data
+
+# Seconds before a process reloads its skill index even if the reference
+# data version has not changed
+SKILL_INDEX_MAX_AGE = getattr(settings, 'JOB_SKILL_INDEX_MAX_AGE', 300)
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+class SkillIndex:
+    """
+    Process-local index of skill names for autocomplete.
+
+    Names are kept in a sorted list, and so is every word of every name, so
+    prefix matches are binary searches. Substring matches fall back to a
+    scan. The index is rebuilt lazily after invalidate(), when the shared
+    reference data version changes or once it is older than ``max_age``
+    seconds.
+    """
+    def __init__(self, max_age=SKILL_INDEX_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._state = None
+
+    def invalidate(self):
+        self._state = None
+
+    def _build(self):
+        skills = sorted(
+            (normalize(name), -popularity, name, pk)
+            for pk, name, popularity in Skill.objects.values_list('pk', 'name', 'published_job_count')
+        )
+        names = [skill[0] for skill in skills]
+        words = sorted(
+            (word, position)
+            for position, skill in enumerate(skills)
+            for word in skill[0].split()[1:]
+        )
+        return time.monotonic(), skills, names, words
+
+    def _is_stale(self, state, version):
+        return state is None or state[0] != version or time.monotonic() - state[1][0] > self.max_age
+
+    def _load(self):
+        version = reference_data.version()
+        state = self._state
+        if self._is_stale(state, version):
+            with self._lock:
+                state = self._state
+                if self._is_stale(state, version):
+                    state = self._state = (version, self._build())
+        return state[1]
+
+    def search(self, q, limit=10):
+        """
+        Return up to ``limit`` (pk, name) pairs: name prefix matches first,
+        then word prefix matches, then substring matches, the most popular
+        skills first within each group
+        """
+        q = normalize(q)
+        if not q or limit <= 0:
+            return []
+        built_at, skills, names, words = self._load()
+
+        positions = []
+        start = bisect_left(names, q)
+        for position in range(start, len(names)):
+            if not names[position].startswith(q):
+                break
+            positions.append(position)
+        groups = [positions]
+
+        if len(positions) < limit:
+            found = set(positions)
+            positions = []
+            for index in range(bisect_left(words, (q,)), len(words)):
+                word, position = words[index]
+                if not word.startswith(q):
+                    break
+                if position not in found:
+                    found.add(position)
+                    positions.append(position)
+            groups.append(positions)
+
+            if len(found) < limit:
+                groups.append([
+                    position for position, name in enumerate(names)
+                    if q in name and position not in found
+                ])
+
+        results = []
+        for positions in groups:
+            ranked = sorted(positions, key=lambda position: skills[position][1:3])
+            results.extend(skills[position] for position in ranked[:limit - len(results)])
+            if len(results) >= limit:
+                break
+        return [(pk, name) for key, popularity, name, pk in results]
+
+
+skill_index = SkillIndex()
@@ -0,0 +1,283 @@
+"""
+Route benchmark: a weighted mix of anonymous, freelancer and hirer traffic
+replayed against a server running on a database filled by seed_marketplace
+(see the benchmark_routes command).
+
+The seeded users are logged in by writing their sessions directly, the way
+the test client's force_login() does, so no login request is needed. Only
+GET pages are requested, so a run leaves the data as it found it and runs
+stay comparable. Queries per request come from the Server-Timing header
+MetricsMiddleware adds.
+
+Results are compared per URL name with a baseline file: a run fails when a
+latency percentile or the throughput gets worse by more than the tolerance,
+or when a page runs more queries than it used to.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+from contextlib import contextmanager
+from importlib import import_module
+from statistics import mean
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.urls import reverse
+
+from accounts.models import User
+from .loadgen import Request, wait_for_server
+from .models import Job, Category, Skill
+from .seed import seed_email
+
+# {port} and {workers} are filled in; the WSGI server serves the sync views
+# and the ASGI server the async ones (see JOB_ASYNC_VIEWS)
+WSGI_COMMAND = (
+    'gunicorn freelancer_marketplace.wsgi:application --bind 127.0.0.1:{port} '
+    '--workers {workers} --threads 1'
+)
+ASGI_COMMAND = (
+    'uvicorn freelancer_marketplace.asgi:application --host 127.0.0.1 --port {port} '
+    '--workers {workers} --no-access-log'
+)
+
+ANONYMOUS = 'anonymous'
+FREELANCER = User.Role.FREELANCER
+HIRER = User.Role.HIRER
+
+# (role, URL name, weight): who requests which page, and how often. Only
+# pages that render: the application pages have no templates yet.
+TRAFFIC_MIX = [
+    (ANONYMOUS, 'jobs:job_list', 25),
+    (ANONYMOUS, 'jobs:job_search', 10),
+    (ANONYMOUS, 'jobs:job_facets', 3),
+    (ANONYMOUS, 'jobs:skill_autocomplete', 5),
+    (ANONYMOUS, 'jobs:job_detail', 20),
+    (ANONYMOUS, 'jobs:category_detail', 5),
+    (FREELANCER, 'jobs:job_list', 5),
+    (FREELANCER, 'jobs:job_detail', 8),
+    (FREELANCER, 'profile', 1),
+    (HIRER, 'jobs:my_jobs', 5),
+    (HIRER, 'jobs:job_update', 1),
+    (HIRER, 'jobs:job_create', 1),
+    (HIRER, 'profile', 1),
+]
+
+# Newest open jobs that anonymous and freelancer traffic is spread over
+JOB_SAMPLE_SIZE = 500
+
+# Allowed slowdown before a run fails, when the caller gives none
+DEFAULT_TOLERANCE = 0.2
+# Latency changes smaller than this (ms) are noise, whatever the ratio
+DEFAULT_MIN_DELTA_MS = 5
+# Increase in mean queries per request that fails a run
+QUERY_TOLERANCE = 0.5
+# Latency and throughput are compared for routes with at least this many
+# requests in both runs; percentiles of fewer are noise
+MIN_REQUESTS = 30
+
+_queries_re = re.compile(r'desc="(\d+) queries"')
+
+
+@contextmanager
+def running_server(argv, base_url, ready_path='/', **env):
+    """
+    Start the server ``argv`` in the project directory with ``env`` added to
+    the environment, wait until it answers ``ready_path`` and stop it on
+    exit. Raises TimeoutError if it never answers.
+    """
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE),
+        **env
+    )
+    server = subprocess.Popen(argv, cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_for_server(base_url, ready_path))
+        yield server
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def session_cookie(user):
+    """
+    Log ``user`` in by saving a session for them; return the Cookie header
+    value that sends it
+    """
+    store = import_module(settings.SESSION_ENGINE).SessionStore()
+    store[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    store.save()
+    return f'{settings.SESSION_COOKIE_NAME}={store.session_key}'
+
+
+class TrafficBuilder:
+    """
+    Turn TRAFFIC_MIX into a shuffled list of loadgen Requests labelled with
+    their URL name; the same seed gives the same list
+    """
+    def __init__(self, prefix='seed', users=20, seed=0, mix=TRAFFIC_MIX):
+        self.prefix = prefix
+        self.users = users
+        self.random = random.Random(seed)
+        self.mix = mix
+
+    def load(self):
+        self.accounts = {}
+        for role in (FREELANCER, HIRER):
+            emails = [seed_email(self.prefix, role, number) for number in range(self.users)]
+            self.accounts[role] = list(User.objects.filter(email__in=emails).order_by('pk'))
+            if not self.accounts[role]:
+                raise ValueError(
+                    f'No seeded {role.lower()}s with prefix {self.prefix!r}; run seed_marketplace first'
+                )
+        self.cookies = {
+            user.pk: session_cookie(user) for accounts in self.accounts.values() for user in accounts
+        }
+
+        self.job_ids = list(
+            Job.objects.open().filter(is_public=True).order_by('-created_at', '-id')
+            .values_list('pk', flat=True)[:JOB_SAMPLE_SIZE]
+        )
+        if not self.job_ids:
+            raise ValueError('No open jobs to request; run seed_marketplace first')
+        self.category_ids = list(Category.objects.order_by('pk').values_list('pk', flat=True))
+        self.category_slugs = list(Category.objects.order_by('pk').values_list('slug', flat=True))
+        skills = Skill.objects.order_by('-published_job_count', 'pk')[:50]
+        self.skill_ids = [skill.pk for skill in skills]
+        self.search_terms = [skill.name.split()[0].lower() for skill in skills]
+
+        hirer_ids = [user.pk for user in self.accounts[HIRER]]
+        self.hirer_jobs = {pk: [] for pk in hirer_ids}
+        for hirer_id, job_id in Job.objects.filter(hirer_id__in=hirer_ids).order_by('pk').values_list(
+            'hirer_id', 'pk'
+        ):
+            self.hirer_jobs[hirer_id].append(job_id)
+
+    def path(self, url_name, user):
+        choice = self.random.choice
+        if url_name == 'jobs:job_list':
+            return reverse(url_name) + choice([
+                '', '', '?sort=-budget_max', f'?category={choice(self.category_ids)}' if self.category_ids else '',
+            ])
+        if url_name in ('jobs:job_search', 'jobs:job_facets'):
+            query = f'?q={choice(self.search_terms)}' if self.search_terms else '?q=job'
+            if url_name == 'jobs:job_search' and self.random.random() < 0.3 and self.skill_ids:
+                query += f'&skills={choice(self.skill_ids)}'
+            return reverse(url_name) + query
+        if url_name == 'jobs:skill_autocomplete':
+            return reverse(url_name) + f'?q={choice(self.search_terms or ["a"])[:2]}'
+        if url_name == 'jobs:job_detail':
+            return reverse(url_name, args=[choice(self.job_ids)])
+        if url_name == 'jobs:category_detail':
+            return reverse(url_name, args=[choice(self.category_slugs)])
+        if url_name == 'jobs:job_update':
+            return reverse(url_name, args=[choice(self.hirer_jobs[user.pk])])
+        return reverse(url_name)
+
+    def accounts_for(self, role, url_name):
+        """
+        The users of ``role`` who can open ``url_name``
+        """
+        if url_name == 'jobs:job_update':
+            return [user for user in self.accounts[role] if self.hirer_jobs[user.pk]]
+        return self.accounts[role]
+
+    def build(self, count=2000):
+        self.load()
+        mix = [
+            (role, url_name, weight) for role, url_name, weight in self.mix
+            if (role == ANONYMOUS or self.accounts_for(role, url_name))
+            and (url_name != 'jobs:category_detail' or self.category_slugs)
+        ]
+        requests = []
+        for role, url_name, weight in self.random.choices(mix, [entry[2] for entry in mix], k=count):
+            if role == ANONYMOUS:
+                requests.append(Request(self.path(url_name, None), None, url_name))
+                continue
+            user = self.random.choice(self.accounts_for(role, url_name))
+            requests.append(Request(self.path(url_name, user), {'Cookie': self.cookies[user.pk]}, url_name))
+        return requests
+
+
+def queries_per_request(result):
+    """
+    Mean number of queries from the Server-Timing headers a run captured
+    """
+    counts = []
+    for path, headers in result.headers:
+        match = _queries_re.search(headers.get('server-timing', ''))
+        if match:
+            counts.append(int(match.group(1)))
+    return mean(counts) if counts else None
+
+
+def summarize(result):
+    """
+    Per URL name figures of a run, as stored in the baseline file
+    """
+    routes = {}
+    for url_name, route_result in sorted(result.by_label.items()):
+        summary = route_result.summary()
+        summary['queries'] = queries_per_request(route_result)
+        routes[url_name] = summary
+    return {'total': result.summary(), 'routes': routes}
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as stream:
+        return json.load(stream)
+
+
+def save_baseline(path, results, settings_used):
+    with open(path, 'w', encoding='utf-8') as stream:
+        json.dump(dict(results, settings=settings_used), stream, indent=2, sort_keys=True)
+        stream.write('\n')
+
+
+def failed_statuses(summary):
+    # JSON turns the status codes into strings
+    return {str(status) for status in summary['statuses'] if not 200 <= int(status) < 400}
+
+
+def failures(results):
+    """
+    Describe every route that answered with an error: a failing page is
+    never a baseline to compare with
+    """
+    return [
+        f'{url_name}: statuses {summary["statuses"]}, {summary["errors"]} errors'
+        for url_name, summary in sorted(results['routes'].items())
+        if failed_statuses(summary) or summary['errors']
+    ]
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    Describe every way ``results`` are worse than ``baseline``
+    """
+    regressions = failures(results)
+    for url_name, old in sorted(baseline.get('routes', {}).items()):
+        new = results['routes'].get(url_name)
+        if new is None or not new['requests']:
+            regressions.append(f'{url_name}: not requested in this run')
+            continue
+        if min(old['requests'], new['requests']) >= MIN_REQUESTS:
+            for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+                if new[key] > old[key] * (1 + tolerance) and new[key] - old[key] > min_delta_ms:
+                    regressions.append(f'{url_name}: {key} {old[key]:.1f} -> {new[key]:.1f}')
+            if new['requests_per_second'] < old['requests_per_second'] * (1 - tolerance):
+                regressions.append(
+                    f'{url_name}: requests/s {old["requests_per_second"]:.1f} -> {new["requests_per_second"]:.1f}'
+                )
+        if old.get('queries') is not None and new.get('queries') is not None \
+                and new['queries'] > old['queries'] + QUERY_TOLERANCE:
+            regressions.append(f'{url_name}: queries {old["queries"]:.1f} -> {new["queries"]:.1f}')
+    return regressions
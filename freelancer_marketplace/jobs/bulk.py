@@ -0,0 +1,502 @@
+import csv
+import json
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from accounts.models import User
+from .autocomplete import skill_index
+from .cache import invalidate_search_cache
+from .models import Job, JobApplication, Category, Skill
+from .popularity import adjust_counts_for_jobs
+from .reference import reference_data
+from .search import update_search_document
+
+# Supported file formats
+FORMAT_JSONL = 'jsonl'
+FORMAT_CSV = 'csv'
+FORMATS = (FORMAT_JSONL, FORMAT_CSV)
+
+# Skill names within a CSV cell
+SKILL_SEPARATOR = '|'
+
+# Exported columns, in order
+JOB_FIELDS = [
+    'id', 'title', 'description', 'hirer', 'status', 'category', 'skills',
+    'budget_min', 'budget_max', 'fixed_budget', 'duration', 'deadline',
+    'is_remote', 'location', 'experience_level', 'is_public', 'created_at',
+]
+APPLICATION_FIELDS = [
+    'id', 'job', 'freelancer', 'cover_letter', 'proposed_budget', 'status', 'created_at',
+]
+
+# Number of rows reported per import error summary
+MAX_REPORTED_ERRORS = 20
+
+
+class RecordError(ValueError):
+    """
+    A record that cannot be imported; the rest of its batch still is
+    """
+
+
+def guess_format(path):
+    return FORMAT_CSV if path.lower().endswith('.csv') else FORMAT_JSONL
+
+
+def read_records(stream, fmt):
+    """
+    Yield one dict per JSONL line or CSV row, without reading ahead
+    """
+    if fmt == FORMAT_CSV:
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class RecordWriter:
+    """
+    Write dicts as JSONL lines or CSV rows
+    """
+    def __init__(self, stream, fmt, fields):
+        self.stream = stream
+        self.fmt = fmt
+        self.fields = fields
+        if fmt == FORMAT_CSV:
+            self.writer = csv.DictWriter(stream, fieldnames=fields)
+            self.writer.writeheader()
+
+    def write(self, record):
+        if self.fmt == FORMAT_CSV:
+            record = dict(record)
+            if isinstance(record.get('skills'), list):
+                record['skills'] = SKILL_SEPARATOR.join(record['skills'])
+            self.writer.writerow({
+                name: value.isoformat() if isinstance(value, (datetime, date)) else value
+                for name, value in record.items()
+            })
+        else:
+            self.stream.write(json.dumps(record, default=_json_default, ensure_ascii=False))
+            self.stream.write('\n')
+
+
+def skill_slug(name):
+    """
+    Slug for a skill name, as JobForm derives it for new skills
+    """
+    return name.lower().replace(' ', '-')
+
+
+def serialize_job(job):
+    return {
+        'id': job.pk,
+        'title': job.title,
+        'description': job.description,
+        'hirer': job.hirer.email,
+        'status': job.status,
+        'category': job.category.slug if job.category else None,
+        'skills': [skill.name for skill in job.skills.all()],
+        'budget_min': job.budget_min,
+        'budget_max': job.budget_max,
+        'fixed_budget': job.fixed_budget,
+        'duration': job.duration,
+        'deadline': job.deadline,
+        'is_remote': job.is_remote,
+        'location': job.location,
+        'experience_level': job.experience_level,
+        'is_public': job.is_public,
+        'created_at': job.created_at,
+    }
+
+
+def serialize_application(application):
+    return {
+        'id': application.pk,
+        'job': application.job_id,
+        'freelancer': application.freelancer.email,
+        'cover_letter': application.cover_letter,
+        'proposed_budget': application.proposed_budget,
+        'status': application.status,
+        'created_at': application.created_at,
+    }
+
+
+def export_jobs(queryset=None, chunk_size=2000):
+    """
+    Yield serialized jobs from a server-side cursor; skills are prefetched
+    once per chunk
+    """
+    if queryset is None:
+        queryset = Job.objects.all()
+    queryset = queryset.select_related('hirer', 'category').prefetch_related(
+        Prefetch('skills', queryset=Skill.objects.only('pk', 'name'))
+    ).defer('search_document', 'excerpt').order_by('pk')
+    for job in queryset.iterator(chunk_size=chunk_size):
+        yield serialize_job(job)
+
+
+def export_applications(queryset=None, chunk_size=2000):
+    if queryset is None:
+        queryset = JobApplication.objects.all()
+    queryset = queryset.select_related('freelancer').order_by('pk')
+    for application in queryset.iterator(chunk_size=chunk_size):
+        yield serialize_application(application)
+
+
+def _text(record, name, default=''):
+    value = record.get(name)
+    return default if value is None else str(value)
+
+
+def _decimal(record, name):
+    value = record.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        raise RecordError(f'invalid {name}: {value!r}')
+
+
+def _integer(record, name):
+    value = record.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RecordError(f'invalid {name}: {value!r}')
+
+
+def _boolean(record, name, default):
+    value = record.get(name)
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _datetime(record, name):
+    value = record.get(name)
+    if value in (None, ''):
+        return None
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        raise RecordError(f'invalid {name}: {value!r}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _choice(record, name, choices, default):
+    value = record.get(name) or default
+    if value not in choices.values:
+        raise RecordError(f'invalid {name}: {value!r}')
+    return value
+
+
+def _skill_names(record):
+    skills = record.get('skills') or []
+    if isinstance(skills, str):
+        skills = skills.split(SKILL_SEPARATOR)
+    return [name.strip() for name in skills if name and name.strip()]
+
+
+@contextmanager
+def keep_timestamps(model):
+    """
+    Let bulk_create store the created_at values given on the objects. This
+    patches the model field, so it is only for single-threaded commands.
+    """
+    field = model._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def reset_sequences(*models):
+    """
+    Move id sequences past rows imported with their original ids
+    """
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+class BulkImporter:
+    """
+    Stream records into the database in batches of ``batch_size``.
+
+    Every batch is one transaction of a few bulk statements whatever its
+    size; reference rows (users, categories, skills) are resolved with one
+    query per batch and cached across batches.
+    """
+    model = None
+
+    def __init__(self, batch_size=5000, keep_ids=False, progress=None):
+        self.batch_size = batch_size
+        self.keep_ids = keep_ids
+        self.progress = progress
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+        self.users = {}
+
+    def resolve_users(self, emails):
+        missing = set(emails) - set(self.users)
+        if missing:
+            self.users.update(User.objects.filter(email__in=missing).values_list('email', 'pk'))
+        return self.users
+
+    def skip(self, number, error):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f'record {number}: {error}')
+
+    def import_batch(self, batch):
+        raise NotImplementedError
+
+    def run(self, records):
+        batch = []
+        for number, record in enumerate(records, 1):
+            batch.append((number, record))
+            if len(batch) >= self.batch_size:
+                self._import(batch)
+                batch = []
+        if batch:
+            self._import(batch)
+        if self.keep_ids:
+            reset_sequences(self.model)
+        self.finish()
+        return self.imported
+
+    def _import(self, batch):
+        with transaction.atomic():
+            self.imported += self.import_batch(batch)
+        if self.progress:
+            self.progress(self)
+
+    def finish(self):
+        pass
+
+
+class JobImporter(BulkImporter):
+    """
+    Without ``keep_ids`` jobs get new ids; pass a dict as ``id_map`` to have
+    it filled with {id in the file: new id}, which ApplicationImporter needs
+    to attach applications to the right jobs.
+    """
+    model = Job
+
+    def __init__(self, *args, id_map=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.id_map = id_map
+        self.categories = {category.slug: category.pk for category in reference_data.categories()}
+        self.skills = {slug: skill.pk for slug, skill in reference_data.snapshot().skills_by_slug.items()}
+        self.published = 0
+
+    def resolve_categories(self, slugs):
+        missing = set(slugs) - set(self.categories)
+        if missing:
+            Category.objects.bulk_create(
+                [Category(name=slug.replace('-', ' ').title(), slug=slug) for slug in missing],
+                ignore_conflicts=True
+            )
+            reference_data.invalidate()
+            self.categories.update(Category.objects.filter(slug__in=missing).values_list('slug', 'pk'))
+        return self.categories
+
+    def resolve_skills(self, names):
+        """
+        Map skill slugs to ids, creating the skills that do not exist yet
+        """
+        names = {skill_slug(name): name for name in names}
+        missing = set(names) - set(self.skills)
+        if missing:
+            self.skills.update(Skill.objects.filter(slug__in=missing).values_list('slug', 'pk'))
+            missing -= set(self.skills)
+        if missing:
+            Skill.objects.bulk_create(
+                [Skill(name=names[slug], slug=slug) for slug in missing],
+                ignore_conflicts=True
+            )
+            skill_index.invalidate()
+            reference_data.invalidate()
+            self.skills.update(Skill.objects.filter(slug__in=missing).values_list('slug', 'pk'))
+        return self.skills
+
+    def build(self, record, users, categories):
+        hirer_id = users.get(record.get('hirer'))
+        if hirer_id is None:
+            raise RecordError(f'unknown hirer: {record.get("hirer")!r}')
+        title = _text(record, 'title')
+        if not title:
+            raise RecordError('missing title')
+
+        job = Job(
+            title=title,
+            description=_text(record, 'description'),
+            hirer_id=hirer_id,
+            status=_choice(record, 'status', Job.Status, Job.Status.DRAFT),
+            category_id=categories.get(record.get('category')),
+            budget_min=_decimal(record, 'budget_min'),
+            budget_max=_decimal(record, 'budget_max'),
+            fixed_budget=_decimal(record, 'fixed_budget'),
+            duration=_text(record, 'duration'),
+            deadline=_datetime(record, 'deadline'),
+            is_remote=_boolean(record, 'is_remote', True),
+            location=_text(record, 'location'),
+            experience_level=_choice(
+                record, 'experience_level', Job.ExperienceLevel, Job.ExperienceLevel.INTERMEDIATE
+            ),
+            is_public=_boolean(record, 'is_public', True),
+            created_at=_datetime(record, 'created_at') or timezone.now(),
+        )
+        if self.keep_ids:
+            job.pk = _integer(record, 'id')
+        # bulk_create skips save(), which keeps these columns in sync
+        job.update_derived_fields()
+        return job
+
+    def import_batch(self, batch):
+        users = self.resolve_users(record.get('hirer') for number, record in batch)
+        categories = self.resolve_categories(
+            record['category'] for number, record in batch if record.get('category')
+        )
+        skills = self.resolve_skills(
+            name for number, record in batch for name in _skill_names(record)
+        )
+
+        jobs, job_skills, source_ids = [], [], []
+        for number, record in batch:
+            try:
+                source_id = _integer(record, 'id')
+                job = self.build(record, users, categories)
+            except (RecordError, ValueError) as error:
+                self.skip(number, error)
+                continue
+            jobs.append(job)
+            source_ids.append(source_id)
+            job_skills.append({skills[skill_slug(name)] for name in _skill_names(record)})
+
+        with keep_timestamps(Job):
+            jobs = Job.objects.bulk_create(jobs)
+        if self.id_map is not None:
+            self.id_map.update(
+                (source_id, job.pk) for source_id, job in zip(source_ids, jobs) if source_id is not None
+            )
+        Job.skills.through.objects.bulk_create([
+            Job.skills.through(job_id=job.pk, skill_id=skill_id)
+            for job, skill_ids in zip(jobs, job_skills) for skill_id in skill_ids
+        ])
+
+        # The work the Job receivers in jobs.signals would have done
+        update_search_document([job.pk for job in jobs])
+        published = [job.pk for job in jobs if job.status == Job.Status.PUBLISHED]
+        adjust_counts_for_jobs(published, 1)
+        self.published += len(published)
+        return len(jobs)
+
+    def finish(self):
+        if self.imported:
+            invalidate_search_cache()
+
+
+class ApplicationImporter(BulkImporter):
+    """
+    Applications name their job by the id it had when it was exported. Those
+    ids are only valid when the jobs were restored with ``keep_ids``; jobs
+    imported with new ids need the ``job_id_map`` their JobImporter filled.
+    """
+    model = JobApplication
+
+    def __init__(self, *args, job_id_map=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if job_id_map is None and not self.keep_ids:
+            raise ValueError(
+                'applications reference jobs by id: keep the ids of jobs restored with them, '
+                'or give the id map written when the jobs were imported'
+            )
+        self.job_id_map = job_id_map
+
+    def job_id(self, record):
+        job_id = _integer(record, 'job')
+        if self.job_id_map is not None:
+            return self.job_id_map.get(job_id)
+        return job_id
+
+    def build(self, record, users, jobs):
+        freelancer_id = users.get(record.get('freelancer'))
+        if freelancer_id is None:
+            raise RecordError(f'unknown freelancer: {record.get("freelancer")!r}')
+        job_id = self.job_id(record)
+        if job_id not in jobs:
+            raise RecordError(f'unknown job: {record.get("job")!r}')
+
+        application = JobApplication(
+            job_id=job_id,
+            freelancer_id=freelancer_id,
+            cover_letter=_text(record, 'cover_letter'),
+            proposed_budget=_decimal(record, 'proposed_budget'),
+            status=_choice(record, 'status', JobApplication.Status, JobApplication.Status.PENDING),
+            created_at=_datetime(record, 'created_at') or timezone.now(),
+        )
+        if self.keep_ids:
+            application.pk = _integer(record, 'id')
+        return application
+
+    def import_batch(self, batch):
+        emails = {record.get('freelancer') for number, record in batch}
+        users = self.resolve_users(emails)
+        freelancer_ids = {users[email] for email in emails if email in users}
+        job_ids = set()
+        for number, record in batch:
+            try:
+                job_ids.add(self.job_id(record))
+            except RecordError:
+                pass
+        jobs = set(Job.objects.filter(pk__in=job_ids).values_list('pk', flat=True))
+
+        # A freelancer applies to a job at most once
+        existing = set(JobApplication.objects.filter(
+            job_id__in=jobs, freelancer_id__in=freelancer_ids
+        ).values_list('job_id', 'freelancer_id'))
+
+        applications = []
+        for number, record in batch:
+            try:
+                application = self.build(record, users, jobs)
+            except (RecordError, ValueError) as error:
+                self.skip(number, error)
+                continue
+            key = (application.job_id, application.freelancer_id)
+            if key in existing:
+                self.skip(number, 'duplicate application')
+                continue
+            existing.add(key)
+            applications.append(application)
+
+        with keep_timestamps(JobApplication):
+            JobApplication.objects.bulk_create(applications)
+        return len(applications)
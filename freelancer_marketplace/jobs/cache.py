@@ -0,0 +1,177 @@
+import hashlib
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from .models import Job
+from .pagination import CursorPage, CursorPaginator
+
+# Cache alias and lifetime for search result pages
+SEARCH_CACHE_ALIAS = getattr(settings, 'JOB_SEARCH_CACHE_ALIAS', 'default')
+SEARCH_CACHE_TIMEOUT = getattr(settings, 'JOB_SEARCH_CACHE_TIMEOUT', 300)
+
+SEARCH_GENERATION_KEY = 'jobs:search:generation'
+
+
+def get_search_cache():
+    return caches[SEARCH_CACHE_ALIAS]
+
+
+def get_search_generation():
+    """
+    Return the current search generation, starting a new one if none is stored.
+
+    Generations start from the clock rather than 1, so an evicted counter
+    can never come back to a value that older cached pages were stored under.
+    """
+    cache = get_search_cache()
+    generation = cache.get(SEARCH_GENERATION_KEY)
+    if generation is None:
+        cache.add(SEARCH_GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = cache.get(SEARCH_GENERATION_KEY)
+    return generation
+
+
+def bump_search_generation():
+    cache = get_search_cache()
+    try:
+        cache.incr(SEARCH_GENERATION_KEY)
+    except ValueError:
+        # Nothing stored yet: the next read starts a fresh generation
+        pass
+
+
+def get_next_deadline():
+    """
+    Return the earliest deadline of a job that is still open, or None.
+
+    Listings drop a job once its deadline passes, without any write bumping
+    the generation, so views validating listings include this boundary. It
+    only moves on a write, which starts a new generation, or when it passes.
+    """
+    cache = get_search_cache()
+    key = f'jobs:search:{get_search_generation()}:next-deadline'
+    cached = cache.get(key)
+    now = timezone.now()
+    if cached is None or (cached[0] is not None and cached[0] < now):
+        deadline = Job.objects.using(DEFAULT_DB_ALIAS).open().filter(
+            deadline__isnull=False
+        ).order_by('deadline').values_list('deadline', flat=True).first()
+        # Wrapped so that "no deadline ahead" is cached too
+        cached = (deadline,)
+        cache.set(key, cached, SEARCH_CACHE_TIMEOUT)
+    return cached[0]
+
+
+def invalidate_search_cache():
+    """
+    Orphan every cached search page once the current transaction commits
+    """
+    transaction.on_commit(bump_search_generation)
+
+
+def normalize_search(cleaned_data):
+    """
+    Reduce JobSearchForm.cleaned_data to a canonical, JSON-serializable dict
+    """
+    category = cleaned_data.get('category')
+    skills = cleaned_data.get('skills') or []
+    budget_min = cleaned_data.get('budget_min')
+    budget_max = cleaned_data.get('budget_max')
+    return {
+        'q': ' '.join((cleaned_data.get('q') or '').lower().split()),
+        'category': category.pk if category else None,
+        'skills': sorted(skill.pk for skill in skills),
+        'skills_mode': (cleaned_data.get('skills_mode') or 'all') if skills else None,
+        'budget_min': str(budget_min.normalize()) if budget_min else None,
+        'budget_max': str(budget_max.normalize()) if budget_max else None,
+        'is_remote': bool(cleaned_data.get('is_remote')),
+        'experience_level': cleaned_data.get('experience_level') or None,
+        'sort': cleaned_data.get('sort') or None,
+    }
+
+
+def search_cache_key(cleaned_data, cursor=None, per_page=None):
+    payload = json.dumps(
+        [normalize_search(cleaned_data), cursor or '', per_page],
+        sort_keys=True,
+        separators=(',', ':')
+    )
+    digest = hashlib.sha1(payload.encode()).hexdigest()
+    return f'jobs:search:{get_search_generation()}:{digest}'
+
+
+class SearchResultCacheMixin:
+    """
+    Cache each page of a cursor-paginated search as its ordered job ids,
+    the neighbouring cursors and the total.
+
+    Views set ``self.search_data`` to the valid JobSearchForm.cleaned_data
+    (or None to bypass the cache) in get_queryset(). Pages missing from the
+    cache are read from the primary, so a lagging replica never stores old
+    results under the current generation; cached pages load their jobs
+    wherever the request reads from.
+    """
+    search_data = None
+
+    def get_cached_objects(self, queryset, ids):
+        objects = {obj.pk: obj for obj in queryset.order_by().filter(pk__in=ids)}
+        return [objects[pk] for pk in ids if pk in objects]
+
+    async def aget_cached_objects(self, queryset, ids):
+        objects = {obj.pk: obj async for obj in queryset.order_by().filter(pk__in=ids).aiterator()}
+        return [objects[pk] for pk in ids if pk in objects]
+
+    def _cached_page(self, queryset, page_size, cached, objects):
+        paginator = CursorPaginator(queryset, page_size, count_mode=self.paginate_count)
+        paginator.count = cached['count']
+        page = CursorPage(objects, paginator, cached['next'], cached['previous'])
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def _cache_entry(self, paginator, page, object_list):
+        return {
+            'ids': [obj.pk for obj in object_list],
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+            'count': paginator.count,
+        }
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.search_data is None:
+            return super().paginate_queryset(queryset, page_size)
+
+        cache = get_search_cache()
+        key = search_cache_key(self.search_data, self.request.GET.get(self.cursor_kwarg), page_size)
+        cached = cache.get(key)
+        if cached is not None:
+            return self._cached_page(queryset, page_size, cached, self.get_cached_objects(queryset, cached['ids']))
+
+        paginator, page, object_list, is_paginated = super().paginate_queryset(
+            queryset.using(DEFAULT_DB_ALIAS), page_size
+        )
+        cache.set(key, self._cache_entry(paginator, page, object_list), SEARCH_CACHE_TIMEOUT)
+        return (paginator, page, object_list, is_paginated)
+
+    async def apaginate_queryset(self, queryset, page_size):
+        if self.search_data is None:
+            return await super().apaginate_queryset(queryset, page_size)
+
+        cache = get_search_cache()
+        key = await sync_to_async(search_cache_key)(
+            self.search_data, self.request.GET.get(self.cursor_kwarg), page_size
+        )
+        cached = await cache.aget(key)
+        if cached is not None:
+            objects = await self.aget_cached_objects(queryset, cached['ids'])
+            return self._cached_page(queryset, page_size, cached, objects)
+
+        paginator, page, object_list, is_paginated = await super().apaginate_queryset(
+            queryset.using(DEFAULT_DB_ALIAS), page_size
+        )
+        await cache.aset(key, self._cache_entry(paginator, page, object_list), SEARCH_CACHE_TIMEOUT)
+        return (paginator, page, object_list, is_paginated)
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    """
+    The invalidation tokens of jobs.cache, jobs.reference and jobs.fragments
+    are bumped by management commands as well as by web workers; a cache
+    each process keeps to itself would never show those bumps to the others
+    """
+    errors = []
+    for setting in ('JOB_SEARCH_CACHE_ALIAS', 'JOB_REFERENCE_CACHE_ALIAS', 'JOB_FRAGMENT_CACHE_ALIAS'):
+        alias = getattr(settings, setting, 'default')
+        if isinstance(caches[alias], LocMemCache):
+            errors.append(Error(
+                f"{setting} points at the process-local cache '{alias}'.",
+                hint='Use a cache shared between processes, e.g. FileBasedCache or RedisCache.',
+                obj=setting,
+                id='jobs.E001',
+            ))
+    return errors
@@ -0,0 +1,68 @@
+import hashlib
+
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    Answer If-None-Match / If-Modified-Since with 304 Not Modified before
+    any context is built or template rendered.
+
+    Views load what they need in load_validation_data(), then return whatever
+    identifies the page's content from get_etag_parts() and, optionally, a
+    datetime from get_last_modified(). The viewer is always part of the ETag
+    because pages render differently per user.
+    """
+    def load_validation_data(self):
+        pass
+
+    def get_etag_parts(self):
+        return []
+
+    def get_last_modified(self):
+        return None
+
+    def get_etag(self):
+        user = self.request.user
+        parts = [user.pk if user.is_authenticated else None] + list(self.get_etag_parts())
+        digest = hashlib.md5(repr(parts).encode()).hexdigest()
+        # Weak: the markup differs byte for byte (e.g. CSRF tokens)
+        return f'W/"{digest}"'
+
+    def get_validators(self):
+        """
+        Return (etag, last_modified timestamp or None), or (None, None) when
+        the page must not be revalidated
+        """
+        # Pending flash messages render once; such pages get no validators
+        if get_messages(self.request):
+            return None, None
+        last_modified = self.get_last_modified()
+        return self.get_etag(), int(last_modified.timestamp()) if last_modified else None
+
+    def get_not_modified(self, etag, last_modified):
+        if etag is None:
+            return None
+        return get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+
+    def add_validator_headers(self, response, etag, last_modified):
+        if etag is not None and response.status_code == 200:
+            response.headers['ETag'] = etag
+            if last_modified is not None:
+                response.headers['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Cookie',))
+        if self.request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        self.load_validation_data()
+        etag, last_modified = self.get_validators()
+        response = self.get_not_modified(etag, last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return self.add_validator_headers(response, etag, last_modified)
@@ -0,0 +1,61 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import invalidate_search_cache
+from .models import Job, RelatedJob
+from .popularity import adjust_counts_for_jobs
+from .related import recompute_related_jobs
+
+
+def overdue_jobs(now=None):
+    """
+    Published jobs whose deadline has passed, oldest deadline first
+    """
+    return Job.objects.filter(
+        status=Job.Status.PUBLISHED,
+        deadline__lt=now or timezone.now()
+    ).order_by('deadline', 'pk')
+
+
+def expire_batch(now=None, batch_size=1000):
+    """
+    Expire up to ``batch_size`` overdue jobs and return how many were expired.
+
+    The status change is a single UPDATE, which sends no signals, so the
+    batch also does the work of the Job receivers in jobs.signals.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        # Rows locked by a concurrent sweep or edit are left for the next batch
+        job_ids = list(
+            overdue_jobs(now).select_for_update(skip_locked=True).values_list('pk', flat=True)[:batch_size]
+        )
+        if not job_ids:
+            return 0
+
+        Job.objects.filter(pk__in=job_ids).update(status=Job.Status.EXPIRED, updated_at=now)
+        adjust_counts_for_jobs(job_ids, -1)
+        invalidate_search_cache()
+
+        # Lists that showed an expired job need a replacement entry
+        sources = set(RelatedJob.objects.filter(
+            related_id__in=job_ids
+        ).exclude(job_id__in=job_ids).values_list('job_id', flat=True))
+        RelatedJob.objects.filter(Q(job_id__in=job_ids) | Q(related_id__in=job_ids)).delete()
+        recompute_related_jobs(sources)
+
+    return len(job_ids)
+
+
+def expire_jobs(now=None, batch_size=1000):
+    """
+    Expire every overdue job, one batch per transaction
+    """
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        count = expire_batch(now, batch_size)
+        expired += count
+        if count < batch_size:
+            return expired
@@ -0,0 +1,141 @@
+from decimal import Decimal
+
+from django.db.models import Count, Q
+from django.utils.translation import gettext_lazy as _
+
+from .models import Job
+from .reference import reference_data
+from .search import budget_filter, job_filters, filter_jobs
+
+# (key, label, min, max) for the budget facet; each bucket is the same
+# window the budget_min/budget_max search fields would apply
+BUDGET_BUCKETS = [
+    ('under-100', _('Under $100'), None, Decimal('100')),
+    ('100-500', _('$100 - $500'), Decimal('100'), Decimal('500')),
+    ('500-1000', _('$500 - $1,000'), Decimal('500'), Decimal('1000')),
+    ('1000-5000', _('$1,000 - $5,000'), Decimal('1000'), Decimal('5000')),
+    ('5000-plus', _('$5,000+'), Decimal('5000'), None),
+]
+
+
+def _combine(conditions):
+    combined = Q()
+    for condition in conditions:
+        combined &= condition
+    return combined
+
+
+def _count(condition):
+    return Count('pk', filter=condition) if condition else Count('pk')
+
+
+def _option_query(params, updates):
+    """
+    Query string selecting (or, with None values, clearing) a facet option
+    """
+    if params is None:
+        return None
+    params = params.copy()
+    for name in ('cursor', 'page'):
+        params.pop(name, None)
+    for name, value in updates.items():
+        params.pop(name, None)
+        if value is not None:
+            params[name] = value
+    return params.urlencode()
+
+
+def compute_facets(queryset, cleaned_data, params=None):
+    """
+    Count jobs per category, experience level, remote flag and budget bucket
+    in a single conditional-aggregation query.
+
+    Each facet is counted under every search filter except its own, so the
+    counts show what selecting another option would return. When ``params``
+    (the request's QueryDict) is given, every option carries the ``query``
+    string that toggles it.
+    """
+    queryset = filter_jobs(queryset, cleaned_data, rank=False)
+    filters = job_filters(cleaned_data)
+
+    def others(name):
+        return _combine(condition for key, condition in filters.items() if key != name)
+
+    categories = reference_data.categories()
+    experience_levels = list(Job.ExperienceLevel.choices)
+
+    aggregates = {'total': _count(_combine(filters.values()))}
+    for category in categories:
+        aggregates[f'category_{category.pk}'] = _count(Q(category=category.pk) & others('category'))
+    for value, label in experience_levels:
+        aggregates[f'experience_{value}'] = _count(Q(experience_level=value) & others('experience_level'))
+    aggregates['remote'] = _count(Q(is_remote=True) & others('is_remote'))
+    aggregates['onsite'] = _count(Q(is_remote=False) & others('is_remote'))
+    for index, (key, label, low, high) in enumerate(BUDGET_BUCKETS):
+        aggregates[f'budget_{index}'] = _count(budget_filter(low, high) & others('budget'))
+
+    counts = queryset.order_by().aggregate(**aggregates)
+
+    selected_category = cleaned_data.get('category')
+    selected_level = cleaned_data.get('experience_level')
+    remote_only = bool(cleaned_data.get('is_remote'))
+    budget_window = (cleaned_data.get('budget_min'), cleaned_data.get('budget_max'))
+
+    facets = {
+        'category': [],
+        'experience_level': [],
+        'is_remote': [],
+        'budget': [],
+    }
+    for category in categories:
+        selected = selected_category is not None and selected_category.pk == category.pk
+        facets['category'].append({
+            'value': category.pk,
+            'label': category.name,
+            'slug': category.slug,
+            'count': counts[f'category_{category.pk}'],
+            'selected': selected,
+            'query': _option_query(params, {'category': None if selected else category.pk}),
+        })
+    for value, label in experience_levels:
+        selected = selected_level == value
+        facets['experience_level'].append({
+            'value': value,
+            'label': label,
+            'count': counts[f'experience_{value}'],
+            'selected': selected,
+            'query': _option_query(params, {'experience_level': None if selected else value}),
+        })
+    facets['is_remote'] = [
+        {
+            'value': True,
+            'label': _('Remote'),
+            'count': counts['remote'],
+            'selected': remote_only,
+            'query': _option_query(params, {'is_remote': None if remote_only else 'on'}),
+        },
+        {
+            # The search form can only restrict to remote jobs
+            'value': False,
+            'label': _('On-site'),
+            'count': counts['onsite'],
+            'selected': False,
+            'query': None,
+        },
+    ]
+    for index, (key, label, low, high) in enumerate(BUDGET_BUCKETS):
+        selected = budget_window == (low, high)
+        facets['budget'].append({
+            'value': key,
+            'label': label,
+            'min': low,
+            'max': high,
+            'count': counts[f'budget_{index}'],
+            'selected': selected,
+            'query': _option_query(params, {
+                'budget_min': None if selected or low is None else low,
+                'budget_max': None if selected or high is None else high,
+            }),
+        })
+
+    return {'total': counts['total'], 'facets': facets}
@@ -1,7 +1,120 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
+from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 from .models import Job, JobApplication, Category, Skill
+from .search import SKILLS_MATCH_ALL, SKILLS_MATCH_ANY
+from .reference import reference_data
+
+
+class AutocompleteSelectMultiple(forms.SelectMultiple):
+    """
+    Multiple select that renders only the selected options; the rest are
+    fetched from the autocomplete endpoint as the user types
+    """
+    def __init__(self, url, attrs=None, resolve=None):
+        super().__init__(attrs)
+        self.url = url
+        # Optional callable mapping a list of ids to {pk: object}
+        self.resolve = resolve
+    
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = self.url
+        return context
+    
+    def optgroups(self, name, value, attrs=None):
+        selected = [v for v in value if str(v).isdigit()]
+        if not selected:
+            return []
+        if self.resolve is not None:
+            objects = self.resolve([int(v) for v in selected]).values()
+        else:
+            objects = self.choices.queryset.filter(pk__in=selected)
+        return [
+            (None, [self.create_option(name, obj.pk, str(obj), True, index)], index)
+            for index, obj in enumerate(objects)
+        ]
+
+
+def skill_autocomplete_widget():
+    return AutocompleteSelectMultiple(
+        reverse_lazy('jobs:skill_autocomplete'),
+        attrs={'class': 'select2 form-control'},
+        resolve=reference_data.get_skills
+    )
+
+
+class CategoryChoiceIterator(ModelChoiceIterator):
+    """
+    Iterate the categories held by the reference cache instead of querying
+    """
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for category in reference_data.categories():
+            yield self.choice(category)
+
+    def __len__(self):
+        return len(reference_data.categories()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(reference_data.categories())
+
+
+class CategoryChoiceField(forms.ModelChoiceField):
+    """
+    Category select whose choices and submitted values are resolved through
+    the reference cache
+    """
+    iterator = CategoryChoiceIterator
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, Category):
+            return value
+        try:
+            category = reference_data.category(int(value))
+        except (TypeError, ValueError):
+            category = None
+        if category is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return category
+
+
+class SkillMultipleChoiceField(forms.ModelMultipleChoiceField):
+    """
+    Skill multiple choice that resolves hot skills through the reference
+    cache and queries only the rest; cleans to a list rather than a queryset
+    """
+    def _check_values(self, value):
+        pks = []
+        for raw in value:
+            try:
+                pks.append(int(raw))
+            except (TypeError, ValueError):
+                raise ValidationError(
+                    self.error_messages['invalid_pk_value'],
+                    code='invalid_pk_value',
+                    params={'pk': raw},
+                )
+        skills = reference_data.get_skills(pks)
+        for pk, raw in zip(pks, value):
+            if pk not in skills:
+                raise ValidationError(
+                    self.error_messages['invalid_choice'],
+                    code='invalid_choice',
+                    params={'value': raw},
+                )
+        return [skills[pk] for pk in dict.fromkeys(pks)]
+
 
 class JobForm(forms.ModelForm):
     """
@@ -27,7 +140,11 @@ class JobForm(forms.ModelForm):
         widgets = {
             'description': forms.Textarea(attrs={'rows': 10, 'class': 'markdown-editor'}),
             'deadline': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
-            'skills': forms.SelectMultiple(attrs={'class': 'select2 form-control'}),
+            'skills': skill_autocomplete_widget(),
+        }
+        field_classes = {
+            'category': CategoryChoiceField,
+            'skills': SkillMultipleChoiceField,
         }
     
     def __init__(self, *args, **kwargs):
@@ -121,17 +238,27 @@ class JobSearchForm(forms.Form):
             'class': 'form-control'
         })
     )
-    category = forms.ModelChoiceField(
+    category = CategoryChoiceField(
         required=False,
         queryset=Category.objects.all(),
         label=_("Category"),
         widget=forms.Select(attrs={'class': 'form-control'})
     )
-    skills = forms.ModelMultipleChoiceField(
+    skills = SkillMultipleChoiceField(
         required=False,
         queryset=Skill.objects.all(),
         label=_("Skills"),
-        widget=forms.SelectMultiple(attrs={'class': 'select2 form-control'})
+        widget=skill_autocomplete_widget()
+    )
+    skills_mode = forms.ChoiceField(
+        required=False,
+        choices=[
+            (SKILLS_MATCH_ALL, _('All selected skills')),
+            (SKILLS_MATCH_ANY, _('Any selected skill')),
+        ],
+        initial=SKILLS_MATCH_ALL,
+        label=_("Match"),
+        widget=forms.Select(attrs={'class': 'form-control'})
     )
     budget_min = forms.DecimalField(
         required=False,
@@ -206,7 +333,7 @@ class JobApplicationForm(forms.ModelForm):
         cleaned_data = super().clean()
         
         # Validate that job is open for applications
-        if self.job and self.job.status != Job.Status.PUBLISHED:
+        if self.job and not self.job.is_open:
             raise forms.ValidationError(_("This job is not open for applications"))
         
         # Validate budget is within range if specified
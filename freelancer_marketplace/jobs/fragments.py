@@ -0,0 +1,177 @@
+import time
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from freelancer_marketplace.metrics import Counter, register_counter
+
+from .models import Skill
+from .reference import reference_data
+
+# Cache alias and lifetime for rendered template fragments. Keys change
+# whenever their inputs do, so the timeout only bounds memory use.
+FRAGMENT_CACHE_ALIAS = getattr(settings, 'JOB_FRAGMENT_CACHE_ALIAS', 'default')
+FRAGMENT_CACHE_TIMEOUT = getattr(settings, 'JOB_FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24)
+
+JOB_CARD = 'job_card'
+JOB_DETAIL = 'job_detail'
+HIRER_CARD = 'hirer_card'
+FRAGMENT_NAMES = (JOB_CARD, JOB_DETAIL, HIRER_CARD)
+
+HIRER_VERSION_KEY = 'jobs:fragment:hirer:{}'
+
+# Served on /metrics by the process that rendered the pages
+FRAGMENT_LOOKUPS = register_counter(Counter(
+    'django_fragment_cache_lookups_total',
+    'Job page fragments served from the cache (hit) or rendered (miss)',
+    ('fragment', 'result'),
+))
+
+
+def get_fragment_cache():
+    return caches[FRAGMENT_CACHE_ALIAS]
+
+
+def get_hirer_version(user_id):
+    """
+    Return the version of a hirer's public profile; like the search
+    generation it starts from the clock so an evicted value never repeats
+    """
+    cache = get_fragment_cache()
+    key = HIRER_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_hirer_version(user_id):
+    try:
+        get_fragment_cache().incr(HIRER_VERSION_KEY.format(user_id))
+    except ValueError:
+        # Nothing stored yet: the next read starts a fresh version
+        pass
+
+
+def invalidate_hirer_fragments(user_id):
+    transaction.on_commit(partial(bump_hirer_version, user_id))
+
+
+def job_version(job):
+    """
+    Everything a job's public fragments depend on: the job row itself (skill
+    changes touch updated_at, see jobs.signals) and the category and skill
+    names held by the reference cache
+    """
+    return f'{job.pk}:{job.updated_at.timestamp()}:{reference_data.version()}'
+
+
+def job_card_key(job):
+    return f'jobs:fragment:{JOB_CARD}:{job_version(job)}'
+
+
+def job_detail_key(job):
+    return f'jobs:fragment:{JOB_DETAIL}:{job_version(job)}'
+
+
+def hirer_card_key(job):
+    return f'jobs:fragment:{HIRER_CARD}:{job.hirer_id}:{get_hirer_version(job.hirer_id)}'
+
+
+def record_fragment_stats(name, hits, misses):
+    for result, count in (('hit', hits), ('miss', misses)):
+        if count:
+            FRAGMENT_LOOKUPS.inc((name, result), count)
+
+
+def get_fragment_stats():
+    """
+    Return {name: {'hits': n, 'misses': n}} for every fragment, counted by
+    this process
+    """
+    return {
+        name: {'hits': FRAGMENT_LOOKUPS.value((name, 'hit')), 'misses': FRAGMENT_LOOKUPS.value((name, 'miss'))}
+        for name in FRAGMENT_NAMES
+    }
+
+
+def render_fragments(name, template_name, objects, key_func, context_name, prepare=None):
+    """
+    Render ``template_name`` once per object with the object as
+    ``context_name``, reusing cached HTML.
+
+    All keys are fetched with one get_many(); ``prepare`` is called with the
+    misses only, so their related data can be loaded in bulk. Fragments are
+    rendered without a request and must not contain anything per-user.
+    """
+    cache = get_fragment_cache()
+    keys = [key_func(obj) for obj in objects]
+    cached = cache.get_many(keys)
+    misses = [obj for obj, key in zip(objects, keys) if key not in cached]
+    if misses and prepare is not None:
+        prepare(misses)
+
+    rendered = {}
+    for obj, key in zip(objects, keys):
+        if key not in cached and key not in rendered:
+            rendered[key] = render_to_string(template_name, {context_name: obj})
+    if rendered:
+        cache.set_many(rendered, FRAGMENT_CACHE_TIMEOUT)
+    record_fragment_stats(name, len(objects) - len(misses), len(misses))
+    return [mark_safe(cached[key] if key in cached else rendered[key]) for key in keys]
+
+
+# Skills and hirers are read from the primary: their cache keys carry
+# versions bumped on commit, which a lagging replica may not have caught up
+# with yet
+
+
+def prefetch_skills(jobs):
+    prefetch_related_objects(jobs, Prefetch('skills', queryset=Skill.objects.using(DEFAULT_DB_ALIAS)))
+
+
+def prefetch_hirers(jobs):
+    # The hirer and their profile in one query, for the hirer card
+    hirers = get_user_model().objects.using(DEFAULT_DB_ALIAS).select_related('hirer_profile').in_bulk(
+        {job.hirer_id for job in jobs}
+    )
+    for job in jobs:
+        job.hirer = hirers[job.hirer_id]
+
+
+def attach_job_cards(jobs):
+    """
+    Set ``card_html`` on each job of a list page; skills are only
+    prefetched for the cards that have to be rendered
+    """
+    jobs = list(jobs)
+    cards = render_fragments(
+        JOB_CARD, 'jobs/fragments/job_card.html', jobs, job_card_key, 'job',
+        prepare=prefetch_skills
+    )
+    for job, card in zip(jobs, cards):
+        job.card_html = card
+    return jobs
+
+
+def render_job_detail_fragments(job):
+    """
+    Return the cached public sections of the job detail page
+    """
+    return {
+        'job_detail_html': render_fragments(
+            JOB_DETAIL, 'jobs/fragments/job_detail.html', [job], job_detail_key, 'job',
+            prepare=prefetch_skills
+        )[0],
+        'hirer_card_html': render_fragments(
+            HIRER_CARD, 'jobs/fragments/hirer_card.html', [job], hirer_card_key, 'job',
+            prepare=prefetch_hirers
+        )[0],
+    }
@@ -0,0 +1,228 @@
+"""
+A small HTTP/1.1 load generator for benchmarking the site.
+
+Each simulated client holds one keep-alive connection and requests the
+given paths in turn until the run ends, recording the latency and status of
+every response. Paths can be given as Request tuples to send headers (e.g. a
+session cookie) and group the results under a label. Only plain http://
+targets are supported; it is meant for a server started locally by the
+benchmark commands.
+"""
+import asyncio
+import time
+from collections import Counter, namedtuple
+from urllib.parse import urlsplit
+
+# A path to request, the headers to send with it and the label its results
+# are grouped under in LoadResult.by_label
+Request = namedtuple('Request', 'path headers label', defaults=(None, None))
+
+
+class LoadResult:
+    """
+    Latencies (seconds), status counts and errors collected by a run
+    """
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.headers = []
+        self.elapsed = 0
+        self.by_label = {}
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    @property
+    def requests_per_second(self):
+        return self.requests / self.elapsed if self.elapsed else 0
+
+    def targets(self, label):
+        if label is None:
+            return (self,)
+        if label not in self.by_label:
+            self.by_label[label] = LoadResult()
+        return (self, self.by_label[label])
+
+    def add(self, label, path, latency, status, headers=None):
+        for result in self.targets(label):
+            result.latencies.append(latency)
+            result.statuses[status] += 1
+            if headers is not None:
+                result.headers.append((path, headers))
+
+    def add_error(self, label, error):
+        for result in self.targets(label):
+            result.errors[type(error).__name__] += 1
+
+    def percentile(self, percent):
+        """
+        Return the latency below which ``percent`` % of the responses fell
+        (nearest rank), in seconds
+        """
+        if not self.latencies:
+            return 0
+        ordered = sorted(self.latencies)
+        rank = max(0, min(len(ordered) - 1, int(round(percent / 100 * len(ordered))) - 1))
+        return ordered[rank]
+
+    def summary(self):
+        return {
+            'requests': self.requests,
+            'errors': sum(self.errors.values()),
+            'requests_per_second': self.requests_per_second,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'statuses': dict(self.statuses),
+        }
+
+
+class ConnectionClosed(Exception):
+    pass
+
+
+async def read_response(reader):
+    """
+    Read one response; return (status, headers) after consuming the body
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionClosed()
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif status not in (204, 304):
+        # No length: the body runs until the server closes the connection
+        await reader.read()
+        headers['connection'] = 'close'
+    return status, headers
+
+
+class Client:
+    def __init__(self, host, port, capture_headers=()):
+        self.host = host
+        self.port = port
+        self.capture_headers = capture_headers
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, path, extra_headers=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'GET {path} HTTP/1.1', f'Host: {self.host}:{self.port}', 'Connection: keep-alive']
+        lines += [f'{name}: {value}' for name, value in (extra_headers or {}).items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+        status, headers = await read_response(self.reader)
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, {name: headers[name] for name in self.capture_headers if name in headers}
+
+
+async def _worker(client, requests, offset, deadline, remaining, result, timeout, extra_headers):
+    index = offset
+    while time.perf_counter() < deadline:
+        if remaining is not None:
+            if remaining[0] <= 0:
+                break
+            remaining[0] -= 1
+        request = requests[index % len(requests)]
+        index += 1
+        headers = dict(extra_headers or {}, **(request.headers or {}))
+        started = time.perf_counter()
+        try:
+            status, headers = await asyncio.wait_for(client.request(request.path, headers), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionClosed, ValueError) as e:
+            result.add_error(request.label, e)
+            await client.close()
+            continue
+        result.add(
+            request.label, request.path, time.perf_counter() - started, status,
+            headers if client.capture_headers else None
+        )
+    await client.close()
+
+
+async def run_load(base_url, paths, concurrency=50, duration=10, requests=None,
+                   timeout=30, extra_headers=None, capture_headers=()):
+    """
+    Request ``paths`` (strings or Request tuples) against ``base_url`` from
+    ``concurrency`` clients for ``duration`` seconds, or until ``requests``
+    responses have been read.
+
+    Header names in ``capture_headers`` (lower case) are kept per response
+    in ``result.headers`` as (path, {name: value}).
+    """
+    url = urlsplit(base_url)
+    if url.scheme != 'http':
+        raise ValueError('Only http:// URLs are supported')
+    prefix = url.path.rstrip('/')
+    paths = [
+        path._replace(path=prefix + path.path) if isinstance(path, Request) else Request(prefix + path)
+        for path in paths
+    ]
+    result = LoadResult()
+    remaining = [requests] if requests is not None else None
+    started = time.perf_counter()
+    deadline = started + duration if duration else float('inf')
+    await asyncio.gather(*(
+        _worker(
+            Client(url.hostname, url.port or 80, capture_headers), paths, offset,
+            deadline, remaining, result, timeout, extra_headers
+        )
+        for offset in range(concurrency)
+    ))
+    result.elapsed = time.perf_counter() - started
+    for label_result in result.by_label.values():
+        label_result.elapsed = result.elapsed
+    return result
+
+
+def run(*args, **kwargs):
+    """
+    Synchronous wrapper around run_load() for management commands
+    """
+    return asyncio.run(run_load(*args, **kwargs))
+
+
+async def wait_for_server(base_url, path='/', timeout=30):
+    """
+    Poll until the server at ``base_url`` answers, or raise TimeoutError
+    """
+    url = urlsplit(base_url)
+    deadline = time.perf_counter() + timeout
+    while True:
+        client = Client(url.hostname, url.port or 80)
+        try:
+            await asyncio.wait_for(client.request(url.path.rstrip('/') + path), 5)
+            return
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionClosed):
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f'No response from {base_url}')
+            await asyncio.sleep(0.2)
+        finally:
+            await client.close()
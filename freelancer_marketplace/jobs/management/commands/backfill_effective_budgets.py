@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from jobs.models import Job, effective_budget_expressions
+
+
+class Command(BaseCommand):
+    help = "Recompute Job.effective_budget_low/high for rows written without save()"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help="Number of primary keys covered by each UPDATE statement"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = Job.objects.aggregate(last=Max('pk'))['last'] or 0
+
+        updated = 0
+        for start in range(0, last_pk, batch_size):
+            updated += Job.objects.filter(
+                pk__gt=start, pk__lte=start + batch_size
+            ).update(**effective_budget_expressions())
+
+        self.stdout.write(self.style.SUCCESS(f"Updated effective budgets for {updated} jobs"))
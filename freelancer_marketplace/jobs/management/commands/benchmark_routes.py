@@ -0,0 +1,150 @@
+import asyncio
+import os
+import shlex
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.benchmark import (
+    DEFAULT_MIN_DELTA_MS, DEFAULT_TOLERANCE, WSGI_COMMAND, TrafficBuilder, compare, failures,
+    load_baseline, running_server, save_baseline, summarize
+)
+from jobs.loadgen import run_load
+
+BASELINE_PATH = os.path.join(settings.BASE_DIR, "benchmarks", "routes_baseline.json")
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a mix of anonymous, freelancer and hirer traffic against the site on the "
+        "seeded database, report latency and queries per URL name and compare them with a baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            help="Benchmark the server already running at this http:// URL instead of starting one"
+        )
+        parser.add_argument(
+            "--server-command",
+            default=WSGI_COMMAND,
+            help="Command starting the server; {port} and {workers} are filled in"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Server worker processes"
+        )
+        parser.add_argument("--port", type=int, default=8766, help="Local port the server listens on")
+        parser.add_argument("--concurrency", type=int, default=50, help="Simultaneous client connections")
+        parser.add_argument("--duration", type=float, default=30, help="Seconds of measured load")
+        parser.add_argument("--warmup", type=float, default=5, help="Seconds of unmeasured load first")
+        parser.add_argument(
+            "--prefix",
+            default="seed",
+            help="--prefix the database was seeded with (see seed_marketplace)"
+        )
+        parser.add_argument("--users", type=int, default=20, help="Seeded freelancers and hirers to log in as")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed of the request mix")
+        parser.add_argument("--mix-size", type=int, default=2000, help="Requests in the replayed mix")
+        parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare with")
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Store this run as the new baseline instead of comparing"
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=DEFAULT_TOLERANCE,
+            help="Slowdown allowed before a route counts as a regression (0.2 = 20%%)"
+        )
+        parser.add_argument(
+            "--min-delta-ms",
+            type=float,
+            default=DEFAULT_MIN_DELTA_MS,
+            help="Latency changes below this many milliseconds are never regressions"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            requests = TrafficBuilder(options["prefix"], options["users"], options["seed"]).build(
+                options["mix_size"]
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options["url"]:
+            result = self.replay(options["url"], requests, options)
+        else:
+            argv = shlex.split(options["server_command"].format(port=options["port"], workers=options["workers"]))
+            if shutil.which(argv[0]) is None:
+                raise CommandError(f"{argv[0]} is not installed; pip install it or pass --server-command")
+            base_url = f"http://127.0.0.1:{options['port']}"
+            self.stdout.write(f"Starting {' '.join(argv)}")
+            try:
+                with running_server(argv, base_url, requests[0].path):
+                    result = self.replay(base_url, requests, options)
+            except TimeoutError as e:
+                raise CommandError(str(e))
+
+        results = summarize(result)
+        self.report(results)
+        run_settings = {
+            name: options[name] for name in ("concurrency", "duration", "workers", "prefix", "users", "seed", "mix_size")
+        }
+
+        if options["save_baseline"]:
+            failed = failures(results)
+            for failure in failed:
+                self.stderr.write(failure)
+            if failed:
+                raise CommandError(f"{len(failed)} routes failed; not saving them as the baseline")
+            os.makedirs(os.path.dirname(os.path.abspath(options["baseline"])), exist_ok=True)
+            save_baseline(options["baseline"], results, run_settings)
+            self.stdout.write(self.style.SUCCESS(f"Saved the baseline to {options['baseline']}"))
+            return
+        if not os.path.exists(options["baseline"]):
+            self.stdout.write(self.style.WARNING(
+                f"No baseline at {options['baseline']}; run again with --save-baseline to store one"
+            ))
+            return
+
+        baseline = load_baseline(options["baseline"])
+        if baseline.get("settings") != run_settings:
+            self.stdout.write(self.style.WARNING(
+                f"The baseline was recorded with {baseline.get('settings')}, this run with {run_settings}"
+            ))
+        regressions = compare(results, baseline, options["tolerance"], options["min_delta_ms"])
+        for regression in regressions:
+            self.stderr.write(regression)
+        if regressions:
+            raise CommandError(f"{len(regressions)} regressions against {options['baseline']}")
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
+
+    def replay(self, base_url, requests, options):
+        if options["warmup"]:
+            asyncio.run(run_load(base_url, requests, options["concurrency"], options["warmup"]))
+        return asyncio.run(run_load(
+            base_url, requests, options["concurrency"], options["duration"],
+            capture_headers=("server-timing",)
+        ))
+
+    def report(self, results):
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'route':<34}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'errors':>8}"
+        )
+        rows = list(results["routes"].items()) + [("total", results["total"])]
+        for name, summary in rows:
+            queries = summary.get("queries")
+            self.stdout.write(
+                f"{name:<34}{summary['requests']:>9}{summary['requests_per_second']:>9.1f}"
+                f"{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}{summary['p99_ms']:>9.1f}"
+                f"{'-' if queries is None else f'{queries:.1f}':>9}{summary['errors']:>8}"
+            )
+            if set(summary["statuses"]) - {200}:
+                self.stdout.write(self.style.WARNING(f"  statuses: {summary['statuses']}"))
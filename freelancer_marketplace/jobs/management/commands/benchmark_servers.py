@@ -0,0 +1,113 @@
+import asyncio
+import os
+import shlex
+import shutil
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.benchmark import ASGI_COMMAND, WSGI_COMMAND, running_server
+from jobs.loadgen import run_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the site under a WSGI and an ASGI server in turn and compare "
+        "their throughput and latency on the job browsing pages"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path to request, may be repeated (default: the job list and search)"
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=200,
+            help="Simultaneous client connections"
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=20,
+            help="Seconds of load per server"
+        )
+        parser.add_argument(
+            "--warmup",
+            type=float,
+            default=3,
+            help="Seconds of unmeasured load before each run"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Server worker processes"
+        )
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=8765,
+            help="Local port the servers listen on"
+        )
+        parser.add_argument(
+            "--wsgi-command",
+            default=WSGI_COMMAND,
+            help="Command starting the WSGI server"
+        )
+        parser.add_argument(
+            "--asgi-command",
+            default=ASGI_COMMAND,
+            help="Command starting the ASGI server"
+        )
+        parser.add_argument(
+            "--only",
+            choices=["wsgi", "asgi"],
+            help="Benchmark one server only"
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or ["/jobs/", "/jobs/search/?q=python"]
+        servers = [
+            ("wsgi", options["wsgi_command"], "0"),
+            ("asgi", options["asgi_command"], "1"),
+        ]
+        if options["only"]:
+            servers = [server for server in servers if server[0] == options["only"]]
+
+        results = {}
+        for name, command, async_views in servers:
+            argv = shlex.split(command.format(port=options["port"], workers=options["workers"]))
+            if shutil.which(argv[0]) is None:
+                raise CommandError(f"{argv[0]} is not installed; pip install it or pass --{name}-command")
+            self.stdout.write(f"Starting {name}: {' '.join(argv)}")
+            results[name] = self.benchmark(argv, async_views, paths, options)
+
+        self.stdout.write("")
+        self.stdout.write(f"{'server':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for name, summary in results.items():
+            self.stdout.write(
+                f"{name:<8}{summary['requests_per_second']:>10.1f}{summary['p50_ms']:>10.1f}"
+                f"{summary['p95_ms']:>10.1f}{summary['p99_ms']:>10.1f}{summary['errors']:>8}"
+            )
+        if len(results) == 2 and results["wsgi"]["requests_per_second"]:
+            ratio = results["asgi"]["requests_per_second"] / results["wsgi"]["requests_per_second"]
+            self.stdout.write(self.style.SUCCESS(f"ASGI/WSGI throughput: {ratio:.2f}x"))
+
+    def benchmark(self, argv, async_views, paths, options):
+        base_url = f"http://127.0.0.1:{options['port']}"
+        try:
+            with running_server(argv, base_url, paths[0], JOB_ASYNC_VIEWS=async_views):
+                if options["warmup"]:
+                    asyncio.run(run_load(base_url, paths, options["concurrency"], options["warmup"]))
+                result = asyncio.run(run_load(base_url, paths, options["concurrency"], options["duration"]))
+        except TimeoutError as e:
+            raise CommandError(str(e))
+        summary = result.summary()
+        if summary["errors"] or set(summary["statuses"]) - {200}:
+            self.stdout.write(self.style.WARNING(
+                f"statuses={summary['statuses']} errors={dict(result.errors)}"
+            ))
+        return summary
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.expiry import expire_jobs
+
+
+class Command(BaseCommand):
+    help = "Mark published jobs whose application deadline has passed as expired"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Jobs expired per UPDATE statement"
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, sweeping every --interval seconds"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Seconds between sweeps with --loop"
+        )
+
+    def handle(self, *args, **options):
+        if not options["loop"]:
+            expired = expire_jobs(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Expired {expired} jobs"))
+            return
+
+        try:
+            while True:
+                expired = expire_jobs(batch_size=options["batch_size"])
+                if expired:
+                    self.stdout.write(f"Expired {expired} jobs")
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,77 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.bulk import (
+    FORMATS, JOB_FIELDS, APPLICATION_FIELDS, RecordWriter,
+    export_jobs, export_applications, guess_format
+)
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Stream jobs (or job applications) to a JSONL or CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to write, or - for standard output")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="File format (default: from the file extension, else jsonl)"
+        )
+        parser.add_argument(
+            "--applications",
+            action="store_true",
+            help="Export job applications instead of jobs"
+        )
+        parser.add_argument(
+            "--status",
+            action="append",
+            choices=Job.Status.values,
+            help="Only export jobs with this status (repeatable)"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched per server-side cursor round trip"
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or guess_format(path)
+
+        if options["applications"]:
+            fields = APPLICATION_FIELDS
+            records = export_applications(chunk_size=options["chunk_size"])
+        else:
+            fields = JOB_FIELDS
+            queryset = Job.objects.all()
+            if options["status"]:
+                queryset = queryset.filter(status__in=options["status"])
+            records = export_jobs(queryset, chunk_size=options["chunk_size"])
+
+        started = time.monotonic()
+        try:
+            if path == "-":
+                count = self.write(sys.stdout, fmt, fields, records)
+            else:
+                with open(path, "w", newline="", encoding="utf-8") as stream:
+                    count = self.write(stream, fmt, fields, records)
+        except OSError as error:
+            raise CommandError(error)
+
+        # Progress goes to stderr so the export can be piped
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {count} records in {elapsed:.1f}s ({count / max(elapsed, 1e-9):,.0f} records/s)"
+        ))
+
+    def write(self, stream, fmt, fields, records):
+        writer = RecordWriter(stream, fmt, fields)
+        count = 0
+        for record in records:
+            writer.write(record)
+            count += 1
+        return count
@@ -0,0 +1,106 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.bulk import FORMATS, JobImporter, ApplicationImporter, guess_format, read_records
+from jobs.related import rebuild_related_jobs
+
+
+class Command(BaseCommand):
+    help = "Stream jobs (or job applications) from a JSONL or CSV file into the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, or - for standard input")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="File format (default: from the file extension, else jsonl)"
+        )
+        parser.add_argument(
+            "--applications",
+            action="store_true",
+            help="Import job applications instead of jobs"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Records written per transaction"
+        )
+        parser.add_argument(
+            "--keep-ids",
+            action="store_true",
+            help="Keep the ids from the file (restoring a backup into an empty database)"
+        )
+        parser.add_argument(
+            "--id-map",
+            help="File mapping the jobs' ids in the file to their new ids: written when "
+                 "importing jobs, read when importing their applications"
+        )
+        parser.add_argument(
+            "--no-related",
+            action="store_true",
+            help="Skip rebuilding the related-jobs table after importing jobs"
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or guess_format(path)
+        importer_class = ApplicationImporter if options["applications"] else JobImporter
+        started = time.monotonic()
+
+        def progress(importer):
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{importer.imported} imported, {importer.skipped} skipped "
+                f"({importer.imported / elapsed:,.0f} records/s)"
+            )
+
+        kwargs = dict(
+            batch_size=options["batch_size"],
+            keep_ids=options["keep_ids"],
+            progress=progress if options["verbosity"] > 1 else None
+        )
+        id_map_path = options["id_map"]
+        try:
+            if importer_class is JobImporter:
+                importer = JobImporter(id_map={} if id_map_path else None, **kwargs)
+            else:
+                importer = ApplicationImporter(
+                    job_id_map=self.read_id_map(id_map_path) if id_map_path else None, **kwargs
+                )
+        except ValueError as error:
+            raise CommandError(f"{error} (--keep-ids or --id-map)")
+
+        try:
+            if path == "-":
+                importer.run(read_records(sys.stdin, fmt))
+            else:
+                with open(path, newline="", encoding="utf-8") as stream:
+                    importer.run(read_records(stream, fmt))
+            if importer_class is JobImporter and id_map_path:
+                with open(id_map_path, "w", encoding="utf-8") as stream:
+                    json.dump(importer.id_map, stream)
+        except OSError as error:
+            raise CommandError(error)
+
+        for error in importer.errors:
+            self.stderr.write(error)
+
+        if importer_class is JobImporter and importer.published and not options["no_related"]:
+            rebuild_related_jobs()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.imported} records and skipped {importer.skipped} "
+            f"in {elapsed:.1f}s ({importer.imported / max(elapsed, 1e-9):,.0f} records/s)"
+        ))
+
+    def read_id_map(self, path):
+        try:
+            with open(path, encoding="utf-8") as stream:
+                return {int(source_id): job_id for source_id, job_id in json.load(stream).items()}
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Cannot read the id map {path}: {error}")
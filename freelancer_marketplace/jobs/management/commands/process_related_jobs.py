@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.related import RELATED_JOBS_LIMIT, process_related_queue
+
+
+class Command(BaseCommand):
+    help = "Refresh the related jobs of the jobs queued by edits, publishes and deletes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Queued jobs refreshed per transaction"
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=RELATED_JOBS_LIMIT,
+            help="Number of related jobs stored per job"
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, draining the queue every --interval seconds"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds between runs with --loop"
+        )
+
+    def handle(self, *args, **options):
+        if not options["loop"]:
+            processed = process_related_queue(options["batch_size"], options["limit"])
+            self.stdout.write(self.style.SUCCESS(f"Refreshed related jobs for {processed} jobs"))
+            return
+
+        try:
+            while True:
+                processed = process_related_queue(options["batch_size"], options["limit"])
+                if processed:
+                    self.stdout.write(f"Refreshed related jobs for {processed} jobs")
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.related import RELATED_JOBS_LIMIT, rebuild_related_jobs, sparse
+
+
+class Command(BaseCommand):
+    help = "Recompute the related-jobs table for every published job"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=RELATED_JOBS_LIMIT,
+            help="Number of related jobs stored per job"
+        )
+        parser.add_argument(
+            "--block-size",
+            type=int,
+            default=1000,
+            help="Jobs scored per sparse matrix product"
+        )
+        parser.add_argument(
+            "--python",
+            action="store_true",
+            help="Use the pure Python scorer even if NumPy and SciPy are installed"
+        )
+
+    def handle(self, *args, **options):
+        vectorized = sparse is not None and not options["python"]
+        if sparse is None and not options["python"]:
+            self.stdout.write(self.style.WARNING(
+                "NumPy/SciPy not installed, falling back to the pure Python scorer"
+            ))
+        started = time.monotonic()
+        jobs, rows = rebuild_related_jobs(
+            limit=options["limit"],
+            block_size=options["block_size"],
+            vectorized=vectorized
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {rows} related jobs for {jobs} published jobs in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from jobs.popularity import rebuild_skill_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the published job counters used for popular skills"
+
+    def handle(self, *args, **options):
+        skills, category_skills = rebuild_skill_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt counts for {skills} skills and {category_skills} category/skill pairs"
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from freelancer_marketplace.replicas import REPLICA_MAX_LAG, get_replicas, measure_lag
+
+
+class Command(BaseCommand):
+    help = "Show how far each read replica is behind the primary"
+
+    def handle(self, *args, **options):
+        replicas = get_replicas()
+        if not replicas:
+            self.stdout.write("No replicas configured (set DB_REPLICA_HOSTS)")
+            return
+        for alias in replicas:
+            lag = measure_lag(alias)
+            if lag is None:
+                self.stdout.write(self.style.ERROR(f"{alias:<12} unreachable"))
+            elif lag > REPLICA_MAX_LAG:
+                self.stdout.write(self.style.WARNING(f"{alias:<12} lag={lag:.1f}s (skipped, over {REPLICA_MAX_LAG}s)"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{alias:<12} lag={lag:.1f}s"))
@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from jobs.seed import DEFAULT_PASSWORD, MarketplaceSeeder, seed_email
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a deterministic synthetic marketplace (users, skills, "
+        "jobs and applications) for load testing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hirers", type=int, default=500, help="Hirer accounts to create")
+        parser.add_argument("--freelancers", type=int, default=5000, help="Freelancer accounts to create")
+        parser.add_argument("--skills", type=int, default=300, help="Skills to create or reuse")
+        parser.add_argument("--jobs", type=int, default=20000, help="Jobs to create")
+        parser.add_argument("--applications", type=int, default=200000, help="Job applications to create")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same data")
+        parser.add_argument(
+            "--prefix",
+            default="seed",
+            help="Prefix of the seeded usernames and emails, e.g. seed-hirer-0@example.com"
+        )
+        parser.add_argument(
+            "--skill-exponent",
+            type=float,
+            default=1.1,
+            help="Exponent of the Zipf curve of skill popularity"
+        )
+        parser.add_argument("--batch-size", type=int, default=10000, help="Rows written per statement")
+        parser.add_argument(
+            "--password",
+            default=DEFAULT_PASSWORD,
+            help="Password of every seeded account"
+        )
+        parser.add_argument(
+            "--no-related",
+            action="store_true",
+            help="Skip rebuilding the related-jobs table"
+        )
+
+    def handle(self, *args, **options):
+        volumes = {name: options[name] for name in ("hirers", "freelancers", "skills", "jobs", "applications")}
+        if any(value < 0 for value in volumes.values()) or options["batch_size"] < 1:
+            raise CommandError("Volumes cannot be negative and --batch-size must be positive")
+        if volumes["jobs"] and not volumes["hirers"]:
+            raise CommandError("Jobs need at least one hirer")
+        if volumes["jobs"] and not volumes["skills"]:
+            raise CommandError("Jobs need at least one skill")
+        if volumes["applications"] > volumes["jobs"] * volumes["freelancers"]:
+            raise CommandError("A freelancer applies to a job at most once: add jobs or freelancers")
+        prefix = options["prefix"]
+        if User.objects.filter(email__in=[
+            seed_email(prefix, User.Role.HIRER, 0), seed_email(prefix, User.Role.FREELANCER, 0)
+        ]).exists():
+            raise CommandError(f"This database is already seeded with --prefix {prefix}; pick another prefix")
+
+        started = time.monotonic()
+
+        def progress(step, written):
+            elapsed = time.monotonic() - started
+            self.stdout.write(f"{step}: {written:,} ({elapsed:.1f}s)")
+
+        seeder = MarketplaceSeeder(
+            **volumes,
+            seed=options["seed"],
+            prefix=prefix,
+            skill_exponent=options["skill_exponent"],
+            batch_size=options["batch_size"],
+            password=options["password"],
+            related=not options["no_related"],
+            progress=progress if options["verbosity"] > 1 else None
+        )
+        counts = seeder.run()
+
+        elapsed = time.monotonic() - started
+        summary = ", ".join(f"{written:,} {step}" for step, written in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Seeded {summary} in {elapsed:.1f}s"))
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_search_document(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Skill = apps.get_model('jobs', 'Skill')
+    
+    skill_names = Skill.objects.filter(
+        jobs=OuterRef('pk')
+    ).order_by().values('jobs').annotate(
+        names=StringAgg('name', delimiter=' ')
+    ).values('names')
+    
+    Job.objects.update(
+        search_document=(
+            SearchVector('title', weight='A', config='english') +
+            SearchVector(Coalesce(Subquery(skill_names), Value(''), output_field=TextField()), weight='B', config='english') +
+            SearchVector('description', weight='C', config='english')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_create_job_categories'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='job_search_document_gin'),
+        ),
+        migrations.RunPython(populate_search_document, migrations.RunPython.noop),
+    ]
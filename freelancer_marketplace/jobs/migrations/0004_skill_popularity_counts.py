@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:14
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def populate_skill_counts(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Skill = apps.get_model('jobs', 'Skill')
+    CategorySkill = apps.get_model('jobs', 'CategorySkill')
+    
+    published = Job.skills.through.objects.filter(job__status='PUBLISHED').order_by()
+    
+    for row in published.values('skill_id').annotate(jobs=Count('job_id')):
+        Skill.objects.filter(pk=row['skill_id']).update(published_job_count=row['jobs'])
+    
+    CategorySkill.objects.bulk_create([
+        CategorySkill(category_id=row['job__category_id'], skill_id=row['skill_id'], job_count=row['jobs'])
+        for row in published.filter(job__category__isnull=False).values(
+            'job__category_id', 'skill_id'
+        ).annotate(jobs=Count('job_id'))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='published_job_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='Number of published jobs requiring this skill', verbose_name='Published Jobs'),
+        ),
+        migrations.CreateModel(
+            name='CategorySkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_count', models.PositiveIntegerField(default=0, verbose_name='Published Jobs')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_counts', to='jobs.category', verbose_name='Category')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_counts', to='jobs.skill', verbose_name='Skill')),
+            ],
+            options={
+                'verbose_name': 'Category Skill Count',
+                'verbose_name_plural': 'Category Skill Counts',
+                'indexes': [models.Index(fields=['category', '-job_count'], name='category_skill_popular_idx')],
+                'unique_together': {('category', 'skill')},
+            },
+        ),
+        migrations.RunPython(populate_skill_counts, migrations.RunPython.noop),
+    ]
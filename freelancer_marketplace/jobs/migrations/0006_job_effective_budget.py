@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:18
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_effective_budget(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.update(
+        effective_budget_low=Coalesce('fixed_budget', 'budget_min'),
+        effective_budget_high=Coalesce('fixed_budget', 'budget_max'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_published_budget_max_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_published_budget_min_idx',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='effective_budget_high',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True, verbose_name='Effective Maximum Budget'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='effective_budget_low',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True, verbose_name='Effective Minimum Budget'),
+        ),
+        migrations.RunPython(populate_effective_budget, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(models.OrderBy(models.F('effective_budget_high'), descending=True, nulls_last=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('status', 'PUBLISHED')), name='job_published_budget_high_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'PUBLISHED')), fields=['effective_budget_low', 'id'], name='job_published_budget_low_idx'),
+        ),
+    ]
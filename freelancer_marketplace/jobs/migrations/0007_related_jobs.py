@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_effective_budget'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Similarity Score')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='jobs.job', verbose_name='Job')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to_entries', to='jobs.job', verbose_name='Related Job')),
+            ],
+            options={
+                'verbose_name': 'Related Job',
+                'verbose_name_plural': 'Related Jobs',
+                'indexes': [models.Index(fields=['job', '-score'], name='related_job_score_idx')],
+                'unique_together': {('job', 'related')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:24
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+
+def populate_excerpt(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    batch = []
+    for job in Job.objects.only('pk', 'description').iterator(chunk_size=1000):
+        job.excerpt = Truncator(strip_tags(job.description)).chars(150)
+        batch.append(job)
+        if len(batch) == 1000:
+            Job.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Job.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_related_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, help_text='Plain-text start of the description, kept in sync on save', max_length=150, verbose_name='Excerpt'),
+        ),
+        migrations.RunPython(populate_excerpt, migrations.RunPython.noop),
+    ]
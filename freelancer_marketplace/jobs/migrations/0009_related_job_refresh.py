@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:16
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedJobRefresh',
+            fields=[
+                ('job_id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Job')),
+                ('queued_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Queued At')),
+            ],
+            options={
+                'verbose_name': 'Related Jobs Refresh',
+                'verbose_name_plural': 'Related Jobs Refreshes',
+            },
+        ),
+    ]
@@ -1,10 +1,41 @@
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.utils import timezone
 from django.urls import reverse
 from accounts.models import User
 
+# Budget columns and the normalized columns derived from them
+BUDGET_FIELDS = {"budget_min", "budget_max", "fixed_budget"}
+EFFECTIVE_BUDGET_FIELDS = {"effective_budget_low", "effective_budget_high"}
+
+# Length of the plain-text description excerpt shown on job cards
+EXCERPT_LENGTH = 150
+
+
+def description_excerpt(description):
+    """
+    Plain-text excerpt of a job description, as job cards display it
+    """
+    return Truncator(strip_tags(description)).chars(EXCERPT_LENGTH)
+
+
+def effective_budget_expressions():
+    """
+    Database-side equivalent of Job.save()'s effective budget computation,
+    for bulk updates
+    """
+    return {
+        "effective_budget_low": Coalesce("fixed_budget", "budget_min"),
+        "effective_budget_high": Coalesce("fixed_budget", "budget_max"),
+    }
+
+
 class Category(models.Model):
     """
     Job categories for organizing job listings
@@ -31,6 +62,13 @@ class Skill(models.Model):
     """
     name = models.CharField(_("Skill Name"), max_length=100)
     slug = models.SlugField(_("Slug"), unique=True)
+    published_job_count = models.PositiveIntegerField(
+        _("Published Jobs"),
+        default=0,
+        db_index=True,
+        editable=False,
+        help_text=_("Number of published jobs requiring this skill")
+    )
     
     class Meta:
         verbose_name = _("Skill")
@@ -41,6 +79,32 @@ class Skill(models.Model):
         return self.name
 
 
+def open_job_filter():
+    """
+    Published jobs whose deadline has not passed, whether or not the expiry
+    sweeper (jobs.expiry) has marked them expired yet
+    """
+    return models.Q(status=Job.Status.PUBLISHED) & (
+        models.Q(deadline__isnull=True) | models.Q(deadline__gte=timezone.now())
+    )
+
+
+class JobQuerySet(models.QuerySet):
+    
+    def open(self):
+        return self.filter(open_job_filter())
+    
+    def for_listing(self):
+        """
+        Jobs as list pages render them: category joined and the excerpt in
+        place of the full description. Skills are prefetched by
+        jobs.fragments for the cards that are not cached.
+        """
+        return self.select_related("category").defer(
+            "description", "search_document"
+        )
+
+
 class Job(models.Model):
     """
     Job posting model containing all job details
@@ -60,6 +124,13 @@ class Job(models.Model):
     # Basic Job Info
     title = models.CharField(_("Job Title"), max_length=200)
     description = models.TextField(_("Job Description"))
+    excerpt = models.CharField(
+        _("Excerpt"),
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+        help_text=_("Plain-text start of the description, kept in sync on save")
+    )
     
     # Job Metadata
     hirer = models.ForeignKey(
@@ -111,6 +182,24 @@ class Job(models.Model):
         blank=True,
         help_text=_("If this is a fixed-price job, specify the budget here")
     )
+    # Budget window normalized across pricing models (the fixed budget, or
+    # the range), kept in sync by save() so filters and sorts use one column
+    effective_budget_low = models.DecimalField(
+        _("Effective Minimum Budget"),
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False
+    )
+    effective_budget_high = models.DecimalField(
+        _("Effective Maximum Budget"),
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False
+    )
     duration = models.CharField(
         _("Estimated Duration"), 
         max_length=100, 
@@ -150,14 +239,72 @@ class Job(models.Model):
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
     
+    # Full-text search document (title > skills > description), kept up to
+    # date by the signals in jobs.signals
+    search_document = SearchVectorField(null=True, editable=False)
+    
+    objects = JobQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _("Job")
         verbose_name_plural = _("Jobs")
         ordering = ["-created_at"]
+        indexes = [
+            GinIndex(fields=["search_document"], name="job_search_document_gin"),
+            # Public listings (JobListView, CategoryDetailView, related jobs),
+            # matching the keyset pagination order of each sort option
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(status="PUBLISHED"),
+                name="job_published_recent_idx",
+            ),
+            models.Index(
+                fields=["category", "-created_at", "-id"],
+                condition=models.Q(status="PUBLISHED", is_public=True),
+                name="job_published_cat_recent_idx",
+            ),
+            models.Index(
+                models.F("effective_budget_high").desc(nulls_last=True), models.F("id").desc(),
+                condition=models.Q(status="PUBLISHED"),
+                name="job_published_budget_high_idx",
+            ),
+            models.Index(
+                fields=["effective_budget_low", "id"],
+                condition=models.Q(status="PUBLISHED"),
+                name="job_published_budget_low_idx",
+            ),
+            models.Index(
+                fields=["deadline", "id"],
+                condition=models.Q(status="PUBLISHED"),
+                name="job_published_deadline_idx",
+            ),
+            # Hirer dashboard (MyJobsView)
+            models.Index(fields=["hirer", "-created_at", "-id"], name="job_hirer_recent_idx"),
+        ]
     
     def __str__(self):
         return self.title
     
+    def update_derived_fields(self):
+        """Recompute the columns derived from other fields (also used before bulk_create)"""
+        self.effective_budget_low = self.fixed_budget if self.fixed_budget is not None else self.budget_min
+        self.effective_budget_high = self.fixed_budget if self.fixed_budget is not None else self.budget_max
+        
+        # Deferred on list querysets; loading it here would save it too
+        if "description" not in self.get_deferred_fields():
+            self.excerpt = description_excerpt(self.description)
+    
+    def save(self, *args, **kwargs):
+        self.update_derived_fields()
+        
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and BUDGET_FIELDS.intersection(update_fields):
+            update_fields = kwargs["update_fields"] = set(update_fields) | EFFECTIVE_BUDGET_FIELDS
+        if update_fields is not None and "description" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"excerpt"}
+        
+        super().save(*args, **kwargs)
+    
     def get_absolute_url(self):
         return reverse("jobs:job_detail", kwargs={"pk": self.pk})
     
@@ -168,6 +315,18 @@ class Job(models.Model):
             return timezone.now() > self.deadline
         return False
     
+    @property
+    def is_open(self):
+        """Check if job is published and still accepting applications"""
+        return self.status == self.Status.PUBLISHED and not self.is_expired
+    
+    @property
+    def effective_status(self):
+        """Status as readers should see it, before the expiry sweeper runs"""
+        if self.status == self.Status.PUBLISHED and self.is_expired:
+            return self.Status.EXPIRED
+        return self.Status(self.status)
+    
     def update_status(self):
         """Update job status based on deadline"""
         if self.status == self.Status.PUBLISHED and self.is_expired:
@@ -222,9 +381,95 @@ class JobApplication(models.Model):
         ordering = ["-created_at"]
         # Ensure a freelancer can only apply once to a job
         unique_together = ["job", "freelancer"]
+        indexes = [
+            # JobApplicationsView / MyApplicationsView, with and without a status
+            models.Index(fields=["job", "status", "-created_at"], name="jobapp_job_status_idx"),
+            models.Index(fields=["job", "-created_at", "-id"], name="jobapp_job_recent_idx"),
+            models.Index(fields=["freelancer", "status", "-created_at"], name="jobapp_freelancer_status_idx"),
+            models.Index(fields=["freelancer", "-created_at", "-id"], name="jobapp_freelancer_recent_idx"),
+        ]
     
     def __str__(self):
         return f"{self.freelancer} - {self.job}"
     
     def get_absolute_url(self):
         return reverse("jobs:application_detail", kwargs={"pk": self.pk})
+
+
+class CategorySkill(models.Model):
+    """
+    Number of published jobs in a category that require a given skill
+    """
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="skill_counts",
+        verbose_name=_("Category")
+    )
+    skill = models.ForeignKey(
+        Skill,
+        on_delete=models.CASCADE,
+        related_name="category_counts",
+        verbose_name=_("Skill")
+    )
+    job_count = models.PositiveIntegerField(_("Published Jobs"), default=0)
+    
+    class Meta:
+        verbose_name = _("Category Skill Count")
+        verbose_name_plural = _("Category Skill Counts")
+        unique_together = ["category", "skill"]
+        indexes = [
+            models.Index(fields=["category", "-job_count"], name="category_skill_popular_idx"),
+        ]
+    
+    def __str__(self):
+        return f"{self.category} - {self.skill} ({self.job_count})"
+
+
+class RelatedJob(models.Model):
+    """
+    Precomputed similar published jobs for a job, maintained by jobs.related
+    """
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.CASCADE,
+        related_name="related_entries",
+        verbose_name=_("Job")
+    )
+    related = models.ForeignKey(
+        Job,
+        on_delete=models.CASCADE,
+        related_name="related_to_entries",
+        verbose_name=_("Related Job")
+    )
+    score = models.FloatField(_("Similarity Score"))
+    
+    class Meta:
+        verbose_name = _("Related Job")
+        verbose_name_plural = _("Related Jobs")
+        unique_together = ["job", "related"]
+        indexes = [
+            # JobDetailView reads one job's list, best match first
+            models.Index(fields=["job", "-score"], name="related_job_score_idx"),
+        ]
+    
+    def __str__(self):
+        return f"{self.job} - {self.related} ({self.score:.2f})"
+
+
+class RelatedJobRefresh(models.Model):
+    """
+    Job whose related-jobs entries are out of date, queued by jobs.signals
+    and drained by the process_related_jobs command
+    """
+    # Not a foreign key: queueing the lists of a deleted job's neighbours
+    # must not depend on whether they are being deleted too
+    job_id = models.BigIntegerField(_("Job"), primary_key=True)
+    queued_at = models.DateTimeField(_("Queued At"), default=timezone.now, db_index=True)
+    
+    class Meta:
+        verbose_name = _("Related Jobs Refresh")
+        verbose_name_plural = _("Related Jobs Refreshes")
+    
+    def __str__(self):
+        return f"{self.job_id} ({self.queued_at})"
@@ -0,0 +1,396 @@
+import asyncio
+import base64
+import binascii
+import json
+import operator
+from datetime import date, datetime
+from decimal import Decimal
+from functools import reduce
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Count, F, Q
+from django.http import Http404
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+# Cursor directions
+NEXT = 'n'
+PREVIOUS = 'p'
+
+# Count modes
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATE = 'estimate'
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        # isoformat keeps full microsecond precision, unlike DjangoJSONEncoder
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(direction, values):
+    """
+    Build an opaque token from a direction and the position's sort values
+    """
+    payload = json.dumps([direction, [_encode_value(v) for v in values]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Reverse encode_cursor, raising InvalidCursor for anything malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor(_('Invalid cursor'))
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+        raise InvalidCursor(_('Invalid cursor'))
+    return direction, values
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for a queryset instead of running COUNT(*)
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class SortKey:
+    """
+    One column of a keyset ordering
+    """
+    def __init__(self, name, descending, field=None):
+        self.name = name
+        self.descending = descending
+        self.field = field
+
+    @property
+    def nullable(self):
+        return self.field is not None and self.field.null
+
+    def order_by(self, reverse=False):
+        descending = self.descending != reverse
+        expression = F(self.name)
+        if not self.nullable:
+            return expression.desc() if descending else expression.asc()
+        # Nulls always sort after every value when paging forward
+        nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+        return expression.desc(**nulls) if descending else expression.asc(**nulls)
+
+    def to_python(self, value):
+        if value is None or self.field is None:
+            return value
+        try:
+            return self.field.to_python(value)
+        except ValidationError:
+            raise InvalidCursor(_('Invalid cursor'))
+
+    def equals(self, value):
+        if value is None:
+            return Q(**{f'{self.name}__isnull': True})
+        return Q(**{self.name: value})
+
+    def after(self, value, reverse=False):
+        """
+        Rows that sort strictly after ``value`` (or before, when ``reverse``)
+        """
+        descending = self.descending != reverse
+        lookup = 'lt' if descending else 'gt'
+        if not self.nullable:
+            return Q(**{f'{self.name}__{lookup}': value})
+        if reverse:
+            # Nulls sort last going forward, so every value precedes them
+            if value is None:
+                return Q(**{f'{self.name}__isnull': False})
+            return Q(**{f'{self.name}__{lookup}': value})
+        if value is None:
+            return Q(pk__in=[])
+        return Q(**{f'{self.name}__{lookup}': value}) | Q(**{f'{self.name}__isnull': True})
+
+
+class CursorPage:
+    """
+    A page of results with opaque tokens for the neighbouring pages
+    """
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: every page is an index range scan continuing from the
+    last row of the previous one, so deep pages cost the same as the first.
+
+    The sort keys are taken from the queryset's ordering, with the primary
+    key appended as a tie-breaker. ``count_mode`` controls ``count``:
+    ``'exact'`` runs COUNT(*), ``'estimate'`` asks the query planner and
+    ``None`` skips counting entirely.
+    """
+    def __init__(self, queryset, per_page, ordering=None, count_mode=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.count_mode = count_mode
+        self.sort_keys = self._get_sort_keys(ordering or queryset.query.order_by or queryset.model._meta.ordering)
+
+    def _get_sort_keys(self, ordering):
+        opts = self.queryset.model._meta
+        keys = []
+        for name in ordering:
+            if not isinstance(name, str):
+                raise ValueError('CursorPaginator only supports field name orderings')
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            if name == 'pk':
+                name = opts.pk.name
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                field = None  # An annotation such as a search rank
+            keys.append(SortKey(name, descending, field))
+
+        if not any(key.name == opts.pk.name for key in keys):
+            # The primary key makes the ordering total
+            descending = keys[0].descending if keys else True
+            keys.append(SortKey(opts.pk.name, descending, opts.pk))
+        return keys
+
+    def _position(self, obj):
+        return [getattr(obj, key.name) for key in self.sort_keys]
+
+    def cursor_for(self, obj, direction=NEXT):
+        """
+        Return the token for the rows after ``obj`` (or before, for PREVIOUS)
+        """
+        return encode_cursor(direction, self._position(obj))
+
+    def _seek(self, values, reverse=False):
+        """
+        Build the keyset predicate for rows after (or before) a position
+        """
+        branches = []
+        equal = Q()
+        for key, value in zip(self.sort_keys, values):
+            branches.append(equal & key.after(value, reverse))
+            equal &= key.equals(value)
+        condition = reduce(operator.or_, branches)
+
+        # A redundant bound on the leading column lets the planner use it as
+        # an index range instead of filtering the OR branch by branch
+        first, value = self.sort_keys[0], values[0]
+        if not first.nullable:
+            lookup = 'lte' if first.descending != reverse else 'gte'
+            condition &= Q(**{f'{first.name}__{lookup}': value})
+        return condition
+
+    @cached_property
+    def count(self):
+        if self.count_mode == COUNT_EXACT:
+            return self.queryset.count()
+        if self.count_mode == COUNT_ESTIMATE:
+            return estimate_count(self.queryset)
+        return None
+
+    def _decode(self, cursor):
+        if not cursor:
+            return NEXT, None
+        direction, values = decode_cursor(cursor)
+        if len(values) != len(self.sort_keys):
+            raise InvalidCursor(_('Invalid cursor'))
+        return direction, [key.to_python(value) for key, value in zip(self.sort_keys, values)]
+
+    def _page_queryset(self, direction, values):
+        reverse = direction == PREVIOUS
+        queryset = self.queryset.order_by(*[key.order_by(reverse) for key in self.sort_keys])
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+        # Fetch one extra row to know whether there is another page
+        return queryset[:self.per_page + 1]
+
+    def page_queryset(self, cursor=None):
+        """
+        Return the exact query a page is fetched with (useful for EXPLAIN)
+        """
+        return self._page_queryset(*self._decode(cursor))
+
+    def _make_page(self, rows, direction, values):
+        reverse = direction == PREVIOUS
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or reverse:
+                next_cursor = self.cursor_for(rows[-1])
+            if (has_more and reverse) or (values is not None and not reverse):
+                previous_cursor = self.cursor_for(rows[0], PREVIOUS)
+
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    def page(self, cursor=None):
+        direction, values = self._decode(cursor)
+        return self._make_page(list(self._page_queryset(direction, values)), direction, values)
+
+    async def apage(self, cursor=None):
+        direction, values = self._decode(cursor)
+        rows = [row async for row in self._page_queryset(direction, values).aiterator()]
+        return self._make_page(rows, direction, values)
+
+    async def acount(self):
+        """
+        Async counterpart of ``count``; the result is cached the same way
+        """
+        if 'count' not in self.__dict__:
+            if self.count_mode == COUNT_EXACT:
+                self.__dict__['count'] = await self.queryset.acount()
+            elif self.count_mode == COUNT_ESTIMATE:
+                self.__dict__['count'] = await sync_to_async(estimate_count)(self.queryset)
+            else:
+                self.__dict__['count'] = None
+        return self.count
+
+
+class CursorPaginationMixin:
+    """
+    ListView mixin that swaps Django's OFFSET paginator for CursorPaginator
+    """
+    cursor_kwarg = 'cursor'
+    paginate_count = None
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, count_mode=self.paginate_count)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404(_('Invalid page.'))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """
+        Async paginate_queryset; the page and the count are fetched concurrently
+        """
+        paginator = CursorPaginator(queryset, page_size, count_mode=self.paginate_count)
+        try:
+            page, count = await asyncio.gather(
+                paginator.apage(self.request.GET.get(self.cursor_kwarg)),
+                paginator.acount()
+            )
+        except InvalidCursor:
+            raise Http404(_('Invalid page.'))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_page_url(self, cursor):
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        params[self.cursor_kwarg] = cursor
+        return '?' + params.urlencode()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if page is not None:
+            if page.has_next():
+                context['next_page_url'] = self.get_page_url(page.next_cursor)
+            if page.has_previous():
+                context['previous_page_url'] = self.get_page_url(page.previous_cursor)
+        return context
+
+
+class StatusTabsMixin:
+    """
+    ListView mixin that splits a list into status tabs. Only the selected tab
+    is fetched (and paginated on its own); every tab's count comes from one
+    conditional-aggregation query.
+
+    ``status_tabs`` maps each tab's key to a (label, statuses) pair; the first
+    tab is selected by default. Views implement get_base_queryset(), and can
+    override get_tab_filter() when a tab is not just a set of statuses.
+    """
+    status_kwarg = 'status'
+    status_tabs = {}
+
+    def get_base_queryset(self):
+        raise NotImplementedError
+
+    def get_status_tab(self):
+        tab = self.request.GET.get(self.status_kwarg)
+        return tab if tab in self.status_tabs else next(iter(self.status_tabs))
+
+    def get_tab_filter(self, key, statuses):
+        return Q(status__in=statuses)
+
+    def get_queryset(self):
+        self.status_tab = self.get_status_tab()
+        label, statuses = self.status_tabs[self.status_tab]
+        return self.get_base_queryset().filter(self.get_tab_filter(self.status_tab, statuses))
+
+    def get_status_counts(self):
+        return self.get_base_queryset().order_by().aggregate(**{
+            key: Count('pk', filter=self.get_tab_filter(key, statuses))
+            for key, (label, statuses) in self.status_tabs.items()
+        })
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        counts = self.get_status_counts()
+        params = self.request.GET.copy()
+        for name in (getattr(self, 'cursor_kwarg', 'cursor'), 'page'):
+            params.pop(name, None)
+
+        tabs = []
+        for key, (label, statuses) in self.status_tabs.items():
+            params[self.status_kwarg] = key
+            tabs.append({
+                'key': key,
+                'label': label,
+                'count': counts[key],
+                'selected': key == self.status_tab,
+                'url': '?' + params.urlencode(),
+            })
+        context['status_tabs'] = tabs
+        context['status_tab'] = self.status_tab
+        context['status_counts'] = counts
+        return context
@@ -0,0 +1,126 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, IntegerField, Value
+from django.db.models.functions import Coalesce
+
+from .models import Job, Skill, CategorySkill
+
+
+def is_counted(status):
+    """
+    Only published jobs contribute to skill popularity
+    """
+    return status == Job.Status.PUBLISHED
+
+
+def _adjust_category_counts(category_id, skill_ids, delta):
+    if delta > 0:
+        # Make sure a counter row exists for every (category, skill) pair
+        CategorySkill.objects.bulk_create(
+            [CategorySkill(category_id=category_id, skill_id=skill_id) for skill_id in skill_ids],
+            ignore_conflicts=True
+        )
+    CategorySkill.objects.filter(
+        category_id=category_id, skill_id__in=skill_ids
+    ).update(job_count=F('job_count') + delta)
+
+
+def adjust_skill_counts(skill_ids, category_id, delta):
+    """
+    Add ``delta`` to the published job count of each skill, globally and
+    within the given category
+    """
+    skill_ids = list(skill_ids)
+    if not skill_ids or not delta:
+        return
+
+    Skill.objects.filter(pk__in=skill_ids).update(
+        published_job_count=F('published_job_count') + delta
+    )
+    if category_id is not None:
+        _adjust_category_counts(category_id, skill_ids, delta)
+
+
+def adjust_job_counts(job_ids, skill_id, delta):
+    """
+    Add ``delta`` to one skill's counts for each published job in ``job_ids``
+    """
+    rows = list(
+        Job.objects.filter(
+            pk__in=job_ids, status=Job.Status.PUBLISHED
+        ).order_by().values('category_id').annotate(jobs=Count('pk'))
+    )
+    total = sum(row['jobs'] for row in rows)
+    if not total:
+        return
+
+    Skill.objects.filter(pk=skill_id).update(
+        published_job_count=F('published_job_count') + delta * total
+    )
+    for row in rows:
+        if row['category_id'] is not None:
+            _adjust_category_counts(row['category_id'], [skill_id], delta * row['jobs'])
+
+
+def adjust_counts_for_jobs(job_ids, delta):
+    """
+    Add ``delta`` to the counters of every skill of the given jobs, for jobs
+    entering or leaving the published status in bulk (queryset updates and
+    bulk inserts send no signals)
+    """
+    rows = Job.skills.through.objects.filter(
+        job_id__in=job_ids
+    ).order_by().values('job__category_id', 'skill_id').annotate(jobs=Count('job_id'))
+
+    skill_totals = defaultdict(int)
+    category_groups = defaultdict(lambda: defaultdict(list))
+    for row in rows:
+        skill_totals[row['skill_id']] += row['jobs']
+        if row['job__category_id'] is not None:
+            category_groups[row['job__category_id']][row['jobs']].append(row['skill_id'])
+
+    # One UPDATE per distinct job count rather than per skill
+    skill_groups = defaultdict(list)
+    for skill_id, jobs in skill_totals.items():
+        skill_groups[jobs].append(skill_id)
+    for jobs, skill_ids in skill_groups.items():
+        adjust_skill_counts(skill_ids, None, delta * jobs)
+    for category_id, groups in category_groups.items():
+        for jobs, skill_ids in groups.items():
+            _adjust_category_counts(category_id, skill_ids, delta * jobs)
+
+
+@transaction.atomic
+def rebuild_skill_counts():
+    """
+    Recompute every counter from the Job.skills through table
+    """
+    through = Job.skills.through
+    published = through.objects.filter(job__status=Job.Status.PUBLISHED).order_by()
+
+    skill_counts = published.filter(
+        skill_id=OuterRef('pk')
+    ).values('skill_id').annotate(jobs=Count('job_id')).values('jobs')
+    updated = Skill.objects.update(
+        published_job_count=Coalesce(
+            Subquery(skill_counts, output_field=IntegerField()), Value(0)
+        )
+    )
+
+    CategorySkill.objects.all().delete()
+    rows = published.filter(job__category__isnull=False).values(
+        'job__category_id', 'skill_id'
+    ).annotate(jobs=Count('job_id'))
+    created = CategorySkill.objects.bulk_create(
+        [
+            CategorySkill(
+                category_id=row['job__category_id'],
+                skill_id=row['skill_id'],
+                job_count=row['jobs']
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=1000
+    )
+    return updated, len(created)
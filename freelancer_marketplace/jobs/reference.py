@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import Category, Skill
+
+# Shared cache holding the version token, how often each process re-reads
+# it (seconds) and how many of the most used skills are kept in memory
+REFERENCE_CACHE_ALIAS = getattr(settings, 'JOB_REFERENCE_CACHE_ALIAS', 'default')
+REFERENCE_CHECK_INTERVAL = getattr(settings, 'JOB_REFERENCE_CHECK_INTERVAL', 1)
+HOT_SKILL_COUNT = getattr(settings, 'JOB_REFERENCE_HOT_SKILLS', 1000)
+
+REFERENCE_VERSION_KEY = 'jobs:reference:version'
+
+ReferenceSnapshot = namedtuple(
+    'ReferenceSnapshot',
+    'version categories categories_by_id categories_by_slug skills_by_id skills_by_slug'
+)
+
+
+class ReferenceData:
+    """
+    Process-local copy of all categories and the most used skills.
+
+    Each process rebuilds its snapshot when the version token in the shared
+    cache changes; the token is bumped whenever a Category or Skill is saved
+    or deleted (see jobs.signals). Cached instances are shared between
+    requests and must be treated as read-only; skill counters on them are
+    as of the last rebuild.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def get_cache(self):
+        return caches[REFERENCE_CACHE_ALIAS]
+
+    def version(self):
+        """
+        Return the shared version token, re-read at most once per
+        REFERENCE_CHECK_INTERVAL seconds
+        """
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= REFERENCE_CHECK_INTERVAL:
+            cache = self.get_cache()
+            version = cache.get(REFERENCE_VERSION_KEY)
+            if version is None:
+                # Started from the clock so an evicted token never repeats
+                cache.add(REFERENCE_VERSION_KEY, int(time.time() * 1000), timeout=None)
+                version = cache.get(REFERENCE_VERSION_KEY)
+            self._version, self._checked_at = version, now
+        return self._version
+
+    def _build(self, version):
+        # Read from the primary: a lagging replica would pin old names to
+        # the new version until the next change
+        categories = list(Category.objects.using(DEFAULT_DB_ALIAS))
+        skills = list(
+            Skill.objects.using(DEFAULT_DB_ALIAS).order_by('-published_job_count', 'name')[:HOT_SKILL_COUNT]
+        )
+        return ReferenceSnapshot(
+            version,
+            categories,
+            {category.pk: category for category in categories},
+            {category.slug: category for category in categories},
+            {skill.pk: skill for skill in skills},
+            {skill.slug: skill for skill in skills},
+        )
+
+    def snapshot(self):
+        version = self.version()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != version:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.version != version:
+                    snapshot = self._snapshot = self._build(version)
+        return snapshot
+
+    def _bump(self):
+        try:
+            self.get_cache().incr(REFERENCE_VERSION_KEY)
+        except ValueError:
+            # Nothing stored yet: the next read starts a fresh version
+            pass
+        self.clear()
+
+    def clear(self):
+        self._snapshot = self._version = None
+
+    def invalidate(self):
+        """
+        Drop this process's snapshot now and every other process's once the
+        current transaction commits
+        """
+        self.clear()
+        transaction.on_commit(self._bump)
+
+    def categories(self):
+        return self.snapshot().categories
+
+    def category(self, pk):
+        return self.snapshot().categories_by_id.get(pk)
+
+    def category_by_slug(self, slug):
+        return self.snapshot().categories_by_slug.get(slug)
+
+    def skill_by_slug(self, slug):
+        """
+        Return a hot skill by slug, or None if it is not held in memory
+        """
+        return self.snapshot().skills_by_slug.get(slug)
+
+    def get_skills(self, pks):
+        """
+        Return {pk: Skill} for the given ids: hot skills from memory, the rest
+        with one query
+        """
+        cached = self.snapshot().skills_by_id
+        skills = {pk: cached[pk] for pk in pks if pk in cached}
+        missing = set(pks) - set(skills)
+        if missing:
+            skills.update((skill.pk, skill) for skill in Skill.objects.filter(pk__in=missing))
+        return skills
+
+
+reference_data = ReferenceData()
@@ -0,0 +1,396 @@
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job, RelatedJob, RelatedJobRefresh, Skill
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - the bulk rebuild falls back to pure Python
+    np = sparse = None
+
+# Number of related jobs stored (and shown) per job
+RELATED_JOBS_LIMIT = getattr(settings, 'JOB_RELATED_JOBS_LIMIT', 5)
+
+# Bounds on the jobs scored when one job's list is refreshed: its rarest
+# skills matched, and the newest jobs taken per skill and category match
+RELATED_CANDIDATE_SKILLS = getattr(settings, 'JOB_RELATED_CANDIDATE_SKILLS', 3)
+RELATED_CANDIDATE_LIMIT = getattr(settings, 'JOB_RELATED_CANDIDATE_LIMIT', 500)
+
+# Similarity weights; a candidate must share a skill or the category
+SKILL_WEIGHT = 0.6
+CATEGORY_WEIGHT = 0.2
+EXPERIENCE_WEIGHT = 0.1
+BUDGET_WEIGHT = 0.1
+
+JobFeatures = namedtuple(
+    'JobFeatures', 'pk skills category_id experience_level budget_low budget_high is_public'
+)
+
+
+def load_features(queryset):
+    """
+    Return {pk: JobFeatures} for the jobs in ``queryset``, in two queries
+    """
+    skills = defaultdict(set)
+    through = Job.skills.through.objects.filter(job_id__in=queryset.values('pk'))
+    for job_id, skill_id in through.values_list('job_id', 'skill_id').iterator():
+        skills[job_id].add(skill_id)
+
+    rows = queryset.order_by('pk').values_list(
+        'pk', 'category_id', 'experience_level',
+        'effective_budget_low', 'effective_budget_high', 'is_public'
+    )
+    return {
+        pk: JobFeatures(
+            pk,
+            frozenset(skills[pk]),
+            category_id,
+            experience_level,
+            None if low is None else float(low),
+            None if high is None else float(high),
+            is_public
+        )
+        for pk, category_id, experience_level, low, high, is_public in rows.iterator()
+    }
+
+
+def _budget_window(low, high):
+    if low is None and high is None:
+        return None
+    low = high if low is None else low
+    high = low if high is None else high
+    return (min(low, high), max(low, high))
+
+
+def budget_overlap(a, b):
+    """
+    Overlap of two jobs' budget windows as a fraction of their combined span
+    """
+    window_a = _budget_window(a.budget_low, a.budget_high)
+    window_b = _budget_window(b.budget_low, b.budget_high)
+    if window_a is None or window_b is None:
+        return 0.0
+    overlap = min(window_a[1], window_b[1]) - max(window_a[0], window_b[0])
+    if overlap < 0:
+        return 0.0
+    span = max(window_a[1], window_b[1]) - min(window_a[0], window_b[0])
+    return overlap / span if span else 1.0
+
+
+def similarity(a, b):
+    """
+    Score two jobs between 0 and 1; jobs sharing neither a skill nor the
+    category score 0
+    """
+    shared = len(a.skills & b.skills)
+    same_category = a.category_id is not None and a.category_id == b.category_id
+    if not shared and not same_category:
+        return 0.0
+    union = len(a.skills) + len(b.skills) - shared
+    return (
+        SKILL_WEIGHT * (shared / union if union else 0.0)
+        + CATEGORY_WEIGHT * same_category
+        + EXPERIENCE_WEIGHT * (a.experience_level == b.experience_level)
+        + BUDGET_WEIGHT * budget_overlap(a, b)
+    )
+
+
+def top_related(scores, limit=RELATED_JOBS_LIMIT):
+    """
+    Best ``limit`` (pk, score) pairs, breaking ties in favour of newer jobs
+    """
+    ranked = sorted(
+        ((pk, score) for pk, score in scores if score > 0),
+        key=lambda item: (-item[1], -item[0])
+    )
+    return ranked[:limit]
+
+
+def candidate_queryset(job):
+    """
+    Published jobs sharing one of ``job``'s rarest skills or its category.
+
+    Each match is capped at the RELATED_CANDIDATE_LIMIT newest jobs, so
+    refreshing one job costs the same however popular its skills and
+    category are; rebuild_related_jobs still scores every pair.
+    """
+    published = Job.objects.filter(status=Job.Status.PUBLISHED).exclude(pk=job.pk).order_by('-pk')
+    condition = Q()
+    if job.skills:
+        skill_ids = list(Skill.objects.filter(pk__in=job.skills).order_by(
+            'published_job_count', 'pk'
+        ).values_list('pk', flat=True)[:RELATED_CANDIDATE_SKILLS])
+        sharing = published.filter(pk__in=Job.skills.through.objects.filter(
+            skill_id__in=skill_ids
+        ).values('job_id'))
+        condition |= Q(pk__in=sharing.values('pk')[:RELATED_CANDIDATE_LIMIT])
+    if job.category_id is not None:
+        same_category = published.filter(category_id=job.category_id)
+        condition |= Q(pk__in=same_category.values('pk')[:RELATED_CANDIDATE_LIMIT])
+    if not condition:
+        return Job.objects.none()
+    return Job.objects.filter(condition)
+
+
+def _score_candidates(job):
+    candidates = load_features(candidate_queryset(job))
+    scores = {pk: similarity(job, candidate) for pk, candidate in candidates.items()}
+    return candidates, {pk: score for pk, score in scores.items() if score > 0}
+
+
+def _save_lists(lists):
+    """
+    Replace the stored related jobs of every job in ``lists`` ({pk: [(pk, score)]})
+    """
+    if not lists:
+        return
+    RelatedJob.objects.filter(job_id__in=list(lists)).delete()
+    RelatedJob.objects.bulk_create(
+        [
+            RelatedJob(job_id=job_id, related_id=related_id, score=score)
+            for job_id, entries in lists.items()
+            for related_id, score in entries
+        ],
+        batch_size=1000,
+        ignore_conflicts=True
+    )
+
+
+def recompute_related_jobs(job_ids, limit=RELATED_JOBS_LIMIT):
+    """
+    Recompute the lists of the given jobs from scratch
+    """
+    jobs = load_features(Job.objects.filter(pk__in=list(job_ids), status=Job.Status.PUBLISHED))
+    lists = {}
+    for job in jobs.values():
+        candidates, scores = _score_candidates(job)
+        lists[job.pk] = top_related(
+            ((pk, score) for pk, score in scores.items() if candidates[pk].is_public), limit
+        )
+    with transaction.atomic():
+        RelatedJob.objects.filter(job_id__in=list(job_ids)).exclude(job_id__in=list(jobs)).delete()
+        _save_lists(lists)
+
+
+@transaction.atomic
+def refresh_related_jobs(job_id, limit=RELATED_JOBS_LIMIT):
+    """
+    Update the related-jobs table after one job changed.
+
+    Recomputes the job's own list and offers the job to the lists of every
+    job it is similar to. Lists the job drops out of (or falls within) are
+    recomputed, since the job may have been hiding a better candidate.
+    """
+    listed_in = dict(RelatedJob.objects.filter(related_id=job_id).values_list('job_id', 'score'))
+    job = load_features(Job.objects.filter(pk=job_id, status=Job.Status.PUBLISHED)).get(job_id)
+    if job is None:
+        RelatedJob.objects.filter(Q(job_id=job_id) | Q(related_id=job_id)).delete()
+        recompute_related_jobs(listed_in, limit)
+        return
+
+    candidates, scores = _score_candidates(job)
+    lists = {
+        job_id: top_related(
+            ((pk, score) for pk, score in scores.items() if candidates[pk].is_public), limit
+        )
+    }
+    offered = scores if job.is_public else {}
+
+    current = defaultdict(dict)
+    sources = set(offered) | set(listed_in)
+    for source, related, score in RelatedJob.objects.filter(job_id__in=sources).values_list(
+        'job_id', 'related_id', 'score'
+    ):
+        current[source][related] = score
+
+    stale = []
+    for source in sources:
+        if source in listed_in and offered.get(source, 0.0) < listed_in[source]:
+            stale.append(source)
+            continue
+        previous = top_related(current[source].items(), limit)
+        if source in offered:
+            current[source][job_id] = offered[source]
+        ranked = top_related(current[source].items(), limit)
+        if ranked != previous:
+            lists[source] = ranked
+
+    _save_lists(lists)
+    recompute_related_jobs(stale, limit)
+
+
+def queue_related_refresh(job_ids):
+    """
+    Queue jobs for process_related_queue as part of the current transaction.
+
+    A job is queued once however often it changes before the queue is
+    drained. Queueing a job that is being processed waits for the worker
+    to finish and queues it again, so the later change is not lost.
+    """
+    now = timezone.now()
+    RelatedJobRefresh.objects.bulk_create(
+        [RelatedJobRefresh(job_id=job_id, queued_at=now) for job_id in sorted(set(job_ids))],
+        update_conflicts=True,
+        unique_fields=['job_id'],
+        update_fields=['queued_at']
+    )
+
+
+def process_related_queue(batch_size=100, limit=RELATED_JOBS_LIMIT):
+    """
+    Refresh the related jobs of every queued job, oldest first, one batch
+    per transaction; returns how many jobs were refreshed. Batches locked
+    by another worker are skipped.
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            job_ids = list(
+                RelatedJobRefresh.objects.select_for_update(skip_locked=True).order_by(
+                    'queued_at', 'job_id'
+                ).values_list('job_id', flat=True)[:batch_size]
+            )
+            if not job_ids:
+                return processed
+            for job_id in job_ids:
+                refresh_related_jobs(job_id, limit)
+            RelatedJobRefresh.objects.filter(job_id__in=job_ids).delete()
+        processed += len(job_ids)
+
+
+def get_related_jobs(job, limit=RELATED_JOBS_LIMIT):
+    """
+    Related public jobs for the detail page, best match first (one indexed lookup)
+    """
+    return Job.objects.open().filter(
+        related_to_entries__job=job,
+        is_public=True
+    ).order_by('-related_to_entries__score', '-pk')[:limit]
+
+
+def _rebuild_python(jobs, limit):
+    by_skill = defaultdict(set)
+    by_category = defaultdict(set)
+    for job in jobs.values():
+        for skill_id in job.skills:
+            by_skill[skill_id].add(job.pk)
+        if job.category_id is not None:
+            by_category[job.category_id].add(job.pk)
+
+    for job in jobs.values():
+        candidates = set(by_category.get(job.category_id, ()))
+        for skill_id in job.skills:
+            candidates |= by_skill[skill_id]
+        candidates.discard(job.pk)
+        yield job.pk, top_related(
+            ((pk, similarity(job, jobs[pk])) for pk in candidates if jobs[pk].is_public), limit
+        )
+
+
+def _rebuild_vectorized(jobs, limit, block_size):
+    features = list(jobs.values())
+    pks = np.array([job.pk for job in features])
+    count = len(features)
+
+    skill_ids = sorted({skill_id for job in features for skill_id in job.skills})
+    skill_index = {skill_id: column for column, skill_id in enumerate(skill_ids)}
+    rows = [row for row, job in enumerate(features) for _ in job.skills]
+    columns = [skill_index[skill_id] for job in features for skill_id in job.skills]
+    skills = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, columns)), shape=(count, max(len(skill_ids), 1))
+    )
+    skill_counts = np.asarray(skills.sum(axis=1)).ravel()
+
+    category_ids = sorted({job.category_id for job in features if job.category_id is not None})
+    category_index = {category_id: column for column, category_id in enumerate(category_ids)}
+    categorized = [row for row, job in enumerate(features) if job.category_id is not None]
+    categories = sparse.csr_matrix(
+        (
+            np.ones(len(categorized)),
+            (categorized, [category_index[features[row].category_id] for row in categorized])
+        ),
+        shape=(count, max(len(category_ids), 1))
+    )
+
+    levels = {level: code for code, level in enumerate(sorted({job.experience_level for job in features}))}
+    level_codes = np.array([levels[job.experience_level] for job in features])
+    windows = [_budget_window(job.budget_low, job.budget_high) for job in features]
+    budget_low = np.array([window[0] if window else np.nan for window in windows])
+    budget_high = np.array([window[1] if window else np.nan for window in windows])
+    is_public = np.array([job.is_public for job in features])
+
+    for start in range(0, count, block_size):
+        stop = min(start + block_size, count)
+        shared = (skills[start:stop] @ skills.T).tocsr()
+        same_category = (categories[start:stop] @ categories.T).tocsr()
+
+        # Candidate pairs: share a skill or the category, public, not self
+        pairs = (shared + same_category).tocoo()
+        row, column = pairs.row, pairs.col
+        source = row + start
+        keep = is_public[column] & (column != source)
+        row, column, source = row[keep], column[keep], source[keep]
+
+        shared_count = np.asarray(shared[row, column]).ravel()
+        union = skill_counts[source] + skill_counts[column] - shared_count
+        category_match = np.asarray(same_category[row, column]).ravel()
+
+        overlap = np.minimum(budget_high[source], budget_high[column]) - np.maximum(budget_low[source], budget_low[column])
+        span = np.maximum(budget_high[source], budget_high[column]) - np.minimum(budget_low[source], budget_low[column])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            jaccard = np.where(union > 0, shared_count / union, 0.0)
+            budget = np.where(span > 0, overlap / span, 1.0)
+        budget = np.where(np.isnan(overlap) | (overlap < 0), 0.0, budget)
+
+        scores = (
+            SKILL_WEIGHT * jaccard
+            + CATEGORY_WEIGHT * category_match
+            + EXPERIENCE_WEIGHT * (level_codes[source] == level_codes[column])
+            + BUDGET_WEIGHT * budget
+        )
+
+        # Best first within each source job, newest first on ties
+        order = np.lexsort((-pks[column], -scores, source))
+        source, column, scores = source[order], column[order], scores[order]
+        sources, first, sizes = np.unique(source, return_index=True, return_counts=True)
+        position = np.arange(len(source)) - np.repeat(first, sizes)
+        top = position < limit
+
+        lists = defaultdict(list)
+        for row, column, score in zip(source[top], column[top], scores[top]):
+            lists[int(pks[row])].append((int(pks[column]), float(score)))
+        for row in range(start, stop):
+            yield int(pks[row]), lists.get(int(pks[row]), [])
+
+
+@transaction.atomic
+def rebuild_related_jobs(limit=RELATED_JOBS_LIMIT, block_size=1000, vectorized=None):
+    """
+    Recompute the whole related-jobs table. Uses NumPy/SciPy sparse matrix
+    products when available; returns (jobs, rows)
+    """
+    if vectorized is None:
+        vectorized = sparse is not None
+    jobs = load_features(Job.objects.filter(status=Job.Status.PUBLISHED))
+    if vectorized and jobs:
+        lists = _rebuild_vectorized(jobs, limit, block_size)
+    else:
+        lists = _rebuild_python(jobs, limit)
+
+    RelatedJob.objects.all().delete()
+    rows = 0
+    batch = []
+    for job_id, entries in lists:
+        batch.extend(RelatedJob(job_id=job_id, related_id=pk, score=score) for pk, score in entries)
+        if len(batch) >= 1000:
+            RelatedJob.objects.bulk_create(batch)
+            rows += len(batch)
+            batch = []
+    RelatedJob.objects.bulk_create(batch)
+    rows += len(batch)
+    return len(jobs), rows
@@ -0,0 +1,198 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+# Text search configuration used for both the stored document and the queries
+SEARCH_CONFIG = 'english'
+
+
+def job_search_vector():
+    """
+    Build the weighted search document for a job: title > skills > description
+    """
+    from .models import Skill
+
+    skill_names = Skill.objects.filter(
+        jobs=OuterRef('pk')
+    ).order_by().values('jobs').annotate(
+        names=StringAgg('name', delimiter=' ')
+    ).values('names')
+
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+        SearchVector(
+            Coalesce(Subquery(skill_names), Value(''), output_field=TextField()),
+            weight='B',
+            config=SEARCH_CONFIG
+        ) +
+        SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_document(job_ids):
+    """
+    Recompute the stored search document for the given jobs in one UPDATE
+    """
+    from .models import Job
+
+    return Job.objects.filter(pk__in=job_ids).update(
+        search_document=job_search_vector()
+    )
+
+
+def search_query(q):
+    """
+    Parse user input the way web search engines do (quotes, OR, -exclusions)
+    """
+    return SearchQuery(q, search_type='websearch', config=SEARCH_CONFIG)
+
+
+def search_jobs(queryset, q, rank=True):
+    """
+    Filter a job queryset by keyword using the GIN-indexed search document.
+
+    When ``rank`` is set, the results are annotated with ``rank`` and ordered
+    by relevance, newest first among equally relevant jobs.
+    """
+    query = search_query(q)
+    queryset = queryset.filter(search_document=query)
+    if rank:
+        queryset = queryset.annotate(
+            rank=SearchRank(F('search_document'), query)
+        ).order_by('-rank', '-created_at')
+    return queryset
+
+
+# Skill matching modes
+SKILLS_MATCH_ALL = 'all'
+SKILLS_MATCH_ANY = 'any'
+
+
+def match_skills(queryset, skill_ids, mode=SKILLS_MATCH_ALL):
+    """
+    Filter a job queryset by required skills in a single pass.
+
+    The matching job ids come from one grouped query over the skills through
+    table (relational division for ``all``), so the number of joins does not
+    grow with the number of selected skills. Jobs are annotated with
+    ``skill_match_count`` so callers can rank them by how many skills match.
+    """
+    from .models import Job
+
+    skill_ids = set(skill_ids)
+    if not skill_ids:
+        return queryset
+
+    through = Job.skills.through
+    required = len(skill_ids) if mode == SKILLS_MATCH_ALL else 1
+
+    matching_jobs = through.objects.filter(
+        skill_id__in=skill_ids
+    ).order_by().values('job_id').annotate(
+        matched=Count('skill_id')
+    ).filter(matched__gte=required).values('job_id')
+
+    match_count = through.objects.filter(
+        job_id=OuterRef('pk'),
+        skill_id__in=skill_ids
+    ).order_by().values('job_id').annotate(
+        matched=Count('skill_id')
+    ).values('matched')
+
+    return queryset.filter(pk__in=matching_jobs).annotate(
+        skill_match_count=Subquery(match_count, output_field=IntegerField())
+    )
+
+
+# Budget sorts order by the effective columns so fixed-price jobs rank too
+SORT_ORDERINGS = {
+    '-budget_max': '-effective_budget_high',
+    'budget_min': 'effective_budget_low',
+}
+
+
+def budget_filter(budget_min=None, budget_max=None):
+    """
+    Match range-priced and fixed-price jobs against a budget window, as
+    index range scans on the effective budget columns
+    """
+    condition = Q()
+    if budget_min:
+        condition &= Q(effective_budget_low__gte=budget_min)
+    if budget_max:
+        condition &= Q(effective_budget_high__lte=budget_max)
+    return condition
+
+
+def job_filters(cleaned_data):
+    """
+    Return the plain column filters of a JobSearchForm, keyed by facet name.
+
+    Keeping them separate lets facet counts drop a facet's own filter.
+    """
+    filters = {}
+
+    # Category filter
+    category = cleaned_data.get('category')
+    if category:
+        filters['category'] = Q(category=category)
+
+    # Budget filter
+    budget_min = cleaned_data.get('budget_min')
+    budget_max = cleaned_data.get('budget_max')
+    if budget_min or budget_max:
+        filters['budget'] = budget_filter(budget_min, budget_max)
+
+    # Remote only filter
+    if cleaned_data.get('is_remote'):
+        filters['is_remote'] = Q(is_remote=True)
+
+    # Experience level filter
+    exp_level = cleaned_data.get('experience_level')
+    if exp_level:
+        filters['experience_level'] = Q(experience_level=exp_level)
+
+    return filters
+
+
+def filter_jobs(queryset, cleaned_data, rank=True):
+    """
+    Apply the keyword and skills parts of a JobSearchForm, which are not facets
+    """
+    # Keyword search (ranked by relevance unless another sort is chosen)
+    q = cleaned_data.get('q')
+    if q:
+        queryset = search_jobs(queryset, q, rank=rank)
+
+    # Skills filter (all or any of the selected skills)
+    skills = cleaned_data.get('skills')
+    if skills:
+        queryset = match_skills(
+            queryset,
+            [skill.pk for skill in skills],
+            mode=cleaned_data.get('skills_mode') or SKILLS_MATCH_ALL
+        )
+
+    return queryset
+
+
+def apply_job_search(queryset, cleaned_data):
+    """
+    Filter and order a job queryset from a valid JobSearchForm
+    """
+    queryset = filter_jobs(queryset, cleaned_data)
+    for condition in job_filters(cleaned_data).values():
+        queryset = queryset.filter(condition)
+
+    # Sorting
+    sort = cleaned_data.get('sort')
+    if sort:
+        return queryset.order_by(SORT_ORDERINGS.get(sort, sort))
+    if cleaned_data.get('q'):
+        # Keep the relevance ordering from the keyword search
+        return queryset.order_by('-rank', '-created_at')
+    if cleaned_data.get('skills'):
+        # Jobs matching more of the selected skills come first
+        return queryset.order_by('-skill_match_count', '-created_at')
+    return queryset.order_by('-created_at')
@@ -0,0 +1,404 @@
+"""
+Synthetic marketplace data for load testing (see the seed_marketplace
+command).
+
+Everything is drawn from one random.Random(seed), so the same seed and
+volumes produce the same users, jobs, skills and applications; timestamps
+are offsets back from the time of the run. Skill popularity, jobs per hirer
+and applications per job follow Zipf curves, so a few skills, hirers and
+jobs carry most of the rows, as in production.
+
+Rows are written in batches without going through Model.save(): users and
+jobs with bulk_create (their ids are needed), everything else with COPY.
+No post_save receiver runs, so accounts.signals'
+create_user_profile is bypassed and profiles are written in bulk instead;
+the work the jobs.signals receivers would have done is done once at the end.
+"""
+import io
+import itertools
+import random
+from bisect import bisect_right
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import User, FreelancerProfile, HirerProfile
+from .autocomplete import skill_index
+from .bulk import keep_timestamps, skill_slug
+from .cache import invalidate_search_cache
+from .models import Job, JobApplication, Category, Skill
+from .popularity import rebuild_skill_counts
+from .reference import reference_data
+from .related import rebuild_related_jobs
+from .search import update_search_document
+
+# Shared by every seeded account, hashed once
+DEFAULT_PASSWORD = 'password'
+
+SKILL_NAMES = [
+    'Python', 'JavaScript', 'Django', 'React', 'SQL', 'PostgreSQL', 'TypeScript', 'Node.js',
+    'HTML', 'CSS', 'Figma', 'Copywriting', 'SEO', 'Java', 'Go', 'Rust', 'Swift', 'Kotlin',
+    'Flutter', 'AWS', 'Docker', 'Kubernetes', 'Data Analysis', 'Machine Learning', 'Excel',
+    'Bookkeeping', 'Translation', 'Illustration', 'Video Editing', 'Technical Writing',
+    'Customer Support', 'Project Management', 'PHP', 'WordPress', 'Ruby on Rails', 'Vue.js',
+    'GraphQL', 'Redis', 'Linux', 'Terraform', 'UX Research', 'Logo Design', 'Proofreading',
+    'Social Media', 'Email Marketing', 'Tableau', 'Power BI', 'C#', 'Unity', 'Blender',
+]
+FIRST_NAMES = [
+    'Ada', 'Ben', 'Chen', 'Dara', 'Elif', 'Farah', 'Goran', 'Hana', 'Ivan', 'Jonas',
+    'Kemi', 'Luis', 'Maya', 'Nia', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sami', 'Tomas',
+]
+LAST_NAMES = [
+    'Adams', 'Baker', 'Costa', 'Dubois', 'Evans', 'Fischer', 'Garcia', 'Haddad', 'Ito', 'Jensen',
+    'Kowalski', 'Larsen', 'Moreau', 'Novak', 'Okafor', 'Patel', 'Rossi', 'Silva', 'Tanaka', 'Weber',
+]
+TITLE_ACTIONS = ['Build', 'Fix', 'Design', 'Migrate', 'Maintain', 'Audit', 'Speed up', 'Write']
+TITLE_SUBJECTS = [
+    'an online store', 'our booking app', 'a marketing site', 'the admin dashboard',
+    'a reporting pipeline', 'an API integration', 'our onboarding flow', 'a landing page',
+    'the mobile app', 'product documentation',
+]
+SENTENCES = [
+    'We are a small team looking for an experienced freelancer.',
+    'The work starts as soon as possible and can continue after the first milestone.',
+    'Please include links to similar projects you have delivered.',
+    'You will work with our product manager and one in-house developer.',
+    'Clear communication and regular updates matter more to us than speed.',
+    'The existing code base is a few years old and has some tests.',
+    'We expect a short written plan before any work begins.',
+    'Budget is flexible for the right candidate.',
+]
+COVER_LETTERS = [
+    'I have delivered several projects like this one and can start this week.',
+    'This matches my experience closely; happy to share references.',
+    'I would love to help. I can send a plan and an estimate within a day.',
+    'I have worked with similar teams before and enjoy this kind of work.',
+]
+DURATIONS = ['1 week', '2 weeks', '1 month', '3 months', '6 months']
+
+JOB_STATUSES = [
+    (Job.Status.PUBLISHED, 60), (Job.Status.DRAFT, 10), (Job.Status.CLOSED, 10),
+    (Job.Status.FILLED, 10), (Job.Status.EXPIRED, 10),
+]
+APPLICATION_STATUSES = [
+    (JobApplication.Status.PENDING, 70), (JobApplication.Status.SHORTLISTED, 10),
+    (JobApplication.Status.REJECTED, 12), (JobApplication.Status.ACCEPTED, 3),
+    (JobApplication.Status.WITHDRAWN, 5),
+]
+
+
+def seed_email(prefix, role, number):
+    """
+    Address of the ``number``th seeded user with ``role``, e.g. for logging
+    in as one from a benchmark
+    """
+    return f'{prefix}-{role.lower()}-{number}@example.com'
+
+
+def zipf_weights(count, exponent):
+    """
+    Cumulative weights of ranks 1..count under a Zipf curve, for
+    Random.choices(cum_weights=...)
+    """
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def allocate(total, cum_weights, cap):
+    """
+    Split ``total`` between len(cum_weights) buckets in proportion to their
+    weights, none getting more than ``cap``
+    """
+    weights = [b - a for a, b in zip([0] + cum_weights, cum_weights)]
+    counts = [0] * len(weights)
+    order = sorted(range(len(weights)), key=weights.__getitem__, reverse=True)
+    remaining, weight = min(total, cap * len(weights)), sum(weights)
+
+    # The heaviest buckets fill up; the rest share what is left
+    position = 0
+    while position < len(order) and remaining * weights[order[position]] >= cap * weight:
+        counts[order[position]] = cap
+        remaining -= cap
+        weight -= weights[order[position]]
+        position += 1
+    shares = [(remaining * weights[i] / weight, i) for i in order[position:]] if weight else []
+    for share, i in shares:
+        counts[i] = int(share)
+    # Rounding leftovers go to the largest fractions
+    leftover = remaining - sum(counts[i] for share, i in shares)
+    for share, i in sorted(shares, key=lambda item: item[0] - int(item[0]), reverse=True)[:leftover]:
+        counts[i] += 1
+    return counts
+
+
+def _copy_value(value):
+    """
+    A value in COPY's text format
+    """
+    if isinstance(value, str):
+        return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def write_rows(model, fields, rows, batch_size=10000):
+    """
+    Insert ``rows`` (tuples of values for ``fields``) with COPY; returns
+    the number written
+    """
+    written = 0
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return written
+        buffer = io.StringIO()
+        for row in batch:
+            buffer.write('\t'.join(map(_copy_value, row)))
+            buffer.write('\n')
+        buffer.seek(0)
+        columns = ', '.join(
+            connection.ops.quote_name(model._meta.get_field(name).column) for name in fields
+        )
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN', buffer
+            )
+        written += len(batch)
+
+
+class MarketplaceSeeder:
+    """
+    Generate and write a synthetic marketplace. ``progress`` is called with
+    (step, rows written so far) after every batch.
+    """
+    def __init__(self, hirers=500, freelancers=5000, skills=300, jobs=20000, applications=200000,
+                 seed=0, prefix='seed', skill_exponent=1.1, batch_size=10000, password=DEFAULT_PASSWORD,
+                 related=True, progress=None):
+        self.volumes = {
+            'hirers': hirers, 'freelancers': freelancers, 'skills': skills,
+            'jobs': jobs, 'applications': applications,
+        }
+        self.random = random.Random(seed)
+        self.prefix = prefix
+        self.skill_exponent = skill_exponent
+        self.batch_size = batch_size
+        self.password = password
+        self.related = related
+        self.progress = progress
+        self.now = timezone.now()
+        self.counts = {}
+
+    def report(self, step, written):
+        self.counts[step] = written
+        if self.progress:
+            self.progress(step, written)
+
+    def choose(self, weighted):
+        values, weights = zip(*weighted)
+        return self.random.choices(values, weights)[0]
+
+    def ago(self, days):
+        return self.now - timedelta(seconds=self.random.uniform(0, days * 86400))
+
+    def run(self):
+        self.categories = list(Category.objects.order_by('pk').values_list('pk', flat=True))
+        self.hirer_ids = self.create_users(User.Role.HIRER, self.volumes['hirers'])
+        self.freelancer_ids = self.create_users(User.Role.FREELANCER, self.volumes['freelancers'])
+        self.skill_ids = self.create_skills(self.volumes['skills'])
+        self.create_profiles()
+        self.job_rows = self.create_jobs(self.volumes['jobs'])
+        self.create_applications(self.volumes['applications'])
+        self.finish()
+        return self.counts
+
+    def create_users(self, role, count):
+        password = make_password(self.password)
+        ids = []
+        for start in range(0, count, self.batch_size):
+            users = []
+            for number in range(start, min(start + self.batch_size, count)):
+                users.append(User(
+                    email=seed_email(self.prefix, role, number),
+                    username=f'{self.prefix}-{role.lower()}-{number}',
+                    first_name=self.random.choice(FIRST_NAMES),
+                    last_name=self.random.choice(LAST_NAMES),
+                    role=role,
+                    password=password,
+                    date_joined=self.ago(730),
+                ))
+            with transaction.atomic():
+                ids.extend(user.pk for user in User.objects.bulk_create(users))
+            self.report(f'{role.lower()}s', len(ids))
+        return ids
+
+    def create_skills(self, count):
+        """
+        Skill ids, most popular first; skills that already exist are reused
+        """
+        names = SKILL_NAMES[:count] + [
+            f'{SKILL_NAMES[number % len(SKILL_NAMES)]} {number // len(SKILL_NAMES) + 1}'
+            for number in range(len(SKILL_NAMES), count)
+        ]
+        Skill.objects.bulk_create(
+            [Skill(name=name, slug=skill_slug(name)) for name in names],
+            batch_size=self.batch_size, ignore_conflicts=True
+        )
+        ids = dict(Skill.objects.filter(slug__in=map(skill_slug, names)).values_list('slug', 'pk'))
+        ranked = [ids[skill_slug(name)] for name in names]
+        self.skill_names = dict(zip(ranked, names))
+        self.skill_weights = zipf_weights(len(ranked), self.skill_exponent)
+        self.report('skills', len(ranked))
+        return ranked
+
+    def pick_skills(self, count):
+        picked = []
+        while len(picked) < min(count, len(self.skill_ids)):
+            skill = self.random.choices(self.skill_ids, cum_weights=self.skill_weights)[0]
+            if skill not in picked:
+                picked.append(skill)
+        return picked
+
+    def create_profiles(self):
+        sizes = [size for size, label in HirerProfile.COMPANY_SIZE_CHOICES]
+        written = write_rows(HirerProfile, ('user_id', 'company_name', 'industry', 'company_size', 'website'), (
+            (pk, f'{self.random.choice(LAST_NAMES)} {self.random.choice(["Labs", "Studio", "Group", "Ltd"])}',
+             self.random.choice(['Retail', 'Software', 'Finance', 'Media', 'Health']),
+             self.random.choice(sizes), '')
+            for pk in self.hirer_ids
+        ), self.batch_size)
+        self.report('hirer profiles', written)
+
+        availability = [status for status, label in FreelancerProfile.AVAILABILITY_CHOICES]
+        fields = ('user_id', 'skills', 'experience', 'portfolio', 'rate_expectations', 'availability_status')
+        written = write_rows(FreelancerProfile, fields, (
+            (pk, ', '.join(self.skill_names[skill] for skill in self.pick_skills(self.random.randint(1, 5))),
+             self.random.choice(SENTENCES), '', Decimal(self.random.randrange(15, 150)),
+             self.random.choice(availability))
+            for pk in self.freelancer_ids
+        ), self.batch_size)
+        self.report('freelancer profiles', written)
+
+    def build_job(self, hirer_id):
+        status = self.choose(JOB_STATUSES)
+        created_at = self.ago(365)
+        if status == Job.Status.EXPIRED:
+            deadline = created_at + timedelta(days=self.random.randint(1, 30))
+            deadline = min(deadline, self.now - timedelta(days=1))
+        elif self.random.random() < 0.5:
+            deadline = self.now + timedelta(days=self.random.randint(1, 60))
+        else:
+            deadline = None
+        if self.random.random() < 0.4:
+            fixed_budget, budget_min, budget_max = Decimal(self.random.randrange(100, 10000, 50)), None, None
+        else:
+            budget_min = Decimal(self.random.randrange(100, 5000, 50))
+            fixed_budget, budget_max = None, budget_min + Decimal(self.random.randrange(100, 5000, 50))
+        is_remote = self.random.random() < 0.8
+        job = Job(
+            title=f'{self.random.choice(TITLE_ACTIONS)} {self.random.choice(TITLE_SUBJECTS)}',
+            description='\n\n'.join(self.random.sample(SENTENCES, 3)),
+            hirer_id=hirer_id,
+            status=status,
+            category_id=self.random.choice(self.categories) if self.categories else None,
+            budget_min=budget_min,
+            budget_max=budget_max,
+            fixed_budget=fixed_budget,
+            duration=self.random.choice(DURATIONS),
+            deadline=deadline,
+            is_remote=is_remote,
+            location='' if is_remote else self.random.choice(['Berlin', 'Lagos', 'Lisbon', 'Toronto']),
+            experience_level=self.random.choice(Job.ExperienceLevel.values),
+            is_public=self.random.random() < 0.95,
+            created_at=created_at,
+        )
+        # bulk_create skips save(), which keeps these columns in sync
+        job.update_derived_fields()
+        return job
+
+    def create_jobs(self, count):
+        """
+        Write the jobs and their skills; return (id, status, created_at,
+        budget) for each job, in creation order
+        """
+        hirer_weights = zipf_weights(len(self.hirer_ids), 1)
+        rows, skills_written = [], 0
+        for start in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - start)
+            hirers = self.random.choices(self.hirer_ids, cum_weights=hirer_weights, k=size)
+            jobs = [self.build_job(hirer_id) for hirer_id in hirers]
+            job_skills = [self.pick_skills(self.random.randint(2, 6)) for job in jobs]
+            with transaction.atomic(), keep_timestamps(Job):
+                jobs = Job.objects.bulk_create(jobs)
+                skills_written += write_rows(Job.skills.through, ('job_id', 'skill_id'), (
+                    (job.pk, skill_id) for job, skill_ids in zip(jobs, job_skills) for skill_id in skill_ids
+                ), self.batch_size * 6)
+            rows.extend(
+                (job.pk, job.status, job.created_at, job.fixed_budget or job.budget_max) for job in jobs
+            )
+            self.report('jobs', len(rows))
+        self.report('job skills', skills_written)
+        return rows
+
+    def create_applications(self, count):
+        # Drafts take no applications; busier jobs are spread over the list
+        jobs = [row for row in self.job_rows if row[1] != Job.Status.DRAFT]
+        self.random.shuffle(jobs)
+        freelancers = len(self.freelancer_ids)
+        per_job = allocate(count, zipf_weights(len(jobs), 0.8), freelancers) if jobs and freelancers else []
+        statuses, status_weights = zip(*APPLICATION_STATUSES)
+        cum_statuses = list(itertools.accumulate(status_weights))
+
+        def applications():
+            for (job_id, status, created_at, budget), applicants in zip(jobs, per_job):
+                window = max((self.now - created_at).total_seconds(), 1)
+                for index in self.random.sample(range(freelancers), applicants):
+                    applied_at = created_at + timedelta(seconds=self.random.random() * window)
+                    proposed = budget if budget is not None and self.random.random() < 0.5 else None
+                    yield (
+                        job_id, self.freelancer_ids[index], self.random.choice(COVER_LETTERS), proposed,
+                        statuses[bisect_right(cum_statuses, self.random.random() * cum_statuses[-1])],
+                        applied_at, applied_at,
+                    )
+
+        fields = ('job_id', 'freelancer_id', 'cover_letter', 'proposed_budget', 'status', 'created_at', 'updated_at')
+        rows = applications()
+        written = 0
+        with keep_timestamps(JobApplication):
+            while True:
+                with transaction.atomic():
+                    batch = write_rows(JobApplication, fields, itertools.islice(rows, self.batch_size * 10),
+                                       self.batch_size * 10)
+                if not batch:
+                    break
+                written += batch
+                self.report('applications', written)
+        self.counts['applications'] = written
+
+    def finish(self):
+        """
+        What the jobs.signals receivers do per row, once for all the jobs
+        """
+        job_ids = [row[0] for row in self.job_rows]
+        for start in range(0, len(job_ids), self.batch_size):
+            with transaction.atomic():
+                update_search_document(job_ids[start:start + self.batch_size])
+            self.report('search documents', min(start + self.batch_size, len(job_ids)))
+        rebuild_skill_counts()
+        if self.related and job_ids:
+            jobs, rows = rebuild_related_jobs()
+            self.report('related jobs', rows)
+        # Planner statistics for the new row counts
+        with connection.cursor() as cursor:
+            for model in (User, Job, Job.skills.through, JobApplication):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        skill_index.invalidate()
+        reference_data.invalidate()
+        invalidate_search_cache()
@@ -1,17 +1,284 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.utils import timezone
 
-from .models import Job
+from accounts.models import User, HirerProfile
+
+from .models import Job, Category, Skill, RelatedJob
+from .search import update_search_document
+from .popularity import is_counted, adjust_skill_counts, adjust_job_counts
+from .cache import invalidate_search_cache
+from .related import queue_related_refresh
+from .autocomplete import skill_index
+from .reference import reference_data
+from .fragments import invalidate_hirer_fragments
+
+# Fields that make up the full-text search document
+SEARCH_DOCUMENT_FIELDS = {'title', 'description'}
+
+# Fields that feed the related-jobs similarity score
+RELATED_JOB_FIELDS = {
+    'status', 'category', 'category_id', 'experience_level', 'is_public',
+    'budget_min', 'budget_max', 'fixed_budget',
+}
+
+
+@receiver(post_save, sender=Job)
+def refresh_job_search_document(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the search document in sync when the title or description changes
+    """
+    if update_fields is not None and not SEARCH_DOCUMENT_FIELDS.intersection(update_fields):
+        return
+    update_search_document([instance.pk])
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def remember_removed_skill_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Remember which relations are really about to be removed (skill ids for a
+    job, job ids for a skill): pk_set is missing for clears and, for removes,
+    may name objects that were never related
+    """
+    if action not in ('pre_remove', 'pre_clear'):
+        return
+    related = instance.jobs if reverse else instance.skills
+    if action == 'pre_remove':
+        related = related.filter(pk__in=pk_set)
+    instance._removed_pks = set(related.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def refresh_search_document_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Re-index jobs whose skills were added, removed or cleared
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        update_search_document([instance.pk])
+    elif action == 'post_clear':
+        update_search_document(getattr(instance, '_removed_pks', set()))
+    elif pk_set:
+        update_search_document(pk_set)
+
+
+@receiver(post_init, sender=Skill)
+def remember_skill_name(sender, instance, **kwargs):
+    """
+    Snapshot the name so saves that do not rename a skill skip the re-index
+    """
+    instance._saved_name = instance.__dict__.get('name')
+
+
+@receiver(post_save, sender=Skill)
+def refresh_search_document_on_skill_rename(sender, instance, created, **kwargs):
+    """
+    Re-index jobs that use a skill when its name changes
+    """
+    old_name, instance._saved_name = instance._saved_name, instance.__dict__.get('name')
+    if created or (old_name is not None and old_name == instance._saved_name):
+        return
+    update_search_document(instance.jobs.values('pk'))
+
+
+def _saved_state(job):
+    """
+    Return (status, category_id) for a job, or None if either field was deferred
+    """
+    if 'status' not in job.__dict__ or 'category_id' not in job.__dict__:
+        return None
+    return (job.status, job.category_id)
+
+
+@receiver(post_init, sender=Job)
+def remember_saved_state(sender, instance, **kwargs):
+    """
+    Snapshot the fields whose changes other receivers react to; the
+    snapshot is refreshed by the last post_save receiver in this module
+    """
+    instance._saved_state = _saved_state(instance)
+
+
+@receiver(post_save, sender=Job)
+def update_skill_counts_on_job_save(sender, instance, **kwargs):
+    """
+    Move the job's skills between counters when it is published, unpublished
+    or re-categorized
+    """
+    old_state = instance._saved_state
+    new_state = _saved_state(instance)
+    if old_state is None or new_state is None:
+        return
+
+    old_status, old_category_id = old_state
+    status, category_id = new_state
+    was_counted, counted = is_counted(old_status), is_counted(status)
+    if (was_counted, old_category_id) == (counted, category_id):
+        return
+
+    skill_ids = list(instance.skills.values_list('pk', flat=True))
+    if was_counted:
+        adjust_skill_counts(skill_ids, old_category_id, -1)
+    if counted:
+        adjust_skill_counts(skill_ids, category_id, 1)
+
+
+@receiver(pre_delete, sender=Job)
+def update_skill_counts_on_job_delete(sender, instance, **kwargs):
+    """
+    Cascaded deletes of the through rows do not send m2m_changed
+    """
+    if is_counted(instance.status):
+        adjust_skill_counts(instance.skills.values_list('pk', flat=True), instance.category_id, -1)
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def update_skill_counts_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep skill popularity counters in step with added or removed job skills
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if action == 'post_add':
+        delta, changed = 1, pk_set
+    else:
+        delta, changed = -1, getattr(instance, '_removed_pks', set())
+    if not changed:
+        return
+
+    if reverse:
+        adjust_job_counts(changed, instance.pk, delta)
+    elif is_counted(instance.status):
+        adjust_skill_counts(changed, instance.category_id, delta)
+
+
+@receiver(post_save, sender=Job)
+def invalidate_search_cache_on_job_save(sender, instance, **kwargs):
+    """
+    Any save of a job that is or was published can change search results
+    """
+    old_state = instance._saved_state
+    if instance.status == Job.Status.PUBLISHED or old_state is None or old_state[0] == Job.Status.PUBLISHED:
+        invalidate_search_cache()
+
+
+@receiver(post_delete, sender=Job)
+def invalidate_search_cache_on_job_delete(sender, instance, **kwargs):
+    if instance.status == Job.Status.PUBLISHED:
+        invalidate_search_cache()
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def invalidate_search_cache_on_skills_change(sender, instance, action, reverse, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse or instance.status == Job.Status.PUBLISHED:
+        invalidate_search_cache()
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Skill)
+def invalidate_search_cache_on_reference_change(sender, created=False, **kwargs):
+    """
+    Renamed or deleted categories and skills change filters and ranking
+    """
+    if not created:
+        invalidate_search_cache()
+
+
+@receiver(post_save, sender=Job)
+def queue_related_jobs_on_job_save(sender, instance, update_fields=None, **kwargs):
+    """
+    Queue a related-jobs refresh when a job is published, unpublished or has
+    a scored field changed while published
+    """
+    if update_fields is not None and not RELATED_JOB_FIELDS.intersection(update_fields):
+        return
+    old_state = instance._saved_state
+    if instance.status == Job.Status.PUBLISHED or old_state is None or old_state[0] == Job.Status.PUBLISHED:
+        queue_related_refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def queue_related_jobs_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        if instance.status == Job.Status.PUBLISHED:
+            queue_related_refresh([instance.pk])
+        return
+    changed = pk_set if action == 'post_add' else getattr(instance, '_removed_pks', set())
+    queue_related_refresh(
+        Job.objects.filter(pk__in=changed or [], status=Job.Status.PUBLISHED).values_list('pk', flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Job)
+def remember_related_job_lists(sender, instance, **kwargs):
+    """
+    The job's rows cascade away; the lists it appeared in need a new entry
+    """
+    instance._related_sources = list(
+        RelatedJob.objects.filter(related=instance).values_list('job_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Job)
+def queue_related_jobs_on_job_delete(sender, instance, **kwargs):
+    queue_related_refresh(getattr(instance, '_related_sources', []))
+
+
+@receiver([post_save, post_delete], sender=Skill)
+def refresh_skill_index(sender, **kwargs):
+    """
+    New, renamed or deleted skills show up in this process's autocomplete
+    right away; other processes reload theirs when the reference data
+    version changes
+    """
+    skill_index.invalidate()
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Skill)
+def invalidate_reference_data(sender, **kwargs):
+    reference_data.invalidate()
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def touch_jobs_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Skills are part of the cached job fragments, which are keyed on updated_at
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    now = timezone.now()
+    if not reverse:
+        Job.objects.filter(pk=instance.pk).update(updated_at=now)
+        instance.updated_at = now
+        return
+    changed = pk_set if action == 'post_add' else getattr(instance, '_removed_pks', set())
+    if changed:
+        Job.objects.filter(pk__in=changed).update(updated_at=now)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=HirerProfile)
+def invalidate_hirer_card(sender, instance, update_fields=None, **kwargs):
+    """
+    Re-render the "About the client" card when the hirer or their profile changes
+    """
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    user_id = instance.pk if sender is User else instance.user_id
+    invalidate_hirer_fragments(user_id)
 
 
 @receiver(post_save, sender=Job)
-def check_job_expiration(sender, instance, created, **kwargs):
+def refresh_saved_state(sender, instance, **kwargs):
     """
-    Check if a job has expired and update its status if needed
+    Must stay the last Job post_save receiver in this module
     """
-    if not created and instance.status == Job.Status.PUBLISHED:
-        # Check if job has passed deadline
-        if instance.is_expired:
-            instance.status = Job.Status.EXPIRED
-            instance.save(update_fields=["status"]) 
\ No newline at end of file
+    instance._saved_state = _saved_state(instance)
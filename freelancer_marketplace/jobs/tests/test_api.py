@@ -0,0 +1,128 @@
+import json
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from jobs import api
+from jobs.models import Category, Skill, Job
+from jobs.reference import reference_data
+
+
+class JobApiTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.skills = Skill.objects.bulk_create([
+            Skill(name=f'Skill {i}', slug=f'skill-{i}') for i in range(3)
+        ])
+
+    def setUp(self):
+        reference_data.clear()
+
+    def create_jobs(self, count, **kwargs):
+        jobs = Job.objects.bulk_create([
+            Job(
+                title=f'Job {i}', hirer=self.hirer, category=self.category,
+                status=Job.Status.PUBLISHED, description='Description', excerpt='Description',
+                **kwargs
+            )
+            for i in range(count)
+        ])
+        Job.skills.through.objects.bulk_create([
+            Job.skills.through(job_id=job.pk, skill_id=skill.pk)
+            for job in jobs for skill in self.skills
+        ])
+        return jobs
+
+    def fetch(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params or {})
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, json.loads(content), len(context.captured_queries)
+
+    def test_jobs(self):
+        jobs = self.create_jobs(2)
+        self.create_jobs(1, is_public=False)
+        response, body, queries = self.fetch(reverse('api_v1:job_list'))
+        self.assertTrue(response.streaming)
+        self.assertEqual([job['id'] for job in body['data']], [job.pk for job in reversed(jobs)])
+        self.assertEqual(body['data'][0]['category'], 'testing')
+        self.assertEqual(len(body['data'][0]['skills']), 3)
+        self.assertIsNone(body['next'])
+
+    def test_sparse_fields(self):
+        self.create_jobs(1)
+        response, body, queries = self.fetch(reverse('api_v1:job_list'), {'fields': 'id,title'})
+        self.assertEqual(set(body['data'][0]), {'id', 'title'})
+        # No skills requested: the page is a single query
+        self.assertEqual(queries, 1)
+
+        response, body, queries = self.fetch(reverse('api_v1:job_list'), {'fields': 'id,salary'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', body['errors'])
+
+    def test_cursor_paging(self):
+        jobs = self.create_jobs(5)
+        url, seen = reverse('api_v1:job_list'), []
+        params = {'fields': 'id', 'limit': 2}
+        while url:
+            response, body, queries = self.fetch(url, params)
+            seen.extend(job['id'] for job in body['data'])
+            url, params = body['next'], None
+        self.assertEqual(seen, [job.pk for job in reversed(jobs)])
+
+    def test_queries_are_bounded_per_chunk(self):
+        reference_data.categories()
+        counts = []
+        with mock.patch('jobs.api.API_CHUNK_SIZE', 4):
+            for size in (2, 4):
+                self.create_jobs(size)
+                counts.append(self.fetch(reverse('api_v1:job_list'), {'limit': 4})[2])
+            self.create_jobs(4)
+            # Rows stream from one query; each further chunk adds its skills query
+            counts.append(self.fetch(reverse('api_v1:job_list'), {'limit': 8})[2])
+        self.assertEqual(counts, [2, 2, 3])
+
+    def test_filters_use_search_form(self):
+        self.create_jobs(1, is_remote=False, location='Lisbon')
+        remote = self.create_jobs(1)[0]
+        response, body, queries = self.fetch(reverse('api_v1:job_list'), {'is_remote': 'on', 'fields': 'id'})
+        self.assertEqual(body['data'], [{'id': remote.pk}])
+
+        response, body, queries = self.fetch(reverse('api_v1:job_list'), {'category': 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_cursor(self):
+        response, body, queries = self.fetch(reverse('api_v1:job_list'), {'cursor': 'nonsense'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_categories_and_skills(self):
+        reference_data.categories()
+        response, body, queries = self.fetch(reverse('api_v1:category_list'))
+        self.assertEqual(queries, 0)
+        self.assertIn('testing', [category['slug'] for category in body['data']])
+
+        response, body, queries = self.fetch(reverse('api_v1:skill_list'), {'limit': 2})
+        self.assertEqual([skill['slug'] for skill in body['data']], ['skill-0', 'skill-1'])
+        self.assertIsNotNone(body['next'])
+
+    @unittest.skipIf(api.orjson is None, 'orjson is not installed')
+    def test_json_fallback_matches_orjson(self):
+        value = {
+            'id': 1, 'budget': Decimal('10.50'), 'created_at': timezone.now(), 'skills': [],
+            'title': 'Café "menu" \\ 日本語 ✓',
+        }
+        with mock.patch.object(api, 'orjson', None):
+            fallback = api.dumps(value)
+        self.assertEqual(fallback, api.dumps(value))
@@ -0,0 +1,77 @@
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import TestCase, AsyncRequestFactory
+
+from accounts.models import User
+from jobs.async_views import AsyncJobDetailView, AsyncJobListView, AsyncCategoryDetailView
+from jobs.cache import get_search_cache
+from jobs.models import Category, Job, Skill
+from jobs.reference import reference_data
+
+
+class AsyncViewTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.freelancer = User.objects.create_user(
+            email='freelancer@example.com', username='freelancer', password='x', role=User.Role.FREELANCER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.skill = Skill.objects.create(name='Python', slug='python', published_job_count=1)
+        cls.job = Job.objects.bulk_create([
+            Job(
+                title='Job', hirer=cls.hirer, category=cls.category,
+                status=Job.Status.PUBLISHED, description='Description', excerpt='Description'
+            )
+        ])[0]
+        Job.skills.through.objects.create(job_id=cls.job.pk, skill_id=cls.skill.pk)
+
+    def setUp(self):
+        # The cache outlives the test database; pages of other runs must not leak in
+        get_search_cache().clear()
+        reference_data.clear()
+
+    async def get(self, view, user=None, etag=None, **kwargs):
+        headers = {'If-None-Match': etag} if etag else {}
+        request = AsyncRequestFactory().get('/', headers=headers)
+        request.user = user or AnonymousUser()
+        return await view.as_view()(request, **kwargs)
+
+    def test_views_are_async(self):
+        for view in (AsyncJobDetailView, AsyncJobListView, AsyncCategoryDetailView):
+            self.assertTrue(view.view_is_async, view.__name__)
+
+    async def test_detail(self):
+        response = await self.get(AsyncJobDetailView, user=self.freelancer, pk=self.job.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context_data['job'], self.job)
+        self.assertEqual(response.context_data['job'].category.slug, 'testing')
+        self.assertFalse(response.context_data['user_has_applied'])
+        self.assertIn('private', response['Cache-Control'])
+
+        response = await self.get(
+            AsyncJobDetailView, user=self.freelancer, etag=response['ETag'], pk=self.job.pk
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_detail_not_found(self):
+        with self.assertRaises(Http404):
+            await self.get(AsyncJobDetailView, pk=self.job.pk + 1)
+
+    async def test_list_pages(self):
+        response = await self.get(AsyncJobListView)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([job.pk for job in response.context_data['jobs']], [self.job.pk])
+        self.assertEqual([skill.pk for skill in response.context_data['popular_skills']], [self.skill.pk])
+        self.assertIn('facets', response.context_data)
+        self.assertEqual(
+            (await self.get(AsyncJobListView, etag=response['ETag'])).status_code, 304
+        )
+
+        response = await self.get(AsyncCategoryDetailView, slug='testing')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context_data['category'], self.category)
+        self.assertEqual([job.pk for job in response.context_data['jobs']], [self.job.pk])
@@ -0,0 +1,54 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from jobs.autocomplete import skill_index
+from jobs.forms import JobSearchForm
+from jobs.models import Skill
+
+
+class SkillAutocompleteTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Skill.objects.bulk_create([
+            Skill(name=name, slug=name.lower().replace(' ', '-'), published_job_count=count)
+            for name, count in [
+                ('Django', 5), ('Django REST Framework', 9), ('JavaScript', 7),
+                ('Java', 3), ('Amazon Web Services', 2), ('Web Design', 4),
+            ]
+        ])
+
+    def setUp(self):
+        skill_index.invalidate()
+
+    def names(self, q, limit=10):
+        return [name for pk, name in skill_index.search(q, limit)]
+
+    def test_prefix_matches_by_popularity(self):
+        self.assertEqual(self.names('dj'), ['Django REST Framework', 'Django'])
+
+    def test_word_prefix_after_name_prefix(self):
+        self.assertEqual(self.names('web'), ['Web Design', 'Amazon Web Services'])
+
+    def test_substring_matches_last(self):
+        self.assertEqual(self.names('script'), ['JavaScript'])
+        self.assertEqual(self.names('ja', limit=1), ['JavaScript'])
+
+    def test_new_skill_is_indexed(self):
+        self.assertEqual(self.names('rust'), [])
+        Skill.objects.create(name='Rust', slug='rust')
+        self.assertEqual(self.names('rust'), ['Rust'])
+
+    def test_endpoint(self):
+        response = self.client.get(reverse('jobs:skill_autocomplete'), {'q': 'django', 'limit': 1})
+        self.assertEqual(response.json(), {
+            'results': [{'id': Skill.objects.get(slug='django-rest-framework').pk, 'text': 'Django REST Framework'}]
+        })
+
+    def test_form_renders_only_selected_skills(self):
+        skill = Skill.objects.get(slug='java')
+        form = JobSearchForm({'skills': [skill.pk]})
+        self.assertTrue(form.is_valid())
+        html = str(form['skills'])
+        self.assertEqual(html.count('<option'), 1)
+        self.assertIn('Java</option>', html)
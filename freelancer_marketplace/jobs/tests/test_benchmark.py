@@ -0,0 +1,79 @@
+from django.test import TestCase, SimpleTestCase
+from django.urls import resolve
+
+from jobs.benchmark import TRAFFIC_MIX, TrafficBuilder, compare, failures, summarize
+from jobs.loadgen import LoadResult
+from jobs.models import Category
+from jobs.seed import MarketplaceSeeder
+
+
+class TrafficTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.create(name='Testing', slug='testing')
+        MarketplaceSeeder(
+            hirers=3, freelancers=5, skills=10, jobs=40, applications=60, related=False
+        ).run()
+
+    def test_requests(self):
+        requests = TrafficBuilder(users=3).build(500)
+        # Deterministic, apart from the new sessions
+        self.assertEqual(
+            [(request.path, request.label) for request in requests],
+            [(request.path, request.label) for request in TrafficBuilder(users=3).build(500)]
+        )
+        self.assertEqual(
+            {request.label for request in requests}, {url_name for role, url_name, weight in TRAFFIC_MIX}
+        )
+        for request in requests:
+            self.assertEqual(resolve(request.path.split('?')[0]).view_name, request.label)
+
+        # Every page in the mix renders; sessions are written directly, so
+        # the cookie logs the request in
+        first = {}
+        for request in requests:
+            first.setdefault(request.label, request)
+        for label, request in first.items():
+            with self.subTest(label=label):
+                headers = {'HTTP_COOKIE': request.headers['Cookie']} if request.headers else {}
+                self.assertEqual(self.client.get(request.path, **headers).status_code, 200)
+
+    def test_not_seeded(self):
+        with self.assertRaisesMessage(ValueError, 'run seed_marketplace first'):
+            TrafficBuilder(prefix='missing').build(10)
+
+
+class CompareTestCase(SimpleTestCase):
+
+    def run_result(self, latency, queries, status=200, requests=40):
+        result = LoadResult()
+        for i in range(requests):
+            timing = {'server-timing': f'db;dur=1.0;desc="{queries} queries"'}
+            result.add('jobs:job_list', '/jobs/', latency, status, timing)
+            result.add(None, '/', latency, 200)
+        result.elapsed = 2
+        for label_result in result.by_label.values():
+            label_result.elapsed = 2
+        return summarize(result)
+
+    def test_summarize(self):
+        results = self.run_result(0.05, 4)
+        self.assertEqual(results['total']['requests'], 80)
+        route = results['routes']['jobs:job_list']
+        self.assertEqual((route['requests'], route['queries'], route['p95_ms']), (40, 4, 50))
+
+    def test_compare(self):
+        baseline = self.run_result(0.05, 4)
+        self.assertEqual(compare(self.run_result(0.055, 4), baseline), [])
+        self.assertEqual(len(compare(self.run_result(0.1, 4), baseline)), 3)
+        self.assertEqual(compare(self.run_result(0.05, 6), baseline), ['jobs:job_list: queries 4.0 -> 6.0'])
+        self.assertEqual(len(compare(self.run_result(0.05, 4, status=500), baseline)), 1)
+        self.assertEqual(compare(self.run_result(0.05, 4, status=302), baseline), [])
+        # Too few requests for the percentiles to mean anything
+        self.assertEqual(compare(self.run_result(0.1, 4, requests=5), baseline), [])
+
+    def test_failures_are_never_a_baseline(self):
+        failing = self.run_result(0.05, 4, status=404)
+        self.assertEqual(failures(failing), ["jobs:job_list: statuses {404: 40}, 0 errors"])
+        self.assertEqual(compare(failing, failing), failures(failing))
@@ -0,0 +1,129 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from accounts.models import User
+from jobs.bulk import (
+    FORMAT_CSV, FORMAT_JSONL, JOB_FIELDS, ApplicationImporter, JobImporter, RecordWriter,
+    export_jobs, read_records
+)
+from jobs.models import Category, Skill, Job, JobApplication
+from jobs.reference import reference_data
+
+
+class BulkImportExportTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.skill = Skill.objects.create(name='Django', slug='django')
+        cls.freelancer = User.objects.create_user(
+            email='freelancer@example.com', username='freelancer', password='x', role=User.Role.FREELANCER
+        )
+
+    def setUp(self):
+        reference_data.clear()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def records(self, count):
+        return [
+            {
+                'title': f'Django job {i}',
+                'description': '<p>Build a <b>Django</b> app</p>',
+                'hirer': self.hirer.email,
+                'status': Job.Status.PUBLISHED,
+                'category': self.category.slug,
+                'skills': ['Django', 'Query Tuning'],
+                'budget_min': '100',
+                'budget_max': '500',
+            }
+            for i in range(count)
+        ]
+
+    def test_import_fills_derived_columns_and_counters(self):
+        records = self.records(5) + [{'title': 'Orphan', 'hirer': 'nobody@example.com'}]
+        importer = JobImporter(batch_size=2)
+        self.assertEqual(importer.run(records), 5)
+        self.assertEqual(importer.skipped, 1)
+
+        job = Job.objects.get(title='Django job 0')
+        self.assertEqual(job.excerpt, 'Build a Django app')
+        self.assertEqual(job.effective_budget_high, Decimal('500'))
+        self.assertEqual(Job.objects.filter(search_document='django').count(), 5)
+        self.assertEqual(
+            sorted(job.skills.values_list('slug', flat=True)), ['django', 'query-tuning']
+        )
+        self.skill.refresh_from_db()
+        self.assertEqual(self.skill.published_job_count, 5)
+
+    def test_round_trip(self):
+        JobImporter().run(self.records(3))
+        # Export both formats before importing either, which adds jobs
+        streams = {}
+        for fmt in (FORMAT_JSONL, FORMAT_CSV):
+            streams[fmt] = io.StringIO()
+            writer = RecordWriter(streams[fmt], fmt, JOB_FIELDS)
+            for record in export_jobs(chunk_size=2):
+                writer.write(record)
+        for fmt, stream in streams.items():
+            with self.subTest(fmt=fmt):
+                stream.seek(0)
+                records = list(read_records(stream, fmt))
+                self.assertEqual(len(records), 3)
+                self.assertEqual(records[0]['category'], self.category.slug)
+                self.assertEqual(JobImporter().run(records), 3)
+
+    def test_applications_follow_the_id_map(self):
+        # Jobs from another database: their ids here belong to other jobs
+        unrelated = Job.objects.create(title='Unrelated', description='Work', hirer=self.hirer)
+        records = [dict(record, id=unrelated.pk + i) for i, record in enumerate(self.records(2))]
+        applications = [
+            {'id': 1, 'job': record['id'], 'freelancer': self.freelancer.email, 'cover_letter': 'Hello'}
+            for record in records
+        ]
+
+        with self.assertRaises(ValueError):
+            ApplicationImporter()
+
+        id_map = {}
+        JobImporter(id_map=id_map).run(records)
+        self.assertEqual(set(id_map), {record['id'] for record in records})
+        self.assertNotIn(unrelated.pk, id_map.values())
+
+        importer = ApplicationImporter(job_id_map=id_map)
+        self.assertEqual(importer.run(applications + [dict(applications[0], job=0)]), 2)
+        self.assertEqual(importer.errors, ['record 3: unknown job: 0'])
+        self.assertEqual(
+            sorted(JobApplication.objects.values_list('job__title', flat=True)), ['Django job 0', 'Django job 1']
+        )
+
+    def test_import_command_id_map(self):
+        JobImporter().run(self.records(2))
+        for job in Job.objects.all():
+            JobApplication.objects.create(job=job, freelancer=self.freelancer, cover_letter='Hello')
+        jobs_path, applications_path, id_map_path = (
+            os.path.join(self.tmpdir, name) for name in ('jobs.jsonl', 'applications.jsonl', 'ids.json')
+        )
+        call_command('export_jobs', jobs_path, stderr=io.StringIO())
+        call_command('export_jobs', applications_path, applications=True, stderr=io.StringIO())
+
+        with self.assertRaisesMessage(CommandError, '--keep-ids or --id-map'):
+            call_command('import_jobs', applications_path, applications=True, stdout=io.StringIO())
+
+        call_command('import_jobs', jobs_path, id_map=id_map_path, no_related=True, stdout=io.StringIO())
+        call_command(
+            'import_jobs', applications_path, applications=True, id_map=id_map_path, stdout=io.StringIO()
+        )
+        with open(id_map_path) as stream:
+            new_ids = set(json.load(stream).values())
+        self.assertEqual(JobApplication.objects.filter(job_id__in=new_ids).count(), 2)
@@ -0,0 +1,20 @@
+from django.test import SimpleTestCase, override_settings
+
+from jobs.checks import check_shared_caches
+
+
+class SharedCacheCheckTestCase(SimpleTestCase):
+
+    def test_shared_cache(self):
+        self.assertEqual(check_shared_caches(None), [])
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/x'},
+            'local': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        },
+        JOB_FRAGMENT_CACHE_ALIAS='local',
+    )
+    def test_process_local_cache(self):
+        errors = check_shared_caches(None)
+        self.assertEqual([(error.id, error.obj) for error in errors], [('jobs.E001', 'JOB_FRAGMENT_CACHE_ALIAS')])
@@ -0,0 +1,91 @@
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.template.defaultfilters import date
+from django.test import TestCase, RequestFactory
+from django.utils import timezone
+
+from accounts.models import User
+from jobs.cache import bump_search_generation, get_search_cache
+from jobs.models import Category, Job
+from jobs.views import JobDetailView, JobListView, CategoryDetailView
+
+
+class ConditionalGetTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.job = Job.objects.bulk_create([
+            Job(
+                title='Job', hirer=cls.hirer, category=cls.category,
+                status=Job.Status.PUBLISHED, description='Description', excerpt='Description'
+            )
+        ])[0]
+
+    def get(self, view, user=None, etag=None, **kwargs):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        request = RequestFactory().get('/', **headers)
+        request.user = user or AnonymousUser()
+        return view.as_view()(request, **kwargs)
+
+    def test_detail_not_modified(self):
+        response = self.get(JobDetailView, pk=self.job.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('Cookie', response['Vary'])
+
+        # Validated without rendering: the job and its related jobs only
+        with self.assertNumQueries(2):
+            response = self.get(JobDetailView, etag=response['ETag'], pk=self.job.pk)
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_changes(self):
+        etag = self.get(JobDetailView, pk=self.job.pk)['ETag']
+        Job.objects.filter(pk=self.job.pk).update(updated_at=timezone.now() + timedelta(seconds=1))
+        self.assertEqual(self.get(JobDetailView, etag=etag, pk=self.job.pk).status_code, 200)
+
+    def test_detail_has_no_relative_times(self):
+        # A 304 replays the page as first rendered, so it must not say "3 minutes ago"
+        response = self.get(JobDetailView, pk=self.job.pk).render()
+        self.assertContains(response, f'Posted {date(timezone.localtime(self.job.created_at), "M d, Y")}')
+        self.assertNotContains(response, ' ago')
+
+        deadline = timezone.now() + timedelta(days=3)
+        Job.objects.filter(pk=self.job.pk).update(deadline=deadline)
+        response = self.get(JobDetailView, pk=self.job.pk).render()
+        self.assertContains(response, date(timezone.localtime(deadline), 'F d, Y, H:i T'))
+        self.assertNotContains(response, 'remaining')
+
+    def test_varies_on_user(self):
+        etag = self.get(JobDetailView, pk=self.job.pk)['ETag']
+        response = self.get(JobDetailView, user=self.hirer, etag=etag, pk=self.job.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_listings_follow_search_generation(self):
+        for view, kwargs in ((JobListView, {}), (CategoryDetailView, {'slug': 'testing'})):
+            with self.subTest(view=view.__name__):
+                etag = self.get(view, **kwargs)['ETag']
+                self.assertEqual(self.get(view, etag=etag, **kwargs).status_code, 304)
+                bump_search_generation()
+                self.assertEqual(self.get(view, etag=etag, **kwargs).status_code, 200)
+
+    def test_listings_follow_deadlines(self):
+        deadline = timezone.now() + timedelta(hours=1)
+        Job.objects.filter(pk=self.job.pk).update(deadline=deadline)
+        for view, kwargs in ((JobListView, {}), (CategoryDetailView, {'slug': 'testing'})):
+            with self.subTest(view=view.__name__):
+                get_search_cache().clear()
+                etag = self.get(view, **kwargs)['ETag']
+                self.assertEqual(self.get(view, etag=etag, **kwargs).status_code, 304)
+                # The job leaves the listing once its deadline passes, though nothing was written
+                with mock.patch('django.utils.timezone.now', return_value=deadline + timedelta(seconds=1)):
+                    response = self.get(view, etag=etag, **kwargs)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(list(response.context_data['jobs']), [])
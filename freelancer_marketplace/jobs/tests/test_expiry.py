@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from jobs.expiry import expire_batch
+from jobs.models import Category, Skill, Job, RelatedJob, open_job_filter
+from jobs.popularity import rebuild_skill_counts
+from jobs.related import process_related_queue
+
+
+class ExpiryTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.skill = Skill.objects.create(name='Django', slug='django')
+
+    def create_job(self, deadline=None):
+        job = Job.objects.create(
+            title='Job', description='Work', hirer=self.hirer, category=self.category,
+            status=Job.Status.PUBLISHED, deadline=deadline
+        )
+        job.skills.set([self.skill])
+        return job
+
+    def test_expire_batch(self):
+        now = timezone.now()
+        overdue = self.create_job(deadline=now - timedelta(days=1))
+        later = self.create_job(deadline=now + timedelta(days=1))
+        open_ended = self.create_job()
+        process_related_queue()
+        self.assertIn(overdue.pk, RelatedJob.objects.filter(job=later).values_list('related_id', flat=True))
+
+        # Past the deadline the job is no longer open, before the sweep too
+        self.assertFalse(overdue.is_open)
+        self.assertTrue(later.is_open)
+        self.assertEqual(set(Job.objects.open()), {later, open_ended})
+        self.assertEqual(set(Job.objects.filter(open_job_filter())), {later, open_ended})
+
+        self.assertEqual(expire_batch(now), 1)
+        overdue.refresh_from_db()
+        self.assertEqual(overdue.status, Job.Status.EXPIRED)
+        self.assertEqual(overdue.effective_status, Job.Status.EXPIRED)
+
+        # Counted and listed like any unpublished job
+        self.skill.refresh_from_db()
+        self.assertEqual(self.skill.published_job_count, 2)
+        self.assertEqual(self.skill.category_counts.get().job_count, 2)
+        rebuild_skill_counts()
+        self.skill.refresh_from_db()
+        self.assertEqual(self.skill.published_job_count, 2)
+        self.assertEqual(
+            sorted(RelatedJob.objects.values_list('job_id', 'related_id')),
+            sorted([(later.pk, open_ended.pk), (open_ended.pk, later.pk)])
+        )
+
+        # Nothing left to expire
+        with self.assertNumQueries(3):
+            self.assertEqual(expire_batch(now), 0)
+        self.assertEqual(Job.objects.get(pk=overdue.pk).updated_at, overdue.updated_at)
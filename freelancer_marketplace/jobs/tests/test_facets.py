@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.http import QueryDict
+from django.test import TestCase
+
+from accounts.models import User
+from jobs.facets import compute_facets
+from jobs.models import Category, Job
+from jobs.reference import reference_data
+
+
+class FacetTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.other_category = Category.objects.create(name='Testing 2', slug='testing-2')
+        for title, category, level, remote, budget in [
+            ('Python shop', cls.category, Job.ExperienceLevel.EXPERT, True, '50'),
+            ('Python API', cls.category, Job.ExperienceLevel.ENTRY, False, '300'),
+            ('Python data', cls.other_category, Job.ExperienceLevel.EXPERT, True, '300'),
+            ('Logo design', cls.category, Job.ExperienceLevel.EXPERT, True, '300'),
+        ]:
+            Job.objects.create(
+                title=title, description='Work', hirer=hirer, category=category, status=Job.Status.PUBLISHED,
+                experience_level=level, is_remote=remote, fixed_budget=Decimal(budget),
+            )
+
+    def setUp(self):
+        reference_data.clear()
+
+    def facets(self, **cleaned_data):
+        result = compute_facets(Job.objects.all(), dict(q='python', **cleaned_data), QueryDict('q=python'))
+        counts = {
+            name: {option['value']: option['count'] for option in options}
+            for name, options in result['facets'].items()
+        }
+        return result['total'], counts
+
+    def test_counts_ignore_their_own_filter(self):
+        total, counts = self.facets()
+        self.assertEqual(total, 3)
+        self.assertEqual(counts['category'][self.category.pk], 2)
+        self.assertEqual(counts['category'][self.other_category.pk], 1)
+
+        total, counts = self.facets(category=self.category, experience_level=Job.ExperienceLevel.EXPERT)
+        self.assertEqual(total, 1)
+        # Category counts keep the experience filter but not the category one
+        self.assertEqual(counts['category'][self.category.pk], 1)
+        self.assertEqual(counts['category'][self.other_category.pk], 1)
+        # Experience counts keep the category filter but not the experience one
+        self.assertEqual(counts['experience_level'][Job.ExperienceLevel.EXPERT], 1)
+        self.assertEqual(counts['experience_level'][Job.ExperienceLevel.ENTRY], 1)
+        # Other facets apply every filter
+        self.assertEqual(counts['is_remote'], {True: 1, False: 0})
+        self.assertEqual(counts['budget']['under-100'], 1)
+
+        total, counts = self.facets(is_remote=True, budget_min=Decimal('100'), budget_max=Decimal('500'))
+        self.assertEqual(total, 1)
+        self.assertEqual(counts['is_remote'], {True: 1, False: 1})
+        self.assertEqual(counts['budget']['100-500'], 1)
+        self.assertEqual(counts['budget']['under-100'], 1)
+
+    def test_option_queries(self):
+        params = QueryDict(f'q=python&category={self.category.pk}&page=2')
+        options = compute_facets(
+            Job.objects.all(), {'q': 'python', 'category': self.category}, params
+        )['facets']['category']
+        selected = next(option for option in options if option['value'] == self.category.pk)
+        other = next(option for option in options if option['value'] == self.other_category.pk)
+        self.assertTrue(selected['selected'])
+        self.assertEqual(selected['query'], 'q=python')
+        self.assertEqual(other['query'], f'q=python&category={self.other_category.pk}')
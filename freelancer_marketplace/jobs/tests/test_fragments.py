@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from freelancer_marketplace.metrics import render_metrics, reset_metrics
+from jobs.fragments import (
+    JOB_CARD, HIRER_CARD, attach_job_cards, get_fragment_cache, get_fragment_stats,
+    render_job_detail_fragments
+)
+from jobs.models import Category, Skill, Job
+
+
+class FragmentCacheTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.skill = Skill.objects.create(name='Django', slug='django')
+        cls.jobs = Job.objects.bulk_create([
+            Job(
+                title=f'Job {i}', hirer=cls.hirer, category=cls.category,
+                status=Job.Status.PUBLISHED, description='Line one\n\nLine two', excerpt='Line one'
+            )
+            for i in range(3)
+        ])
+        Job.skills.through.objects.bulk_create([
+            Job.skills.through(job_id=job.pk, skill_id=cls.skill.pk) for job in cls.jobs
+        ])
+
+    def setUp(self):
+        get_fragment_cache().clear()
+        reset_metrics()
+
+    def listing(self):
+        return list(Job.objects.for_listing().order_by('pk'))
+
+    def test_cards_are_rendered_once(self):
+        jobs = attach_job_cards(self.listing())
+        self.assertIn('Django', jobs[0].card_html)
+
+        jobs = self.listing()
+        # One get_many for the cards; skills are not prefetched for hits
+        with self.assertNumQueries(0):
+            attach_job_cards(jobs)
+        self.assertIn('Django', jobs[0].card_html)
+        self.assertEqual(get_fragment_stats()[JOB_CARD], {'hits': 3, 'misses': 3})
+        self.assertIn(
+            'django_fragment_cache_lookups_total{fragment="job_card",result="hit"} 3', render_metrics()
+        )
+
+    def test_saved_job_is_rendered_again(self):
+        attach_job_cards(self.listing())
+        # Saves refresh updated_at, which is part of the key
+        Job.objects.filter(pk=self.jobs[0].pk).update(
+            location='Lisbon', is_remote=False, updated_at=timezone.now() + timedelta(seconds=1)
+        )
+
+        jobs = attach_job_cards(self.listing())
+        self.assertIn('On-site: Lisbon', jobs[0].card_html)
+        self.assertEqual(get_fragment_stats()[JOB_CARD], {'hits': 2, 'misses': 4})
+
+    def test_hirer_card_follows_profile_version(self):
+        job = Job.objects.get(pk=self.jobs[0].pk)
+        render_job_detail_fragments(job)
+
+        job = Job.objects.get(pk=self.jobs[0].pk)
+        with self.assertNumQueries(0):
+            html = render_job_detail_fragments(job)
+        self.assertIn('<p>Line one</p>', html['job_detail_html'])
+
+        profile = self.hirer.hirer_profile
+        profile.company_name = 'Acme'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        html = render_job_detail_fragments(Job.objects.get(pk=self.jobs[0].pk))
+        self.assertIn('Acme', html['hirer_card_html'])
+        self.assertEqual(get_fragment_stats()[HIRER_CARD], {'hits': 1, 'misses': 2})
+
+    def test_skill_change_is_rendered_again(self):
+        attach_job_cards(self.listing())
+        job = Job.objects.get(pk=self.jobs[0].pk)
+        job.skills.add(Skill.objects.create(name='Query Tuning', slug='query-tuning'))
+
+        jobs = attach_job_cards(self.listing())
+        self.assertIn('Query Tuning', jobs[0].card_html)
@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.db import connection
+from django.template import engines
+from django.template.response import SimpleTemplateResponse
+from django.test import TestCase, RequestFactory
+
+from freelancer_marketplace.metrics import (
+    MetricsMiddleware, Histogram, render_metrics, reset_metrics, slowest_queries
+)
+from jobs.models import Skill
+
+
+class MetricsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Skill.objects.create(name='Django', slug='django')
+
+    def setUp(self):
+        reset_metrics()
+
+    def test_server_timing_and_histograms(self):
+        # Categories come from the reference cache, loaded on first use
+        response = self.client.get('/api/v1/categories/')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries", sql-max')
+
+        # Streamed: the page is read while the body is sent
+        response = self.client.get('/api/v1/skills/')
+        self.assertIn('desc="0 queries"', response['Server-Timing'])
+        b''.join(response.streaming_content)
+
+        output = self.client.get('/metrics').content.decode()
+        self.assertIn('django_request_queries_bucket{view="api_v1:skill_list",le="1"} 1', output)
+        self.assertIn('django_request_queries_count{view="api_v1:skill_list"} 1', output)
+        self.assertIn('django_response_size_bytes_sum{view="api_v1:skill_list"}', output)
+        self.assertIn('# slowest query api_v1:skill_list', output)
+        self.assertIn('api_v1:skill_list', slowest_queries)
+
+    def test_metrics_are_local_only(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.7').status_code, 404)
+
+    @mock.patch('freelancer_marketplace.metrics.METRICS_TOKEN', 's3cret')
+    def test_metrics_token(self):
+        # Local addresses are not enough once a token is set
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 404)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret', REMOTE_ADDR='203.0.113.7')
+        self.assertEqual(response.status_code, 200)
+
+    def test_render_time(self):
+        request = RequestFactory().get('/')
+
+        def get_response(request):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            response = SimpleTemplateResponse(engines['django'].from_string('{{ value }}'), {'value': 'x'})
+            # What the request handler does with template responses
+            response = middleware.process_template_response(request, response)
+            return response.render()
+
+        middleware = MetricsMiddleware(get_response)
+        response = middleware(request)
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+        self.assertIn('django_request_render_seconds_count{view="<unresolved>"} 1', render_metrics())
+
+    def test_histogram(self):
+        histogram = Histogram('test_seconds', 'Test', (1, 5))
+        for value in (0.5, 3, 10):
+            histogram.observe('a"b', value)
+        self.assertEqual(histogram.render()[2:], [
+            'test_seconds_bucket{view="a\\"b",le="1"} 1',
+            'test_seconds_bucket{view="a\\"b",le="5"} 2',
+            'test_seconds_bucket{view="a\\"b",le="+Inf"} 3',
+            'test_seconds_sum{view="a\\"b"} 13.5',
+            'test_seconds_count{view="a\\"b"} 3',
+        ])
@@ -0,0 +1,105 @@
+from django.test import TestCase
+
+from accounts.models import User
+from jobs.models import Category, CategorySkill, Skill, Job
+from jobs.popularity import rebuild_skill_counts
+
+
+class SkillCountTestCase(TestCase):
+    """
+    Every signal path must leave the counters as rebuild_skill_counts() would
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.other_category = Category.objects.create(name='Testing 2', slug='testing-2')
+        cls.skills = Skill.objects.bulk_create([
+            Skill(name=f'Skill {i}', slug=f'skill-{i}') for i in range(3)
+        ])
+
+    def create_job(self, status=Job.Status.PUBLISHED, skills=None):
+        job = Job.objects.create(
+            title='Job', description='Work', hirer=self.hirer, category=self.category, status=status
+        )
+        job.skills.set(self.skills[:2] if skills is None else skills)
+        return job
+
+    def counts(self):
+        skills = dict(Skill.objects.values_list('pk', 'published_job_count'))
+        # Counters that dropped to zero keep their row until the next rebuild
+        category_skills = dict(
+            ((category_id, skill_id), job_count)
+            for category_id, skill_id, job_count in CategorySkill.objects.filter(
+                job_count__gt=0
+            ).values_list('category_id', 'skill_id', 'job_count')
+        )
+        return skills, category_skills
+
+    def assertCountsMatchRebuild(self, skill_counts):
+        counts = self.counts()
+        rebuild_skill_counts()
+        self.assertEqual(counts, self.counts())
+        self.assertEqual([counts[0][skill.pk] for skill in self.skills], skill_counts)
+
+    def test_publish_and_unpublish(self):
+        job = self.create_job(status=Job.Status.DRAFT)
+        self.create_job()
+        self.assertCountsMatchRebuild([1, 1, 0])
+
+        job.status = Job.Status.PUBLISHED
+        job.save()
+        self.assertCountsMatchRebuild([2, 2, 0])
+
+        job.status = Job.Status.CLOSED
+        job.save()
+        self.assertCountsMatchRebuild([1, 1, 0])
+
+    def test_category_move(self):
+        job = self.create_job()
+        job.category = self.other_category
+        job.save()
+        self.assertCountsMatchRebuild([1, 1, 0])
+        self.assertFalse(CategorySkill.objects.filter(category=self.category, job_count__gt=0).exists())
+
+        job.category = None
+        job.save()
+        self.assertCountsMatchRebuild([1, 1, 0])
+
+    def test_skill_changes(self):
+        job = self.create_job()
+        other = self.create_job()
+        draft = self.create_job(status=Job.Status.DRAFT)
+
+        job.skills.add(self.skills[2])
+        self.assertCountsMatchRebuild([2, 2, 1])
+        # Removing a skill the job never had changes nothing
+        other.skills.remove(self.skills[0], self.skills[2])
+        self.assertCountsMatchRebuild([1, 2, 1])
+        other.skills.clear()
+        self.assertCountsMatchRebuild([1, 1, 1])
+        draft.skills.add(self.skills[2])
+        self.assertCountsMatchRebuild([1, 1, 1])
+
+    def test_reverse_skill_changes(self):
+        job = self.create_job(skills=[])
+        other = self.create_job(skills=[])
+        draft = self.create_job(status=Job.Status.DRAFT, skills=[])
+        skill = self.skills[0]
+
+        skill.jobs.add(job, other, draft)
+        self.assertCountsMatchRebuild([2, 0, 0])
+        skill.jobs.remove(other, draft)
+        self.assertCountsMatchRebuild([1, 0, 0])
+        skill.jobs.clear()
+        self.assertCountsMatchRebuild([0, 0, 0])
+
+    def test_delete(self):
+        job = self.create_job()
+        self.create_job(status=Job.Status.DRAFT).delete()
+        self.assertCountsMatchRebuild([1, 1, 0])
+        job.delete()
+        self.assertCountsMatchRebuild([0, 0, 0])
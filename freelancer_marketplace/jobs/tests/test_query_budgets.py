@@ -0,0 +1,212 @@
+"""
+Every route in jobs/urls.py and accounts/urls.py runs within its
+QUERY_BUDGETS entry, with cold caches, and repeats no statement.
+"""
+import unittest
+from collections import namedtuple
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from accounts.models import User
+from freelancer_marketplace.queries import (
+    QueryBudgetMixin, QueryInspectionError, find_query_problems, normalize_sql, repeated_statements
+)
+from jobs.models import Category, Skill, Job, JobApplication
+from jobs.reference import reference_data
+
+# ``postgres`` routes search or count with PostgreSQL-only SQL
+Route = namedtuple(
+    'Route', 'name url user method data status postgres',
+    defaults=(None, 'get', None, 200, False)
+)
+
+# Pages whose template is not in the tree yet render the base layout alone;
+# real templates, once added, are found first
+STUB_TEMPLATES = {
+    name: '{% extends "base.html" %}' for name in (
+        'jobs/job_confirm_delete.html',
+        'jobs/job_application_form.html',
+        'jobs/job_applications.html',
+        'jobs/my_applications.html',
+        'jobs/category_detail.html',
+        'accounts/password_reset_form.html',
+        'accounts/password_reset_done.html',
+        'accounts/password_reset_complete.html',
+    )
+}
+
+
+def with_stub_templates():
+    engine = dict(settings.TEMPLATES[0], APP_DIRS=False)
+    engine['OPTIONS'] = dict(engine['OPTIONS'], loaders=[
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+        ('django.template.loaders.locmem.Loader', STUB_TEMPLATES),
+    ])
+    return override_settings(TEMPLATES=[engine])
+
+
+def url_names(urlconf, namespace=None):
+    names = []
+    for pattern in get_resolver(urlconf).url_patterns:
+        if isinstance(pattern, URLPattern) and pattern.name:
+            names.append(f'{namespace}:{pattern.name}' if namespace else pattern.name)
+        elif isinstance(pattern, URLResolver):
+            names.extend(url_names(pattern.urlconf_name, pattern.namespace))
+    return names
+
+
+@with_stub_templates()
+class QueryBudgetTestCase(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.freelancer = User.objects.create_user(
+            email='freelancer@example.com', username='freelancer', password='x', role=User.Role.FREELANCER
+        )
+        # Never logs in, so its password reset token stays valid
+        cls.reset_user = User.objects.create_user(
+            email='reset@example.com', username='reset', password='x', role=User.Role.FREELANCER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.skills = Skill.objects.bulk_create([
+            Skill(name=f'Skill {i}', slug=f'skill-{i}', published_job_count=5) for i in range(3)
+        ])
+        jobs = Job.objects.bulk_create([
+            Job(
+                title=f'Job {i}', hirer=cls.hirer, category=cls.category,
+                status=Job.Status.DRAFT if i == 0 else Job.Status.PUBLISHED,
+                description='<p>Description</p>', excerpt='Description'
+            )
+            for i in range(6)
+        ])
+        Job.skills.through.objects.bulk_create([
+            Job.skills.through(job_id=job.pk, skill_id=skill.pk) for job in jobs for skill in cls.skills
+        ])
+        cls.draft, cls.job, cls.open_job = jobs[0], jobs[1], jobs[2]
+        applications = JobApplication.objects.bulk_create([
+            JobApplication(job=job, freelancer=cls.freelancer, cover_letter='Hello') for job in jobs[3:]
+        ] + [
+            JobApplication(job=cls.job, freelancer=cls.freelancer, cover_letter='Hello')
+        ])
+        cls.application = applications[-1]
+
+    def routes(self):
+        hirer, freelancer = self.hirer, self.freelancer
+        uid = urlsafe_base64_encode(force_bytes(self.reset_user.pk))
+        token = default_token_generator.make_token(self.reset_user)
+        return [
+            Route('jobs:job_list', reverse('jobs:job_list'), postgres=True),
+            Route(
+                'jobs:job_search', reverse('jobs:job_search') + f'?q=job&skills={self.skills[0].pk}',
+                postgres=True
+            ),
+            Route('jobs:job_facets', reverse('jobs:job_facets') + '?q=job', postgres=True),
+            Route('jobs:skill_autocomplete', reverse('jobs:skill_autocomplete') + '?q=sk'),
+            Route('jobs:job_detail', reverse('jobs:job_detail', args=[self.job.pk])),
+            Route('jobs:job_detail', reverse('jobs:job_detail', args=[self.open_job.pk]), freelancer),
+            Route('jobs:job_create', reverse('jobs:job_create'), hirer),
+            Route('jobs:job_update', reverse('jobs:job_update', args=[self.job.pk]), hirer),
+            Route('jobs:job_delete', reverse('jobs:job_delete', args=[self.draft.pk]), hirer),
+            Route('jobs:my_jobs', reverse('jobs:my_jobs'), hirer),
+            Route('jobs:job_applications', reverse('jobs:job_applications', args=[self.job.pk]), hirer),
+            Route('jobs:job_apply', reverse('jobs:job_apply', args=[self.open_job.pk]), freelancer),
+            Route('jobs:my_applications', reverse('jobs:my_applications'), freelancer),
+            Route(
+                'jobs:update_application_status',
+                reverse('jobs:update_application_status', args=[self.application.pk]),
+                hirer, 'post', {'status': JobApplication.Status.SHORTLISTED}, 302
+            ),
+            Route(
+                'jobs:withdraw_application', reverse('jobs:withdraw_application', args=[self.application.pk]),
+                freelancer, 'post', status=302
+            ),
+            Route('jobs:category_detail', reverse('jobs:category_detail', args=['testing'])),
+            Route('register', reverse('register')),
+            Route('profile_setup', reverse('profile_setup'), freelancer),
+            Route('login', reverse('login')),
+            Route('logout', reverse('logout'), freelancer, 'post', status=302),
+            Route('password_reset', reverse('password_reset')),
+            Route('password_reset_done', reverse('password_reset_done')),
+            Route('password_reset_confirm', reverse('password_reset_confirm', args=[uid, token]), status=302),
+            Route('password_reset_complete', reverse('password_reset_complete')),
+            Route('profile', reverse('profile'), hirer),
+            Route('edit_profile', reverse('edit_profile'), freelancer),
+        ]
+
+    def request(self, route):
+        """
+        Request ``route`` with cold caches and return the response
+        """
+        caches['default'].clear()
+        reference_data.clear()
+        return getattr(self.client, route.method)(route.url, route.data or {})
+
+    def test_every_route_has_a_budget(self):
+        names = url_names('jobs.urls', 'jobs') + url_names('accounts.urls')
+        self.assertEqual(sorted(set(names)), sorted({route.name for route in self.routes()}))
+        for name in names:
+            self.assertIn(name, settings.QUERY_BUDGETS)
+
+    def assertRoutesWithinBudget(self, routes):
+        for route in routes:
+            with self.subTest(route=route.name, user=route.user):
+                # Log in first, so the budget covers the request alone
+                if route.user is not None:
+                    self.client.force_login(route.user)
+                else:
+                    self.client.logout()
+                with self.assertQueryBudget(route.name):
+                    response = self.request(route)
+                self.assertEqual(response.status_code, route.status)
+
+    def test_routes_within_budget(self):
+        self.assertRoutesWithinBudget([route for route in self.routes() if not route.postgres])
+
+    def test_listings_within_budget(self):
+        self.assertRoutesWithinBudget([route for route in self.routes() if route.postgres])
+
+
+class QueryInspectionTestCase(QueryBudgetMixin, TestCase):
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql("SELECT *  FROM t WHERE id = 12 AND name = 'it''s'\n AND x IN (1, 2, 3)"),
+            normalize_sql('SELECT * FROM t WHERE id = %s AND name = %s AND x IN (%s)'),
+        )
+
+    def test_repeated_statements(self):
+        Skill.objects.bulk_create([Skill(name=f'Skill {i}', slug=f'skill-{i}') for i in range(3)])
+        with self.assertRaises(AssertionError):
+            with self.assertNoRepeatedQueries():
+                for skill in Skill.objects.all():
+                    Skill.objects.get(pk=skill.pk)
+
+        statements = ['SELECT 1 FROM t WHERE id = 1', 'SELECT 1 FROM t WHERE id = 2', 'SELECT 2']
+        self.assertEqual(repeated_statements(statements, threshold=2), [('SELECT ? FROM t WHERE id = ?', 2)])
+        self.assertEqual(len(find_query_problems('jobs:job_list', statements, budget=2, threshold=3)), 1)
+
+    def test_budget(self):
+        with self.assertRaises(AssertionError):
+            with self.assertQueryBudget('jobs:job_list', budget=1):
+                list(Skill.objects.all())
+                list(Category.objects.all())
+
+    @override_settings(QUERY_BUDGETS={'profile': 0})
+    def test_middleware(self):
+        user = User.objects.create_user(email='user@example.com', username='user', password='x')
+        self.client.force_login(user)
+        with mock.patch('freelancer_marketplace.metrics.QUERY_INSPECTION', 'raise'), \
+                mock.patch('freelancer_marketplace.queries.QUERY_INSPECTION', 'raise'):
+            with self.assertRaisesMessage(QueryInspectionError, 'over its budget of 0'):
+                self.client.get(reverse('profile'))
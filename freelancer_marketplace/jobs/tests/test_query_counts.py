@@ -0,0 +1,166 @@
+"""
+Query-count regression tests: dashboards must not issue queries per row.
+"""
+
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from jobs.cache import get_search_cache
+from jobs.models import Category, Skill, Job, JobApplication
+from jobs.reference import reference_data
+from jobs.views import JobApplicationsView, MyApplicationsView, MyJobsView
+
+
+class QueryCountTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.freelancers = [
+            User.objects.create_user(
+                email=f'freelancer{i}@example.com', username=f'freelancer{i}', password='x',
+                role=User.Role.FREELANCER
+            )
+            for i in range(3)
+        ]
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.skills = Skill.objects.bulk_create([
+            Skill(name=f'Skill {i}', slug=f'skill-{i}') for i in range(3)
+        ])
+
+    def create_jobs(self, count):
+        statuses = [choice for choice, _ in Job.Status.choices]
+        jobs = Job.objects.bulk_create([
+            Job(
+                title=f'Job {i}',
+                hirer=self.hirer,
+                category=self.category,
+                status=statuses[i % len(statuses)],
+                description='<p>Description</p>',
+                excerpt='Description',
+            )
+            for i in range(count)
+        ])
+        Job.skills.through.objects.bulk_create([
+            Job.skills.through(job_id=job.pk, skill_id=skill.pk)
+            for job in jobs for skill in self.skills
+        ])
+        JobApplication.objects.bulk_create([
+            JobApplication(job=job, freelancer=freelancer, cover_letter='Hello')
+            for job in jobs for freelancer in self.freelancers
+        ])
+
+    def count_queries(self, url):
+        # Bulk inserts bypass cache invalidation; always measure a cache miss
+        get_search_cache().clear()
+        reference_data.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def assertConstantQueries(self, url, create, sizes=(2, 12)):
+        """
+        Render ``url`` after each call to ``create`` and compare query counts
+        """
+        counts = []
+        for size in sizes:
+            create(size)
+            count, response = self.count_queries(url)
+            counts.append(count)
+        self.assertEqual(counts[0], counts[-1], msg=f'Query count grew with the data: {counts}')
+        return response
+
+    def test_my_jobs(self):
+        self.client.force_login(self.hirer)
+        response = self.assertConstantQueries(reverse('jobs:my_jobs'), self.create_jobs)
+
+        published = response.context['jobs']
+        self.assertTrue(published)
+        self.assertTrue(all(job.status == Job.Status.PUBLISHED for job in published))
+        self.assertTrue(all(job.application_count == 3 for job in published))
+        self.assertTrue(all(job.pending_application_count == 3 for job in published))
+        self.assertEqual(
+            sum(response.context['status_counts'].values()),
+            Job.objects.filter(hirer=self.hirer).count()
+        )
+
+        # The closed tab groups every finished status, one page at a time
+        self.create_jobs(20)
+        count, response = self.count_queries(reverse('jobs:my_jobs') + '?status=closed')
+        closed = response.context['jobs']
+        self.assertEqual(len(closed), MyJobsView.paginate_by)
+        self.assertTrue(response.context['next_page_url'])
+        self.assertFalse(any(job.status in (Job.Status.PUBLISHED, Job.Status.DRAFT) for job in closed))
+
+    def test_job_list(self):
+        response = self.assertConstantQueries(reverse('jobs:job_list'), self.create_jobs)
+
+        jobs = list(response.context['jobs'])
+        self.assertTrue(jobs)
+        with self.assertNumQueries(0):
+            for job in jobs:
+                job.category.name
+                [skill.name for skill in job.skills.all()]
+        self.assertEqual(jobs[0].excerpt, 'Description')
+
+    def count_view_queries(self, view_class, user, params=None, **kwargs):
+        """
+        Run a view without rendering its template
+        """
+        request = RequestFactory().get('/', params or {})
+        request.user = user
+        with CaptureQueriesContext(connection) as context:
+            response = view_class.as_view()(request, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.context_data
+
+    def create_applications(self, job, count):
+        start = User.objects.count()
+        freelancers = User.objects.bulk_create([
+            User(email=f'applicant{i}@example.com', username=f'applicant{i}', role=User.Role.FREELANCER)
+            for i in range(start, start + count)
+        ])
+        statuses = [choice for choice, _ in JobApplication.Status.choices]
+        JobApplication.objects.bulk_create([
+            JobApplication(job=job, freelancer=freelancer, cover_letter='Hello', status=statuses[i % len(statuses)])
+            for i, freelancer in enumerate(freelancers)
+        ])
+
+    def test_job_applications(self):
+        job = Job.objects.bulk_create([Job(title='Job', description='Description', hirer=self.hirer)])[0]
+        counts = []
+        for size in (5, 100):
+            self.create_applications(job, size)
+            count, context = self.count_view_queries(
+                JobApplicationsView, self.hirer, {'status': 'rejected'}, job_id=job.pk
+            )
+            counts.append(count)
+        self.assertEqual(counts[0], counts[-1], msg=f'Query count grew with the data: {counts}')
+
+        applications = context['applications']
+        self.assertEqual(len(applications), JobApplicationsView.paginate_by)
+        self.assertTrue(all(
+            application.status in (JobApplication.Status.REJECTED, JobApplication.Status.WITHDRAWN)
+            for application in applications
+        ))
+        self.assertIn('cover_letter', applications[0].get_deferred_fields())
+        tabs = {tab['key']: tab['count'] for tab in context['status_tabs']}
+        self.assertEqual(tabs, {'pending': 21, 'shortlisted': 21, 'accepted': 21, 'rejected': 42})
+
+    def test_my_applications(self):
+        freelancer = self.freelancers[0]
+        counts = []
+        for size in (2, 12):
+            self.create_jobs(size)
+            count, context = self.count_view_queries(MyApplicationsView, freelancer)
+            counts.append(count)
+        self.assertEqual(counts[0], counts[-1], msg=f'Query count grew with the data: {counts}')
+        self.assertEqual(context['status_tab'], 'pending')
+        self.assertEqual(context['status_counts']['pending'], 14)
+        self.assertEqual(len(context['applications']), MyApplicationsView.paginate_by)
@@ -0,0 +1,161 @@
+"""
+Query-plan regression tests for the job and application hot paths.
+
+Each test EXPLAINs the exact query a view pages through, with sequential
+scans disabled for the planner. On a small seeded database the planner
+would happily scan tiny tables, so instead we make scans prohibitively
+expensive: if one still shows up, no index can serve that query.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.utils import timezone
+
+from accounts.models import User
+from jobs.models import Category, Skill, Job, JobApplication, effective_budget_expressions
+from jobs.expiry import overdue_jobs
+from jobs.pagination import CursorPaginator
+from jobs.related import rebuild_related_jobs, get_related_jobs
+from jobs.search import update_search_document
+from jobs.views import (
+    JobListView, CategoryDetailView, MyJobsView, MyApplicationsView, JobApplicationsView
+)
+
+# Tables on the hot paths; small lookup tables are allowed to be scanned
+HOT_TABLES = ('jobs_job', 'jobs_jobapplication', 'jobs_relatedjob')
+
+
+class QueryPlanTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.freelancer = User.objects.create_user(
+            email='freelancer@example.com', username='freelancer', password='x', role=User.Role.FREELANCER
+        )
+        cls.category = Category.objects.get(slug='web-development')
+        cls.skills = Skill.objects.bulk_create([
+            Skill(name=f'Skill {i}', slug=f'skill-{i}') for i in range(20)
+        ])
+
+        categories = list(Category.objects.all())
+        statuses = [choice for choice, _ in Job.Status.choices]
+        now = timezone.now()
+        jobs = Job.objects.bulk_create([
+            Job(
+                title=f'Django developer {i}',
+                description='Build and maintain a Django web application',
+                hirer=cls.hirer,
+                category=categories[i % len(categories)],
+                status=statuses[i % len(statuses)],
+                budget_min=Decimal(100 + i) if i % 3 else None,
+                budget_max=Decimal(500 + i) if i % 3 else None,
+                fixed_budget=Decimal(300 + i) if not i % 3 else None,
+                deadline=now + timedelta(days=i % 30),
+                is_public=bool(i % 4),
+            )
+            for i in range(500)
+        ])
+        Job.skills.through.objects.bulk_create([
+            Job.skills.through(job_id=job.pk, skill_id=cls.skills[(job.pk + n) % 20].pk)
+            for job in jobs for n in range(3)
+        ])
+        JobApplication.objects.bulk_create([
+            JobApplication(job=job, freelancer=cls.freelancer, cover_letter='Hello')
+            for job in jobs[:200]
+        ])
+        cls.job = jobs[0]
+        update_search_document([job.pk for job in jobs])
+        Job.objects.update(**effective_budget_expressions())
+        rebuild_related_jobs()
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE jobs_job, jobs_job_skills, jobs_jobapplication, jobs_relatedjob')
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        with connection.cursor() as cursor:
+            # Scoped to the test's transaction
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertNoSeqScan(self, queryset):
+        plan = queryset.explain()
+        for table in HOT_TABLES:
+            self.assertNotIn(f'Seq Scan on {table} ', plan + ' ', msg=f'\n{queryset.query}\n\n{plan}')
+
+    def get_view(self, view_class, path='/', user=None, params=None, **kwargs):
+        request = self.factory.get(path, params or {})
+        if user is not None:
+            request.user = user
+        view = view_class()
+        view.setup(request, **kwargs)
+        return view
+
+    def page_queryset(self, view):
+        return CursorPaginator(view.get_queryset(), view.paginate_by).page_queryset()
+
+    def test_job_list_default_order(self):
+        self.assertNoSeqScan(self.page_queryset(self.get_view(JobListView)))
+
+    def test_job_list_each_sort_option(self):
+        for sort in ['-created_at', 'created_at', '-budget_max', 'budget_min', 'deadline']:
+            with self.subTest(sort=sort):
+                view = self.get_view(JobListView, params={'sort': sort})
+                self.assertNoSeqScan(self.page_queryset(view))
+
+    def test_job_list_budget_filter(self):
+        for params in [{'budget_min': 200}, {'budget_max': 400}, {'budget_min': 200, 'budget_max': 400}]:
+            with self.subTest(**params):
+                view = self.get_view(JobListView, params=params)
+                self.assertNoSeqScan(self.page_queryset(view))
+
+    def test_job_list_category_filter(self):
+        view = self.get_view(JobListView, params={'category': self.category.pk})
+        self.assertNoSeqScan(self.page_queryset(view))
+
+    def test_job_list_keyword_search(self):
+        view = self.get_view(JobListView, params={'q': 'django'})
+        self.assertNoSeqScan(self.page_queryset(view))
+
+    def test_job_list_skills_filter(self):
+        skill_ids = [skill.pk for skill in self.skills[:2]]
+        for mode in ['all', 'any']:
+            with self.subTest(mode=mode):
+                view = self.get_view(JobListView, params={'skills': skill_ids, 'skills_mode': mode})
+                self.assertNoSeqScan(self.page_queryset(view))
+
+    def test_category_detail_default_order(self):
+        view = self.get_view(CategoryDetailView, slug=self.category.slug)
+        self.assertNoSeqScan(self.page_queryset(view))
+
+    def test_job_detail_related_jobs(self):
+        self.assertNoSeqScan(get_related_jobs(self.job))
+
+    def test_expiry_sweep(self):
+        self.assertNoSeqScan(overdue_jobs(timezone.now() + timedelta(days=10))[:100])
+
+    def test_my_jobs_default_order(self):
+        view = self.get_view(MyJobsView, user=self.hirer)
+        self.assertNoSeqScan(self.page_queryset(view))
+
+    def test_my_applications_default_order(self):
+        view = self.get_view(MyApplicationsView, user=self.freelancer)
+        self.assertNoSeqScan(self.page_queryset(view))
+
+    def test_my_applications_status_filter(self):
+        view = self.get_view(MyApplicationsView, user=self.freelancer)
+        queryset = view.get_queryset().filter(status=JobApplication.Status.PENDING)
+        self.assertNoSeqScan(queryset[:view.paginate_by])
+
+    def test_job_applications_default_order(self):
+        view = self.get_view(JobApplicationsView, user=self.hirer, job_id=self.job.pk)
+        self.assertNoSeqScan(view.get_queryset()[:view.paginate_by])
+
+    def test_job_applications_status_filter(self):
+        view = self.get_view(JobApplicationsView, user=self.hirer, job_id=self.job.pk)
+        queryset = view.get_queryset().filter(status=JobApplication.Status.PENDING)
+        self.assertNoSeqScan(queryset[:view.paginate_by])
@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from jobs.forms import JobSearchForm
+from jobs.models import Category, Skill
+from jobs.reference import ReferenceData, reference_data
+
+
+class ReferenceDataTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.skill = Skill.objects.create(name='Django', slug='django', published_job_count=3)
+
+    def setUp(self):
+        reference_data.clear()
+
+    def test_lookups_are_served_from_memory(self):
+        reference_data.categories()
+        with self.assertNumQueries(0):
+            self.assertEqual(reference_data.category(self.category.pk).slug, 'testing')
+            self.assertEqual(reference_data.category_by_slug('testing').pk, self.category.pk)
+            self.assertEqual(reference_data.skill_by_slug('django').pk, self.skill.pk)
+            self.assertEqual(reference_data.get_skills([self.skill.pk]), {self.skill.pk: self.skill})
+            self.assertIsNone(reference_data.category_by_slug('missing'))
+
+    def test_cold_skills_are_queried(self):
+        cold = Skill.objects.create(name='Rust', slug='rust')
+        with mock.patch('jobs.reference.HOT_SKILL_COUNT', 1):
+            reference_data.categories()
+        with self.assertNumQueries(1):
+            skills = reference_data.get_skills([self.skill.pk, cold.pk])
+        self.assertEqual(set(skills), {self.skill.pk, cold.pk})
+
+    def test_save_invalidates_this_process(self):
+        self.assertIsNone(reference_data.category_by_slug('testing-2'))
+        Category.objects.create(name='Testing 2', slug='testing-2')
+        self.assertIsNotNone(reference_data.category_by_slug('testing-2'))
+
+    @mock.patch('jobs.reference.REFERENCE_CHECK_INTERVAL', 0)
+    def test_commit_bumps_other_processes(self):
+        other = ReferenceData()
+        self.assertIsNone(other.category_by_slug('testing-2'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Testing 2', slug='testing-2')
+        self.assertIsNotNone(other.category_by_slug('testing-2'))
+
+    def test_form_fields_resolve_through_cache(self):
+        reference_data.categories()
+        form = JobSearchForm({'category': self.category.pk, 'skills': [self.skill.pk]})
+        with self.assertNumQueries(0):
+            self.assertTrue(form.is_valid())
+            str(form['category'])
+        self.assertEqual(form.cleaned_data['category'], self.category)
+        self.assertEqual(form.cleaned_data['skills'], [self.skill])
+
+        form = JobSearchForm({'category': 0, 'skills': [self.skill.pk, 0]})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(set(form.errors), {'category', 'skills'})
+
+    def test_unknown_category_page(self):
+        response = self.client.get(reverse('jobs:category_detail', args=['missing']))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,214 @@
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from accounts.models import User
+from jobs.models import Category, Skill, Job, RelatedJob, RelatedJobRefresh
+from jobs.related import (
+    JobFeatures, _rebuild_python, _rebuild_vectorized, candidate_queryset, load_features,
+    process_related_queue, rebuild_related_jobs, recompute_related_jobs, refresh_related_jobs,
+    similarity, sparse, top_related
+)
+
+
+def features(pk, skills=(), category_id=1, experience_level='ENTRY', budget=(None, None), is_public=True):
+    return JobFeatures(pk, frozenset(skills), category_id, experience_level, budget[0], budget[1], is_public)
+
+
+class SimilarityTestCase(SimpleTestCase):
+
+    def test_similarity(self):
+        job = features(1, skills=[1, 2], budget=(100, 300))
+        self.assertEqual(similarity(job, features(2, skills=[3], category_id=2)), 0)
+        # Category and experience level only
+        self.assertAlmostEqual(similarity(job, features(2, skills=[3])), 0.3)
+        # Same skills, category, level and budget
+        self.assertAlmostEqual(similarity(job, features(2, skills=[1, 2], budget=(100, 300))), 1)
+        # One of three skills (Jaccard 1/3) and half the budget span
+        other = features(2, skills=[2, 3], category_id=None, experience_level='EXPERT', budget=(200, 300))
+        self.assertAlmostEqual(similarity(job, other), 0.6 / 3 + 0.1 * 0.5)
+        # A fixed budget is a window of one value
+        self.assertAlmostEqual(similarity(job, features(2, skills=[3], budget=(400, None))), 0.3)
+        self.assertAlmostEqual(similarity(job, features(2, skills=[3], budget=(200, None))), 0.3)
+        self.assertAlmostEqual(
+            similarity(features(1, budget=(200, 200)), features(2, budget=(None, 200))), 0.4
+        )
+
+    def test_top_related(self):
+        scores = [(1, 0.5), (2, 0.9), (3, 0.5), (4, 0), (5, 0.7)]
+        self.assertEqual(top_related(scores, 3), [(2, 0.9), (5, 0.7), (3, 0.5)])
+        self.assertEqual(top_related(scores), [(2, 0.9), (5, 0.7), (3, 0.5), (1, 0.5)])
+
+
+class RelatedJobsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.other_category = Category.objects.create(name='Testing 2', slug='testing-2')
+        cls.skills = Skill.objects.bulk_create([
+            Skill(name=f'Skill {i}', slug=f'skill-{i}') for i in range(4)
+        ])
+
+    def create_job(self, skills, category=None, status=Job.Status.PUBLISHED, **kwargs):
+        job = Job.objects.create(
+            title='Job', description='Work', hirer=self.hirer, category=category or self.category,
+            status=status, **kwargs
+        )
+        job.skills.set([self.skills[i] for i in skills])
+        return job
+
+    def related(self, job):
+        return list(RelatedJob.objects.filter(job=job).order_by('-score', '-related_id').values_list(
+            'related_id', flat=True
+        ))
+
+    def queued(self):
+        return set(RelatedJobRefresh.objects.values_list('job_id', flat=True))
+
+    def table(self):
+        return sorted(
+            (job_id, related_id, round(score, 6))
+            for job_id, related_id, score in RelatedJob.objects.values_list('job_id', 'related_id', 'score')
+        )
+
+    def assertMatchesRebuild(self, limit=5):
+        """
+        Drain the queue and check the incremental table against a full rebuild
+        """
+        process_related_queue(limit=limit)
+        table = self.table()
+        rebuild_related_jobs(limit, vectorized=False)
+        self.assertEqual(table, self.table())
+
+    def test_changes_are_queued_once(self):
+        with mock.patch('jobs.related.refresh_related_jobs') as refresh:
+            job = self.create_job([0, 1])
+            other = self.create_job([1])
+            job.title = 'Renamed'
+            job.save(update_fields=['title'])
+            self.create_job([0], status=Job.Status.DRAFT)
+            refresh.assert_not_called()
+        # Saved, then skills removed and added: still one entry each
+        self.assertEqual(self.queued(), {job.pk, other.pk})
+        self.assertFalse(RelatedJob.objects.exists())
+
+        self.assertEqual(process_related_queue(batch_size=1), 2)
+        self.assertEqual(self.queued(), set())
+        self.assertEqual(self.related(job), [other.pk])
+        self.assertEqual(self.related(other), [job.pk])
+        self.assertEqual(process_related_queue(), 0)
+
+    def test_candidates_are_capped(self):
+        job = self.create_job([0, 2])
+        common = [self.create_job([0], category=self.other_category) for i in range(3)]
+        rare = self.create_job([2], category=self.other_category)
+        same_category = [self.create_job([3]) for i in range(3)]
+        features = load_features(Job.objects.filter(pk=job.pk))[job.pk]
+
+        self.assertEqual(
+            set(candidate_queryset(features).values_list('pk', flat=True)),
+            {rare.pk} | {other.pk for other in common + same_category}
+        )
+        with mock.patch('jobs.related.RELATED_CANDIDATE_SKILLS', 1), \
+                mock.patch('jobs.related.RELATED_CANDIDATE_LIMIT', 2):
+            # Only the rarest skill is matched, and the newest jobs per match
+            self.assertEqual(
+                set(candidate_queryset(features).values_list('pk', flat=True)),
+                {rare.pk, same_category[2].pk, same_category[1].pk}
+            )
+
+    def test_publish_and_unpublish(self):
+        job = self.create_job([0, 1])
+        other = self.create_job([1], category=self.other_category)
+        draft = self.create_job([0, 1], status=Job.Status.DRAFT)
+        self.assertMatchesRebuild()
+        self.assertEqual(self.related(job), [other.pk])
+
+        draft.status = Job.Status.PUBLISHED
+        draft.save()
+        self.assertMatchesRebuild()
+        self.assertEqual(self.related(job), [draft.pk, other.pk])
+        self.assertEqual(self.related(other), [draft.pk, job.pk])
+
+        draft.status = Job.Status.CLOSED
+        draft.save()
+        self.assertMatchesRebuild()
+        self.assertEqual(self.related(job), [other.pk])
+        self.assertEqual(self.related(draft), [])
+
+    def test_private_jobs_are_not_listed(self):
+        job = self.create_job([0])
+        private = self.create_job([0], is_public=False)
+        self.assertMatchesRebuild()
+        self.assertEqual(self.related(job), [])
+        self.assertEqual(self.related(private), [job.pk])
+
+    def test_skill_change_drops_job(self):
+        job = self.create_job([0, 1], category=self.other_category)
+        other = self.create_job([0])
+        third = self.create_job([1])
+        self.assertMatchesRebuild()
+        self.assertEqual(self.related(job), [third.pk, other.pk])
+
+        other.skills.set([self.skills[3]])
+        self.assertMatchesRebuild()
+        self.assertEqual(self.related(job), [third.pk])
+
+        # From the skill's side
+        self.skills[1].jobs.remove(third)
+        self.assertMatchesRebuild()
+        self.assertEqual(self.related(job), [])
+
+    def test_delete(self):
+        job = self.create_job([0, 1])
+        best = self.create_job([0, 1])
+        runner_up = self.create_job([0])
+        self.assertMatchesRebuild(limit=1)
+        self.assertEqual(self.related(job), [best.pk])
+
+        # The list the job was in gets the next best candidate
+        best.delete()
+        self.assertMatchesRebuild(limit=1)
+        self.assertEqual(self.related(job), [runner_up.pk])
+
+    def test_refresh_and_recompute(self):
+        job = self.create_job([0, 1])
+        other = self.create_job([0])
+        RelatedJobRefresh.objects.all().delete()
+
+        recompute_related_jobs([job.pk])
+        self.assertEqual(self.related(job), [other.pk])
+        self.assertEqual(self.related(other), [])
+
+        refresh_related_jobs(other.pk)
+        self.assertEqual(self.related(other), [job.pk])
+
+        # Unpublished jobs are taken out of every list
+        Job.objects.filter(pk=other.pk).update(status=Job.Status.CLOSED)
+        refresh_related_jobs(other.pk)
+        self.assertEqual(self.table(), [])
+
+    @unittest.skipIf(sparse is None, 'needs NumPy and SciPy')
+    def test_vectorized_rebuild_matches_python(self):
+        for i in range(30):
+            self.create_job(
+                [i % 4, (i * 3) % 4],
+                category=self.category if i % 3 else self.other_category,
+                experience_level=Job.ExperienceLevel.EXPERT if i % 2 else Job.ExperienceLevel.ENTRY,
+                is_public=bool(i % 5),
+                budget_min=10 * i if i % 4 else None,
+                budget_max=10 * i + 100 if i % 7 else None,
+            )
+        jobs = load_features(Job.objects.filter(status=Job.Status.PUBLISHED))
+
+        def rounded(lists):
+            return {pk: [(related, round(score, 9)) for related, score in entries] for pk, entries in lists}
+
+        expected = rounded(_rebuild_python(jobs, 5))
+        self.assertEqual(rounded(_rebuild_vectorized(jobs, 5, block_size=7)), expected)
+        self.assertEqual(rebuild_related_jobs(5, block_size=7), (30, sum(map(len, expected.values()))))
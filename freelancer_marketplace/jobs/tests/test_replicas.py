@@ -0,0 +1,207 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils.connection import ConnectionDoesNotExist
+
+from accounts.models import User
+from freelancer_marketplace import replicas
+from freelancer_marketplace.replicas import REPLICA_PIN_COOKIE, ReplicaMiddleware, ReplicaRouter, RoutingState
+from jobs.cache import get_search_cache
+from jobs.fragments import attach_job_cards, get_fragment_cache
+from jobs.models import Category, Skill, Job
+from jobs.reference import ReferenceData
+from jobs.views import JobCreateView, JobListView
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+@mock.patch('freelancer_marketplace.replicas.measure_lag', lambda alias: 0)
+class ReplicaRoutingTestCase(SimpleTestCase):
+
+    def setUp(self):
+        replicas._lag_checks.clear()
+
+    def route(self, request, view, write=False):
+        """
+        Run ``view`` through the middleware; return the database its reads
+        were sent to and the response
+        """
+        router = ReplicaRouter()
+        routed = []
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            if write:
+                router.db_for_write(Job)
+            routed.append(router.db_for_read(Job))
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(get_response)
+        response = middleware(request)
+        return routed[0], response
+
+    def test_browse_views_read_from_replica(self):
+        alias, response = self.route(RequestFactory().get('/jobs/'), JobListView.as_view())
+        self.assertIn(alias, ['replica1', 'replica2'])
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_other_views_read_from_primary(self):
+        alias, response = self.route(RequestFactory().get('/jobs/create/'), JobCreateView.as_view())
+        self.assertIsNone(alias)
+
+    def test_writes_pin_to_primary(self):
+        alias, response = self.route(RequestFactory().get('/jobs/'), JobListView.as_view(), write=True)
+        # Reads after the write in the same request use the primary
+        self.assertIsNone(alias)
+        self.assertEqual(response.cookies[REPLICA_PIN_COOKIE].value, '1')
+
+        alias, response = self.route(RequestFactory().post('/jobs/'), JobListView.as_view())
+        self.assertIsNone(alias)
+        self.assertIn(REPLICA_PIN_COOKIE, response.cookies)
+
+        request = RequestFactory().get('/jobs/')
+        request.COOKIES[REPLICA_PIN_COOKIE] = '1'
+        alias, response = self.route(request, JobListView.as_view())
+        self.assertIsNone(alias)
+
+    def test_lagging_replicas_skipped(self):
+        lags = {'replica1': 60, 'replica2': 1}
+        with mock.patch('freelancer_marketplace.replicas.measure_lag', lags.get):
+            alias, response = self.route(RequestFactory().get('/jobs/'), JobListView.as_view())
+            self.assertEqual(alias, 'replica2')
+
+            # Checked again only after REPLICA_CHECK_INTERVAL
+            lags['replica2'] = None
+            alias, response = self.route(RequestFactory().get('/jobs/'), JobListView.as_view())
+            self.assertEqual(alias, 'replica2')
+
+            replicas._lag_checks.clear()
+            alias, response = self.route(RequestFactory().get('/jobs/'), JobListView.as_view())
+            self.assertIsNone(alias)
+
+    def test_async_stream_keeps_routing(self):
+        router = ReplicaRouter()
+
+        async def body():
+            yield router.db_for_read(Job) or 'default'
+
+        async def get_response(request):
+            middleware.process_view(request, JobListView.as_view(), (), {})
+            return StreamingHttpResponse(body())
+
+        async def consume(response):
+            return [chunk async for chunk in response.streaming_content]
+
+        middleware = ReplicaMiddleware(get_response)
+        response = async_to_sync(middleware)(RequestFactory().get('/jobs/'))
+        self.assertIn(async_to_sync(consume)(response)[0], [b'replica1', b'replica2'])
+
+    def test_outside_requests(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Job))
+        self.assertFalse(ReplicaRouter().allow_migrate('replica1', 'jobs'))
+        self.assertTrue(ReplicaRouter().allow_migrate('default', 'jobs'))
+
+
+class ReplicaCacheFillTestCase(TestCase):
+    """
+    Shared caches are filled from the primary even when the request reads
+    from a replica, here one that is not configured so reads from it fail
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        category = Category.objects.create(name='Testing', slug='testing')
+        cls.job = Job.objects.bulk_create([
+            Job(
+                title='Job', hirer=hirer, category=category,
+                status=Job.Status.PUBLISHED, description='Description', excerpt='Description'
+            )
+        ])[0]
+        skill = Skill.objects.create(name='Django', slug='django')
+        Job.skills.through.objects.create(job=cls.job, skill=skill)
+
+    def setUp(self):
+        get_search_cache().clear()
+        get_fragment_cache().clear()
+        state = RoutingState()
+        state.alias = 'missing-replica'
+        self.addCleanup(replicas._state.reset, replicas._state.set(state))
+
+    def test_replica_reads_fail(self):
+        with self.assertRaises(ConnectionDoesNotExist):
+            list(Job.objects.all())
+
+    def test_reference_data(self):
+        self.assertIn('testing', [category.slug for category in ReferenceData().categories()])
+
+    def test_search_page(self):
+        view = JobListView()
+        view.setup(RequestFactory().get('/jobs/'))
+        view.search_data = {}
+        paginator, page, jobs, is_paginated = view.paginate_queryset(Job.objects.open(), 10)
+        self.assertEqual(list(jobs), [self.job])
+        # Cached pages load their jobs from the replica
+        with self.assertRaises(ConnectionDoesNotExist):
+            view.paginate_queryset(Job.objects.open(), 10)
+
+    def test_fragments(self):
+        job = Job.objects.using('default').for_listing().get(pk=self.job.pk)
+        self.assertIn('Django', attach_job_cards([job])[0].card_html)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+@mock.patch('freelancer_marketplace.replicas.measure_lag', lambda alias: 0)
+class ReplicaStreamingTestCase(TestCase):
+    """
+    The queries of a streamed body run after the view returned and must
+    still be routed to the request's replica
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        Job.objects.bulk_create([
+            Job(title=f'Job {i}', hirer=hirer, status=Job.Status.PUBLISHED, description='Description')
+            for i in range(3)
+        ])
+
+    def setUp(self):
+        replicas._lag_checks.clear()
+
+    def stream(self, **headers):
+        """
+        Consume a streamed API page; return the body and the databases the
+        router picked for each read
+        """
+        routed = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            routed.append(db_for_read(router, model, **hints))
+            # There is no replica here: run the query on the primary
+            return None
+
+        with mock.patch.object(ReplicaRouter, 'db_for_read', record):
+            response = self.client.get(reverse('api_v1:job_list'), **headers)
+            self.assertTrue(response.streaming)
+            body = b''.join(response.streaming_content)
+        return body, routed
+
+    def test_streamed_reads_use_replica(self):
+        body, routed = self.stream()
+        self.assertIn(b'"Job 2"', body)
+        self.assertTrue(routed)
+        self.assertEqual(set(routed), {'replica1'})
+
+    def test_pinned_clients_stream_from_primary(self):
+        self.client.cookies[REPLICA_PIN_COOKIE] = '1'
+        body, routed = self.stream()
+        self.assertIn(b'"Job 2"', body)
+        self.assertEqual(set(routed), {None})
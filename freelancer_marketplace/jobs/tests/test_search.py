@@ -0,0 +1,87 @@
+import unittest
+from unittest import mock
+
+from django.test import TestCase
+
+from accounts.models import User
+from jobs.models import Category, Skill, Job
+from jobs.search import SKILLS_MATCH_ANY, match_skills, search_jobs
+
+
+class SearchTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.django = Skill.objects.create(name='Django', slug='django')
+
+    def create_job(self, title, description='Some work', skills=()):
+        job = Job.objects.create(
+            title=title,
+            description=description,
+            hirer=self.hirer,
+            category=self.category,
+            status=Job.Status.PUBLISHED,
+        )
+        job.skills.set(skills)
+        return job
+
+    def search(self, q):
+        return list(search_jobs(Job.objects.all(), q).values_list('title', flat=True))
+
+    def test_ranked_websearch(self):
+        self.create_job('Build a shop', description='Python developer wanted for the backend')
+        self.create_job('Python API', description='Python and more Python')
+        self.create_job('Logo design', skills=[self.django])
+        self.create_job('Python data work', description='Data pipelines in Java')
+
+        # Title matches outrank description matches
+        results = self.search('python')
+        self.assertEqual(set(results), {'Build a shop', 'Python API', 'Python data work'})
+        self.assertEqual(results[-1], 'Build a shop')
+        # Skill names are indexed too
+        self.assertEqual(self.search('django'), ['Logo design'])
+        # Web search syntax: phrases, OR and exclusions
+        self.assertEqual(self.search('"data pipelines"'), ['Python data work'])
+        self.assertEqual(set(self.search('logo or shop')), {'Logo design', 'Build a shop'})
+        self.assertEqual(set(self.search('python -java')), {'Build a shop', 'Python API'})
+
+    def test_skill_rename_reindexes(self):
+        self.create_job('Website', skills=[self.django])
+        skill = Skill.objects.get(pk=self.django.pk)
+
+        with mock.patch('jobs.signals.update_search_document') as update:
+            skill.save()
+            skill.published_job_count = 5
+            skill.save(update_fields=['published_job_count'])
+        update.assert_not_called()
+
+        skill.name = 'Flask'
+        skill.save()
+        self.assertEqual(self.search('flask'), ['Website'])
+        self.assertEqual(self.search('django'), [])
+
+    def test_match_skills(self):
+        python = Skill.objects.create(name='Python', slug='python')
+        react = Skill.objects.create(name='React', slug='react')
+        self.create_job('Full stack', skills=[self.django, python, react])
+        self.create_job('Backend', skills=[self.django, python])
+        self.create_job('Frontend', skills=[react])
+
+        def match(skills, **kwargs):
+            return sorted(
+                match_skills(Job.objects.all(), [skill.pk for skill in skills], **kwargs)
+                .values_list('title', 'skill_match_count')
+            )
+
+        # Every selected skill is required, and each job is listed once
+        self.assertEqual(match([self.django, python]), [('Backend', 2), ('Full stack', 2)])
+        self.assertEqual(match([self.django, python, react]), [('Full stack', 3)])
+        self.assertEqual(match([self.django, react], mode=SKILLS_MATCH_ANY), [
+            ('Backend', 1), ('Frontend', 1), ('Full stack', 2),
+        ])
+        with self.assertNumQueries(1):
+            match([self.django, python, react])
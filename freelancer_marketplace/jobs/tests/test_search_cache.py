@@ -0,0 +1,95 @@
+import unittest
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from jobs.cache import get_search_cache
+from jobs.models import Category, Skill, Job
+from jobs.pagination import CursorPaginator
+from jobs.reference import reference_data
+
+
+class SearchCacheTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hirer = User.objects.create_user(
+            email='hirer@example.com', username='hirer', password='x', role=User.Role.HIRER
+        )
+        cls.category = Category.objects.create(name='Testing', slug='testing')
+        cls.skill = Skill.objects.create(name='Django', slug='django')
+        cls.job = Job.objects.create(
+            title='Python API', description='Work', hirer=cls.hirer, category=cls.category,
+            status=Job.Status.PUBLISHED,
+        )
+
+    def setUp(self):
+        get_search_cache().clear()
+        reference_data.clear()
+
+    def search(self):
+        """
+        Return the titles on the first search page and whether the page
+        query ran
+        """
+        with mock.patch.object(CursorPaginator, 'page', autospec=True, side_effect=CursorPaginator.page) as page:
+            response = self.client.get(reverse('jobs:job_search'), {'q': 'python'})
+        self.assertEqual(response.status_code, 200)
+        return [job.title for job in response.context['jobs']], page.called
+
+    def search_after(self, change):
+        """
+        Fill the cache, commit ``change`` and search again
+        """
+        titles = self.search()[0]
+        self.assertEqual(self.search(), (titles, False))
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        return self.search()
+
+    def test_cached_page(self):
+        self.assertEqual(self.search(), (['Python API'], True))
+        self.assertEqual(self.search(), (['Python API'], False))
+        # Pages of other searches are cached separately
+        response = self.client.get(reverse('jobs:job_search'), {'q': 'java'})
+        self.assertEqual(list(response.context['jobs']), [])
+
+    def test_job_save(self):
+        def publish():
+            Job.objects.create(
+                title='Python data', description='Work', hirer=self.hirer, category=self.category,
+                status=Job.Status.PUBLISHED,
+            )
+        titles, queried = self.search_after(publish)
+        self.assertEqual((sorted(titles), queried), (['Python API', 'Python data'], True))
+
+        def rename():
+            self.job.title = 'Java API'
+            self.job.save()
+        self.assertEqual(self.search_after(rename), (['Python data'], True))
+
+    def test_draft_save_keeps_the_cache(self):
+        def save_draft():
+            Job.objects.create(title='Python draft', description='Work', hirer=self.hirer)
+        self.assertEqual(self.search_after(save_draft), (['Python API'], False))
+
+    def test_job_delete(self):
+        self.assertEqual(self.search_after(self.job.delete), ([], True))
+
+    def test_skills_change(self):
+        self.assertEqual(self.search_after(lambda: self.job.skills.add(self.skill)), (['Python API'], True))
+        self.assertEqual(self.search_after(lambda: self.skill.jobs.clear()), (['Python API'], True))
+
+    def test_reference_change(self):
+        def rename_category():
+            self.category.name = 'Renamed'
+            self.category.save()
+        self.assertEqual(self.search_after(rename_category), (['Python API'], True))
+
+        def rename_skill():
+            self.skill.name = 'Python'
+            self.skill.save()
+        self.assertEqual(self.search_after(rename_skill), (['Python API'], True))
+        self.assertEqual(self.search_after(self.skill.delete), (['Python API'], True))
@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from accounts.models import User, FreelancerProfile, HirerProfile
+from jobs.models import Category, Skill, Job, JobApplication
+from jobs.seed import MarketplaceSeeder, allocate, seed_email, zipf_weights
+
+
+class SeedTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.create(name='Testing', slug='testing')
+
+    def seed(self, prefix='seed', seed=0, **volumes):
+        volumes = dict(dict(hirers=5, freelancers=20, skills=30, jobs=60, applications=300), **volumes)
+        return MarketplaceSeeder(seed=seed, prefix=prefix, batch_size=25, related=False, **volumes).run()
+
+    def test_volumes(self):
+        self.seed()
+        self.assertEqual(User.objects.filter(role=User.Role.HIRER).count(), 5)
+        # Profiles are written in bulk, not by the create_user_profile signal
+        self.assertEqual(HirerProfile.objects.count(), 5)
+        self.assertEqual(FreelancerProfile.objects.count(), 20)
+        self.assertEqual(Skill.objects.count(), 30)
+        self.assertEqual(Job.objects.count(), 60)
+        self.assertEqual(JobApplication.objects.count(), 300)
+        self.assertFalse(JobApplication.objects.filter(job__status=Job.Status.DRAFT).exists())
+        self.assertTrue(
+            self.client.login(email=seed_email('seed', User.Role.FREELANCER, 3), password='password')
+        )
+
+        # Zipf: the first skill is required by more jobs than the last
+        first, last = Skill.objects.get(slug='python'), Skill.objects.order_by('-pk')[0]
+        self.assertGreater(first.jobs.count(), last.jobs.count())
+        self.assertEqual(first.published_job_count, first.jobs.filter(status=Job.Status.PUBLISHED).count())
+
+        # Plain-text paragraphs, as the job form stores them
+        job = Job.objects.first()
+        self.assertNotIn('<', job.description)
+        self.assertEqual(job.description.count('\n\n'), 2)
+        self.assertTrue(job.excerpt.startswith(job.description.split('\n')[0][:50]))
+
+    def test_deterministic(self):
+        def snapshot(prefix):
+            jobs = Job.objects.filter(hirer__username__startswith=f'{prefix}-').order_by('pk')
+            return [
+                (job.title, job.status, job.fixed_budget, sorted(job.skills.values_list('slug', flat=True)),
+                 job.applications.count())
+                for job in jobs
+            ]
+
+        self.seed('first', seed=7)
+        self.seed('second', seed=7)
+        self.assertEqual(snapshot('first'), snapshot('second'))
+        self.seed('third', seed=8)
+        self.assertNotEqual(snapshot('first'), snapshot('third'))
+
+    def test_allocate(self):
+        counts = allocate(100, zipf_weights(10, 1), cap=20)
+        self.assertEqual(sum(counts), 100)
+        self.assertEqual(max(counts), 20)
+        self.assertEqual(counts, sorted(counts, reverse=True))
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command(
+            'seed_marketplace', hirers=2, freelancers=3, skills=5, jobs=4, applications=6,
+            no_related=True, stdout=stdout
+        )
+        self.assertIn('6 applications', stdout.getvalue())
+        with self.assertRaisesMessage(CommandError, 'already seeded'):
+            call_command('seed_marketplace', hirers=1, freelancers=1, jobs=0, applications=0, stdout=stdout)
+        with self.assertRaisesMessage(CommandError, 'at most once'):
+            call_command('seed_marketplace', prefix='other', jobs=1, freelancers=1, applications=2)
@@ -1,15 +1,29 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'jobs'
 
+# Under ASGI the public browsing pages are served by native async views
+if getattr(settings, 'JOB_ASYNC_VIEWS', False):
+    from . import async_views
+    job_list_view = async_views.AsyncJobListView
+    job_detail_view = async_views.AsyncJobDetailView
+    category_detail_view = async_views.AsyncCategoryDetailView
+else:
+    job_list_view = views.JobListView
+    job_detail_view = views.JobDetailView
+    category_detail_view = views.CategoryDetailView
+
 urlpatterns = [
     # Job listings and search
-    path('', views.JobListView.as_view(), name='job_list'),
-    path('search/', views.JobListView.as_view(), name='job_search'),
+    path('', job_list_view.as_view(), name='job_list'),
+    path('search/', job_list_view.as_view(), name='job_search'),
+    path('search/facets/', views.JobFacetsView.as_view(), name='job_facets'),
+    path('skills/autocomplete/', views.SkillAutocompleteView.as_view(), name='skill_autocomplete'),
     
     # Job details
-    path('<int:pk>/', views.JobDetailView.as_view(), name='job_detail'),
+    path('<int:pk>/', job_detail_view.as_view(), name='job_detail'),
     
     # Job management (for hirers)
     path('create/', views.JobCreateView.as_view(), name='job_create'),
@@ -27,5 +41,5 @@ urlpatterns = [
     path('application/<int:pk>/withdraw/', views.WithdrawApplicationView.as_view(), name='withdraw_application'),
     
     # Categories
-    path('category/<slug:slug>/', views.CategoryDetailView.as_view(), name='category_detail'),
+    path('category/<slug:slug>/', category_detail_view.as_view(), name='category_detail'),
 ]
@@ -1,20 +1,29 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden, JsonResponse
 from django.urls import reverse, reverse_lazy
 from django.views.generic import (
     ListView, DetailView, CreateView, UpdateView, DeleteView, FormView, View
 )
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
-from django.db.models import Q, Count
+from django.db.models import Q, F, Count
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from .models import Job, Category, Skill, JobApplication
+from .models import Job, Skill, JobApplication, open_job_filter
 from .forms import JobForm, JobSearchForm, JobApplicationForm
+from .search import search_jobs, apply_job_search
+from .pagination import CursorPaginationMixin, StatusTabsMixin, COUNT_ESTIMATE
+from .facets import compute_facets
+from .cache import SearchResultCacheMixin, get_next_deadline, get_search_generation
+from .related import get_related_jobs
+from .autocomplete import skill_index
+from .reference import reference_data
+from .fragments import attach_job_cards, render_job_detail_fragments, get_hirer_version
+from .conditional import ConditionalGetMixin
 
 
-class JobListView(ListView):
+class JobListView(ConditionalGetMixin, SearchResultCacheMixin, CursorPaginationMixin, ListView):
     """
     Display a list of published jobs with search and filter functionalities
     """
@@ -22,135 +31,188 @@ class JobListView(ListView):
     template_name = 'jobs/job_list.html'
     context_object_name = 'jobs'
     paginate_by = 10
+    paginate_count = COUNT_ESTIMATE
+    read_from_replica = True
     
     def get_queryset(self):
-        # Start with published jobs
-        queryset = Job.objects.filter(status=Job.Status.PUBLISHED)
+        # Start with published jobs, loaded for the list cards
+        queryset = Job.objects.for_listing().open()
         
         # Process search form
         form = JobSearchForm(self.request.GET)
         if form.is_valid():
-            # Keyword search
-            q = form.cleaned_data.get('q')
-            if q:
-                queryset = queryset.filter(
-                    Q(title__icontains=q) | Q(description__icontains=q)
-                )
-            
-            # Category filter
-            category = form.cleaned_data.get('category')
-            if category:
-                queryset = queryset.filter(category=category)
-            
-            # Skills filter
-            skills = form.cleaned_data.get('skills')
-            if skills:
-                # Return jobs that have ALL the selected skills
-                for skill in skills:
-                    queryset = queryset.filter(skills=skill)
-            
-            # Budget filter
-            budget_min = form.cleaned_data.get('budget_min')
-            if budget_min:
-                queryset = queryset.filter(
-                    Q(budget_min__gte=budget_min) | Q(fixed_budget__gte=budget_min)
-                )
-            budget_max = form.cleaned_data.get('budget_max')
-            if budget_max:
-                queryset = queryset.filter(
-                    Q(budget_max__lte=budget_max) | Q(fixed_budget__lte=budget_max)
-                )
-            
-            # Remote only filter
-            is_remote = form.cleaned_data.get('is_remote')
-            if is_remote:
-                queryset = queryset.filter(is_remote=True)
-            
-            # Experience level filter
-            exp_level = form.cleaned_data.get('experience_level')
-            if exp_level:
-                queryset = queryset.filter(experience_level=exp_level)
-            
-            # Sorting
-            sort = form.cleaned_data.get('sort')
-            if sort:
-                queryset = queryset.order_by(sort)
-            else:
-                queryset = queryset.order_by('-created_at')
-        else:
-            queryset = queryset.order_by('-created_at')
-        
-        return queryset.distinct()
+            self.search_data = form.cleaned_data
+            return apply_job_search(queryset, self.search_data)
+        return queryset.order_by('-created_at')
+    
+    def get_etag_parts(self):
+        # Any change that can affect published listings, facets or skill
+        # counters bumps the search generation (see jobs.cache); a passing
+        # deadline changes them without a write
+        return [
+            get_search_generation(),
+            get_next_deadline(),
+            reference_data.version(),
+            sorted(self.request.GET.lists()),
+        ]
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search_form'] = JobSearchForm(self.request.GET or None)
-        context['categories'] = Category.objects.all()
-        context['popular_skills'] = Skill.objects.annotate(
-            job_count=Count('jobs')
-        ).order_by('-job_count')[:10]
+        attach_job_cards(context['jobs'])
+        context['categories'] = reference_data.categories()
+        context['facets'] = self.get_facets()
+        context['popular_skills'] = self.get_popular_skills()
         return context
+    
+    def get_facets(self):
+        return compute_facets(
+            Job.objects.open(),
+            self.search_data or {},
+            params=self.request.GET
+        )
+    
+    def get_popular_skills(self):
+        return Skill.objects.filter(
+            published_job_count__gt=0
+        ).annotate(
+            job_count=F('published_job_count')
+        ).order_by('-published_job_count')[:10]
+
+
+class JobFacetsView(View):
+    """
+    Return facet counts for the current search filters as JSON
+    """
+    read_from_replica = True
+    
+    def get(self, request, *args, **kwargs):
+        form = JobSearchForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        
+        return JsonResponse(compute_facets(
+            Job.objects.open(),
+            form.cleaned_data
+        ))
 
 
-class JobDetailView(DetailView):
+class SkillAutocompleteView(View):
+    """
+    Return skills matching the typed text as JSON, in Select2's format
+    """
+    max_results = 20
+    
+    def get(self, request, *args, **kwargs):
+        q = request.GET.get('q', request.GET.get('term', ''))
+        try:
+            limit = min(int(request.GET.get('limit', 10)), self.max_results)
+        except ValueError:
+            limit = 10
+        
+        results = [{'id': pk, 'text': name} for pk, name in skill_index.search(q, limit)]
+        return JsonResponse({'results': results})
+
+
+class JobDetailView(ConditionalGetMixin, DetailView):
     """
     Display details about a specific job
     """
     model = Job
     template_name = 'jobs/job_detail.html'
     context_object_name = 'job'
+    read_from_replica = True
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        # The description is only read when the cached details are rendered
+        queryset = super().get_queryset().defer('description', 'search_document')
         
-        # If the user is not authenticated, only show public published jobs
+        # If the user is not authenticated, only show public open jobs
         if not self.request.user.is_authenticated:
-            return queryset.filter(status=Job.Status.PUBLISHED, is_public=True)
+            return queryset.open().filter(is_public=True)
         
         # If the user is the hirer who created the job, show it regardless of status
         if hasattr(self.request.user, 'is_hirer') and self.request.user.is_hirer:
             return queryset.filter(
                 Q(hirer=self.request.user) | 
-                Q(status=Job.Status.PUBLISHED, is_public=True)
+                (open_job_filter() & Q(is_public=True))
             )
         
-        # For authenticated freelancers, show all public published jobs
-        return queryset.filter(status=Job.Status.PUBLISHED, is_public=True)
+        # For authenticated freelancers, show all public open jobs
+        return queryset.open().filter(is_public=True)
+    
+    def get_object(self, queryset=None):
+        # Already loaded along with the validators (see load_validation_data)
+        if queryset is None and getattr(self, 'object', None) is not None:
+            return self.object
+        return self.attach_category(super().get_object(queryset))
+    
+    def attach_category(self, job):
+        # Category from the reference cache rather than another query
+        category = reference_data.category(job.category_id)
+        if category is not None:
+            job.category = category
+        return job
+    
+    def viewer_can_apply(self):
+        user = self.request.user
+        return user.is_authenticated and hasattr(user, 'is_freelancer') and user.is_freelancer
+    
+    def get_application_queryset(self):
+        return JobApplication.objects.filter(job=self.object, freelancer=self.request.user)
+    
+    def load_validation_data(self):
+        # Everything the page shows is loaded here, once, and reused by get()
+        self.object = self.get_object()
+        self.related_jobs = list(get_related_jobs(self.object))
+        self.user_has_applied = self.get_application_queryset().exists() if self.viewer_can_apply() else None
+    
+    def get_etag_parts(self):
+        return [
+            self.object.pk,
+            self.object.updated_at,
+            self.object.effective_status,
+            reference_data.version(),
+            get_hirer_version(self.object.hirer_id),
+            [(job.pk, job.updated_at) for job in self.related_jobs],
+            self.user_has_applied,
+        ]
+    
+    def get_last_modified(self):
+        return max([self.object.updated_at] + [job.updated_at for job in self.related_jobs])
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         # Check if the user has already applied to this job
-        if self.request.user.is_authenticated and hasattr(self.request.user, 'is_freelancer') and self.request.user.is_freelancer:
-            user_has_applied = JobApplication.objects.filter(
-                job=self.object,
-                freelancer=self.request.user
-            ).exists()
-            context['user_has_applied'] = user_has_applied
+        if self.user_has_applied is not None:
+            context['user_has_applied'] = self.user_has_applied
 
             # Create application form
-            if not user_has_applied:
+            if not self.user_has_applied:
                 context['application_form'] = JobApplicationForm(job=self.object, user=self.request.user)
         
-        # Get related jobs based on category and skills
-        if self.object.category:
-            related_jobs = Job.objects.filter(
-                category=self.object.category,
-                status=Job.Status.PUBLISHED,
-                is_public=True
-            ).exclude(pk=self.object.pk)
-            
-            if self.object.skills.exists():
-                # Boost jobs that share skills
-                related_jobs = related_jobs.filter(
-                    skills__in=self.object.skills.all()
-                ).distinct()
-            
-            context['related_jobs'] = related_jobs[:5]
+        # Public sections rendered once per job version (see jobs.fragments)
+        context.update(render_job_detail_fragments(self.object))
+        
+        # Precomputed related jobs (see jobs.related)
+        context['related_jobs'] = self.related_jobs
         
         return context
 
 
+class SingleLoadObjectMixin:
+    """
+    Load the object once per request; the permission check and the view
+    share it
+    """
+    def get_object(self, queryset=None):
+        if queryset is None and getattr(self, 'object', None) is not None:
+            return self.object
+        self.object = super().get_object(queryset)
+        return self.object
+
+
 class JobCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     """
     Create a new job (hirers only)
@@ -192,7 +254,7 @@ class JobCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         return reverse('jobs:job_detail', kwargs={'pk': self.object.pk})
 
 
-class JobUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class JobUpdateView(LoginRequiredMixin, UserPassesTestMixin, SingleLoadObjectMixin, UpdateView):
     """
     Edit an existing job (owner only)
     """
@@ -205,7 +267,7 @@ class JobUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         return (
             hasattr(self.request.user, 'is_hirer') and 
             self.request.user.is_hirer and 
-            job.hirer == self.request.user
+            job.hirer_id == self.request.user.pk
         )
     
     def get_form_kwargs(self):
@@ -258,7 +320,7 @@ class JobUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         return redirect(self.get_success_url())
 
 
-class JobDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class JobDeleteView(LoginRequiredMixin, UserPassesTestMixin, SingleLoadObjectMixin, DeleteView):
     """
     Delete a job (owner only, and only if it's a draft)
     """
@@ -272,12 +334,12 @@ class JobDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         return (
             hasattr(self.request.user, 'is_hirer') and 
             self.request.user.is_hirer and 
-            job.hirer == self.request.user and
+            job.hirer_id == self.request.user.pk and
             job.status == Job.Status.DRAFT
         )
 
 
-class MyJobsView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class MyJobsView(LoginRequiredMixin, UserPassesTestMixin, StatusTabsMixin, CursorPaginationMixin, ListView):
     """
     Show all jobs created by the current hirer
     """
@@ -285,31 +347,45 @@ class MyJobsView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     template_name = 'jobs/my_jobs.html'
     context_object_name = 'jobs'
     paginate_by = 10
+    status_tabs = {
+        'published': (_('Published'), [Job.Status.PUBLISHED]),
+        'draft': (_('Drafts'), [Job.Status.DRAFT]),
+        'closed': (_('Closed'), [Job.Status.CLOSED, Job.Status.FILLED, Job.Status.EXPIRED]),
+    }
     
     def test_func(self):
         return hasattr(self.request.user, 'is_hirer') and self.request.user.is_hirer
     
-    def get_queryset(self):
-        return Job.objects.filter(hirer=self.request.user).order_by('-created_at')
+    def get_tab_filter(self, key, statuses):
+        # Overdue jobs count as expired before the sweeper marks them (see jobs.expiry)
+        overdue = Q(status=Job.Status.PUBLISHED, deadline__lt=timezone.now())
+        if key == 'published':
+            return open_job_filter()
+        if key == 'closed':
+            return Q(status__in=statuses) | overdue
+        return super().get_tab_filter(key, statuses)
+    
+    def get_base_queryset(self):
+        # The description is never shown on the dashboard
+        return Job.objects.filter(
+            hirer=self.request.user
+        ).select_related('category').defer(
+            'description', 'search_document'
+        ).order_by('-created_at', '-id')
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        
-        # Group jobs by status
-        context['draft_jobs'] = self.get_queryset().filter(status=Job.Status.DRAFT)
-        context['published_jobs'] = self.get_queryset().filter(status=Job.Status.PUBLISHED)
-        context['closed_jobs'] = self.get_queryset().filter(
-            Q(status=Job.Status.CLOSED) | 
-            Q(status=Job.Status.FILLED) | 
-            Q(status=Job.Status.EXPIRED)
+    def get_queryset(self):
+        # The page's jobs with their category and application counts in one
+        # grouped query
+        application_counts = {
+            f'{status.lower()}_application_count': Count(
+                'applications', filter=Q(applications__status=status)
+            )
+            for status in JobApplication.Status.values
+        }
+        return super().get_queryset().annotate(
+            application_count=Count('applications'),
+            **application_counts
         )
-        
-        # Add application counts
-        for job_list in [context['draft_jobs'], context['published_jobs'], context['closed_jobs']]:
-            for job in job_list:
-                job.application_count = job.applications.count()
-        
-        return context
 
 
 class JobApplicationCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
@@ -329,8 +405,8 @@ class JobApplicationCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateVi
         job_id = self.kwargs.get('job_id')
         self.job = get_object_or_404(Job, pk=job_id)
         
-        # Check if the job is published
-        if self.job.status != Job.Status.PUBLISHED:
+        # Check if the job is published and its deadline has not passed
+        if not self.job.is_open:
             return False
         
         # Check if user already applied to this job
@@ -369,7 +445,7 @@ class JobApplicationCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateVi
         return reverse('jobs:job_detail', kwargs={'pk': self.job.pk})
 
 
-class MyApplicationsView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class MyApplicationsView(LoginRequiredMixin, UserPassesTestMixin, StatusTabsMixin, CursorPaginationMixin, ListView):
     """
     Show all applications submitted by the current freelancer
     """
@@ -377,33 +453,24 @@ class MyApplicationsView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     template_name = 'jobs/my_applications.html'
     context_object_name = 'applications'
     paginate_by = 10
+    status_tabs = {
+        'pending': (_('Pending'), [JobApplication.Status.PENDING]),
+        'active': (_('Active'), [JobApplication.Status.SHORTLISTED, JobApplication.Status.ACCEPTED]),
+        'rejected': (_('Rejected'), [JobApplication.Status.REJECTED, JobApplication.Status.WITHDRAWN]),
+    }
     
     def test_func(self):
         return hasattr(self.request.user, 'is_freelancer') and self.request.user.is_freelancer
     
-    def get_queryset(self):
+    def get_base_queryset(self):
         return JobApplication.objects.filter(
             freelancer=self.request.user
-        ).select_related('job').order_by('-created_at')
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        
-        # Group applications by status
-        context['pending_applications'] = self.get_queryset().filter(status=JobApplication.Status.PENDING)
-        context['active_applications'] = self.get_queryset().filter(
-            Q(status=JobApplication.Status.SHORTLISTED) | 
-            Q(status=JobApplication.Status.ACCEPTED)
-        )
-        context['rejected_applications'] = self.get_queryset().filter(
-            Q(status=JobApplication.Status.REJECTED) | 
-            Q(status=JobApplication.Status.WITHDRAWN)
-        )
-        
-        return context
+        ).select_related('job').defer(
+            'cover_letter', 'job__description', 'job__search_document'
+        ).order_by('-created_at')
 
 
-class JobApplicationsView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class JobApplicationsView(LoginRequiredMixin, UserPassesTestMixin, StatusTabsMixin, CursorPaginationMixin, ListView):
     """
     Show all applications for a specific job (job owner only)
     """
@@ -411,6 +478,12 @@ class JobApplicationsView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     template_name = 'jobs/job_applications.html'
     context_object_name = 'applications'
     paginate_by = 20
+    status_tabs = {
+        'pending': (_('Pending'), [JobApplication.Status.PENDING]),
+        'shortlisted': (_('Shortlisted'), [JobApplication.Status.SHORTLISTED]),
+        'accepted': (_('Accepted'), [JobApplication.Status.ACCEPTED]),
+        'rejected': (_('Rejected'), [JobApplication.Status.REJECTED, JobApplication.Status.WITHDRAWN]),
+    }
     
     def setup(self, request, *args, **kwargs):
         super().setup(request, *args, **kwargs)
@@ -424,24 +497,14 @@ class JobApplicationsView(LoginRequiredMixin, UserPassesTestMixin, ListView):
             self.job.hirer == self.request.user
         )
     
-    def get_queryset(self):
+    def get_base_queryset(self):
         return JobApplication.objects.filter(
             job=self.job
-        ).select_related('freelancer').order_by('-created_at')
+        ).select_related('freelancer').defer('cover_letter').order_by('-created_at')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['job'] = self.job
-        
-        # Group applications by status
-        context['pending_applications'] = self.get_queryset().filter(status=JobApplication.Status.PENDING)
-        context['shortlisted_applications'] = self.get_queryset().filter(status=JobApplication.Status.SHORTLISTED)
-        context['accepted_applications'] = self.get_queryset().filter(status=JobApplication.Status.ACCEPTED)
-        context['rejected_applications'] = self.get_queryset().filter(
-            Q(status=JobApplication.Status.REJECTED) | 
-            Q(status=JobApplication.Status.WITHDRAWN)
-        )
-        
         return context
 
 
@@ -451,14 +514,16 @@ class UpdateApplicationStatusView(LoginRequiredMixin, UserPassesTestMixin, View)
     """
     def setup(self, request, *args, **kwargs):
         super().setup(request, *args, **kwargs)
-        self.application = get_object_or_404(JobApplication, pk=self.kwargs.get('pk'))
+        self.application = get_object_or_404(
+            JobApplication.objects.select_related('job'), pk=self.kwargs.get('pk')
+        )
     
     def test_func(self):
         # Only the job owner can update application statuses
         return (
             hasattr(self.request.user, 'is_hirer') and 
             self.request.user.is_hirer and 
-            self.application.job.hirer == self.request.user
+            self.application.job.hirer_id == self.request.user.pk
         )
     
     def post(self, request, *args, **kwargs):
@@ -504,7 +569,7 @@ class WithdrawApplicationView(LoginRequiredMixin, UserPassesTestMixin, View):
         return (
             hasattr(self.request.user, 'is_freelancer') and 
             self.request.user.is_freelancer and 
-            self.application.freelancer == self.request.user and
+            self.application.freelancer_id == self.request.user.pk and
             self.application.status in [
                 JobApplication.Status.PENDING,
                 JobApplication.Status.SHORTLISTED
@@ -522,7 +587,7 @@ class WithdrawApplicationView(LoginRequiredMixin, UserPassesTestMixin, View):
         return redirect('jobs:my_applications')
 
 
-class CategoryDetailView(ListView):
+class CategoryDetailView(ConditionalGetMixin, CursorPaginationMixin, ListView):
     """
     Show all jobs for a specific category
     """
@@ -530,27 +595,50 @@ class CategoryDetailView(ListView):
     template_name = 'jobs/category_detail.html'
     context_object_name = 'jobs'
     paginate_by = 10
+    paginate_count = COUNT_ESTIMATE
+    read_from_replica = True
     
     def setup(self, request, *args, **kwargs):
         super().setup(request, *args, **kwargs)
-        self.category = get_object_or_404(Category, slug=self.kwargs.get('slug'))
+        self.category = reference_data.category_by_slug(self.kwargs.get('slug'))
+        if self.category is None:
+            raise Http404(_('No category found matching the query'))
     
     def get_queryset(self):
-        return Job.objects.filter(
+        queryset = Job.objects.for_listing().open().filter(
             category=self.category,
-            status=Job.Status.PUBLISHED,
             is_public=True
         ).order_by('-created_at')
+        
+        # Optional keyword search within the category
+        q = self.request.GET.get('q', '').strip()
+        if q:
+            queryset = search_jobs(queryset, q)
+        
+        return queryset
+    
+    def get_etag_parts(self):
+        return [
+            get_search_generation(),
+            get_next_deadline(),
+            reference_data.version(),
+            self.category.pk,
+            sorted(self.request.GET.lists()),
+        ]
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['category'] = self.category
-        
-        # Get popular skills for this category
-        context['popular_skills'] = Skill.objects.filter(
-            jobs__category=self.category
+        context['q'] = self.request.GET.get('q', '').strip()
+        attach_job_cards(context['jobs'])
+        context['popular_skills'] = self.get_popular_skills()
+        return context
+    
+    def get_popular_skills(self):
+        # Most used skills in this category
+        return Skill.objects.filter(
+            category_counts__category=self.category,
+            category_counts__job_count__gt=0
         ).annotate(
-            job_count=Count('jobs')
+            job_count=F('category_counts__job_count')
         ).order_by('-job_count')[:10]
-        
-        return context
@@ -0,0 +1,26 @@
+/**
+ * Select2 set-up shared by the job search and job form pages
+ */
+
+/**
+ * Turn every .select2 element into a Select2 widget. Elements with a
+ * data-autocomplete-url search that URL as the user types instead of
+ * rendering every option.
+ */
+function initSelect2(baseOptions) {
+    $('.select2').each(function() {
+        var options = $.extend({}, baseOptions);
+        var url = $(this).data('autocomplete-url');
+        if (url) {
+            // Skills are searched on the server instead of rendered as options
+            options.ajax = {
+                url: url,
+                dataType: 'json',
+                delay: 250,
+                data: function(params) { return {q: params.term}; }
+            };
+            options.minimumInputLength = 1;
+        }
+        $(this).select2(options);
+    });
+}